@@ -1,23 +1,74 @@
 from pathlib import Path
 from typing import TYPE_CHECKING
 import json
+import threading
+import time
+
+from metrics import CacheMetrics, MetricsRegistry
 
 if TYPE_CHECKING:
     from network import Network
 
 
 class Cache:
-    def __init__(self, nodes: dict[str, dict[str, list[str]]], file_path: Path, network: "Network", deferred_write: bool = False):
+    """
+    Routes to resources, one table per node, shared by every search that uses
+    it, including searches running in parallel threads.
+
+    Writes are lock-striped: an update locks the stripe of each node it
+    changes, one node at a time, so updates along different paths rarely
+    contend. Reads take no lock; a node's table is only ever changed by
+    single-key assignments, which readers see whole. A flush holds every
+    stripe just long enough to copy the tables, then writes the copy.
+    """
+
+    STRIPES = 64
+
+    def __init__(self, nodes: dict[str, dict[str, list[str]]], file_path: Path, network: "Network", deferred_write: bool = False, metrics: MetricsRegistry | None = None, stripes: int = STRIPES):
+        if stripes < 1:
+            raise ValueError(f"stripes must be at least 1, got {stripes}")
         self.nodes: dict[str, dict[str, list[str]]] = nodes
         self.path: Path = file_path
         self.network: "Network" = network
         self.deferred_write: bool = deferred_write
+        self.metrics: CacheMetrics | None = CacheMetrics(metrics) if metrics is not None else None
+        # Latency of each entry's route, filled lazily; not persisted since it
+        # can always be recomputed from the stored path.
+        self.costs: dict[str, dict[str, float]] = {}
+        # Topology version the costs were computed for; on a change the table
+        # is replaced, never cleared, so writers still holding the old one
+        # cannot put stale costs into the new one
+        self._costs_version = network.graph.topology_version
+        self._costs_lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        # Entries changed since the last flush, counted per stripe so writers
+        # never share a counter
+        self._dirty = [0] * stripes
+        # One writer of the file at a time
+        self._file_lock = threading.Lock()
+
+    def _stripe(self, node_id: str) -> int:
+        return hash(node_id) % len(self._stripes)
+
+    @property
+    def dirty(self) -> int:
+        """Entries written since the last flush (or since loading)."""
+        return sum(self._dirty)
 
     def __getitem__(self, node_id: str) -> dict[str, list[str]] | None:
         return self.nodes.get(node_id)
 
     def follow(self, cache_path: list[str], current_path: list[str], target_resource: str) -> list[str] | None:
+        if self.metrics is None:
+            return self._follow(cache_path, current_path, target_resource)
+        start_time = time.perf_counter()
+        path = self._follow(cache_path, current_path, target_resource)
+        self.metrics.observe_follow(time.perf_counter() - start_time, path is not None)
+        return path
+
+    def _follow(self, cache_path: list[str], current_path: list[str], target_resource: str) -> list[str] | None:
         new_path: list[str] = current_path.copy()
+        neighbors = self.network.neighbors
         for node_id in cache_path:
             try:
                 node = self.network[node_id]
@@ -26,6 +77,9 @@ class Cache:
 
             if node is None:
                 return None
+            # Under churn a route can outlive one of its links
+            if node_id not in neighbors.get(new_path[-1], ()):
+                return None
 
             new_path.append(node_id)
             
@@ -38,14 +92,70 @@ class Cache:
 
         return None
 
-    def update(self, resource: str, network_path: list[str]) -> None:
+    def _current_costs(self) -> dict[str, dict[str, float]]:
+        """The cost table for the current topology."""
+        version = self.network.graph.topology_version
+        if version != self._costs_version:
+            with self._costs_lock:
+                if version != self._costs_version:
+                    # Table first: a reader that sees the new version gets the new table
+                    self.costs = {}
+                    self._costs_version = version
+        return self.costs
+
+    def cost(self, node_id: str, resource: str) -> float | None:
+        """Total link latency of the cached route from node_id, or None if there is no entry."""
+        node_cache = self.nodes.get(node_id)
+        if node_cache is None or resource not in node_cache:
+            return None
+        node_costs = self._current_costs().setdefault(node_id, {})
+        if resource not in node_costs:
+            node_costs[resource] = self.network.path_latency([node_id] + node_cache[resource])
+        return node_costs[resource]
+
+    def update(self, resource: str, network_path: list[str], keep_cheapest: bool = False) -> None:
+        """
+        Store the route to ``resource`` at every node of ``network_path``.
+
+        With keep_cheapest, an existing entry is only replaced by a route with
+        lower total latency.
+        """
+        start_time = time.perf_counter() if self.metrics is not None else 0.0
+        if keep_cheapest:
+            # Taken before the latencies are read, to tell whether the
+            # topology changed before the costs are stored
+            costs = self._current_costs()
+            suffix_costs = [0.0] * len(network_path)
+            for i in range(len(network_path) - 2, -1, -1):
+                suffix_costs[i] = suffix_costs[i + 1] + self.network.graph.link_latency(network_path[i], network_path[i + 1])
+
         for i in range(len(network_path)):
             current_node = network_path[i]
             remaining_path = network_path[i + 1:]
-            if current_node not in self.nodes:
-                self.nodes[current_node] = {}
-            self.nodes[current_node][resource] = remaining_path
+            # Compare, store and invalidate the cost as one step per node
+            stripe = self._stripe(current_node)
+            with self._stripes[stripe]:
+                if keep_cheapest:
+                    current_cost = self.cost(current_node, resource)
+                    if current_cost is not None and current_cost <= suffix_costs[i]:
+                        continue
+                    current_costs = self._current_costs()
+                    if current_costs is costs:
+                        costs.setdefault(current_node, {})[resource] = suffix_costs[i]
+                    else:
+                        # Computed for a topology that is gone: cost() recomputes it
+                        current_costs.get(current_node, {}).pop(resource, None)
+                else:
+                    self._current_costs().get(current_node, {}).pop(resource, None)
+                node_cache = self.nodes.get(current_node)
+                if node_cache is None:
+                    node_cache = self.nodes[current_node] = {}
+                if node_cache.get(resource) != remaining_path:
+                    node_cache[resource] = remaining_path
+                    self._dirty[stripe] += 1
 
+        if self.metrics is not None:
+            self.metrics.observe_update(time.perf_counter() - start_time)
         if not self.deferred_write:
             self._write_to_file()
 
@@ -53,7 +163,43 @@ class Cache:
         """Write cache to file. Use this when deferred_write is enabled."""
         self._write_to_file()
 
+    def flush_if_dirty(self) -> bool:
+        """Flush only if entries changed since the last flush; returns whether it wrote."""
+        if not self.dirty:
+            return False
+        self._write_to_file()
+        return True
+
+    def snapshot(self) -> dict[str, dict[str, list[str]]]:
+        """A consistent copy of every node's table, taken with all writers paused."""
+        return self._snapshot()[0]
+
+    def _snapshot(self) -> tuple[dict[str, dict[str, list[str]]], list[int]]:
+        """The copy together with the per-stripe dirty counts it includes."""
+        for stripe in self._stripes:
+            stripe.acquire()
+        try:
+            return {node_id: dict(routes) for node_id, routes in self.nodes.items()}, self._dirty.copy()
+        finally:
+            for stripe in self._stripes:
+                stripe.release()
+
     def _write_to_file(self) -> None:
         """Internal method to write cache to file."""
-        with self.path.open("w") as f:
-            json.dump(self.nodes, f, indent=2)
+        start_time = time.perf_counter() if self.metrics is not None else 0.0
+        # Serialized from a copy: dumping the live dicts would fail as soon
+        # as another thread added an entry
+        # Copied under the file lock too, so a writer never puts an older copy
+        # over a newer one or discounts entries another writer already saved
+        with self._file_lock:
+            nodes, written = self._snapshot()
+            with self.path.open("w") as f:
+                json.dump(nodes, f, indent=2)
+                bytes_written = f.tell() if self.metrics is not None else 0
+            # Only once the copy is on disk; entries changed meanwhile stay dirty
+            for stripe, lock in enumerate(self._stripes):
+                with lock:
+                    self._dirty[stripe] -= written[stripe]
+        if self.metrics is not None:
+            entries = sum(len(routes) for routes in nodes.values())
+            self.metrics.observe_flush(time.perf_counter() - start_time, bytes_written, len(nodes), entries)
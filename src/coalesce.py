@@ -0,0 +1,169 @@
+"""
+In-flight query coalescing: concurrent fetches of one resource share a
+traversal instead of each starting their own.
+
+The first fetch of (resource, method) from a node leads: it runs the search.
+While it runs, a later fetch for the same key
+
+- from the same node is a hit: it waits and gets the leader's path;
+- from a node within ``radius`` hops of a leader is a merge: it waits and
+  gets its own path, the hops to the leader followed by the leader's route,
+  shortened where the two cross.
+
+A merge whose leader found nothing (or failed) falls back to a search of its
+own, since a different origin may still reach the resource within TTL; it
+counts as both a merge and a fallback.
+Followers send no query of their own: their results count only the prefix
+hops as messages, and their elapsed time is the wait.
+"""
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from cache import Cache
+from histogram import Histogram
+from metrics import CoalesceMetrics, MetricsRegistry
+from result import SearchResult
+from tracing import Tracer
+
+if TYPE_CHECKING:
+    from network import Network
+
+
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: SearchResult | None = None
+
+
+def merge_paths(prefix: list[str], path: list[str]) -> list[str]:
+    """prefix (ending at path[0]) followed by path, cut at the first node they share."""
+    position = {node_id: i for i, node_id in enumerate(path)}
+    for i, node_id in enumerate(prefix):
+        if node_id in position:
+            return prefix[:i] + path[position[node_id]:]
+    raise ValueError(f"prefix {prefix} does not reach path {path}")
+
+
+class CoalescingFetcher:
+    """
+    Fetches through Network.fetch, coalescing concurrent duplicates. Safe to
+    call from many threads, e.g. as QueryEngine's fetch.
+    """
+
+    def __init__(self, network: "Network", ttl: int, cache: Cache | None = None, radius: int = 1, tracer: Tracer | None = None, metrics: MetricsRegistry | None = None):
+        if radius < 0:
+            raise ValueError(f"radius must be non-negative, got {radius}")
+        self.network = network
+        self.ttl = ttl
+        self.cache = cache
+        self.radius = radius
+        self.tracer = tracer
+        self.metrics = metrics
+        self._metrics = CoalesceMetrics(metrics) if metrics is not None else None
+        self._lock = threading.Lock()
+        # (resource, method) -> origin -> flight
+        self._inflight: dict[tuple[str, str], dict[str, _Flight]] = {}
+        self.leaders = 0
+        self.hits = 0
+        self.merges = 0
+        self.fallbacks = 0
+        self.wait = Histogram()
+
+    def _search(self, requester_id: str, resource: str, search_method: str) -> SearchResult:
+        return self.network.fetch(
+            requester_id, resource, search_method=search_method, ttl=self.ttl,
+            cache=self.cache, tracer=self.tracer, metrics=self.metrics,
+        )
+
+    def _nearby(self, requester_id: str, flights: dict[str, _Flight]) -> list[str] | None:
+        """Hops from requester_id to the nearest in-flight origin within radius, if any."""
+        parents = {requester_id: None}
+        frontier = [requester_id]
+        for _ in range(self.radius):
+            next_frontier = []
+            for node_id in frontier:
+                for neighbor in self.network.neighbors.get(node_id, []):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = node_id
+                    if neighbor in flights:
+                        prefix = [neighbor]
+                        while parents[prefix[-1]] is not None:
+                            prefix.append(parents[prefix[-1]])
+                        return prefix[::-1]
+                    next_frontier.append(neighbor)
+            frontier = next_frontier
+        return None
+
+    def _count(self, outcome: str) -> None:
+        # Called with self._lock held
+        match outcome:
+            case "leader":
+                self.leaders += 1
+            case "hit":
+                self.hits += 1
+            case "merge":
+                self.merges += 1
+            case "fallback":
+                self.fallbacks += 1
+        if self._metrics is not None:
+            self._metrics.observe(outcome)
+
+    def fetch(self, requester_id: str, resource: str, search_method: str = "bfs") -> SearchResult:
+        key = (resource, search_method)
+        with self._lock:
+            flights = self._inflight.setdefault(key, {})
+            flight = flights.get(requester_id)
+            prefix = [requester_id] if flight is not None else self._nearby(requester_id, flights) if flights else None
+            if prefix is None:
+                flight = flights[requester_id] = _Flight()
+                self._count("leader")
+            else:
+                flight = flights[prefix[-1]]
+                self._count("hit" if len(prefix) == 1 else "merge")
+
+        if prefix is None:
+            try:
+                flight.result = self._search(requester_id, resource, search_method)
+            finally:
+                with self._lock:
+                    del flights[requester_id]
+                    if not flights:
+                        del self._inflight[key]
+                flight.done.set()
+            return flight.result
+
+        start_time = time.perf_counter()
+        flight.done.wait()
+        waited = time.perf_counter() - start_time
+        with self._lock:
+            self.wait.record(waited)
+            if self._metrics is not None:
+                self._metrics.observe_wait(waited)
+        leader = flight.result
+        if leader is None or (len(prefix) > 1 and leader.path is None):
+            with self._lock:
+                self._count("fallback")
+            return self._search(requester_id, resource, search_method)
+        if leader.path is None:
+            return SearchResult(elapsed=waited)
+        path = merge_paths(prefix, leader.path)
+        if self.cache is not None and len(prefix) > 1:
+            self.cache.update(resource, path)
+        return SearchResult(path=path, messages=len(prefix) - 1, elapsed=waited)
+
+    def stats(self) -> dict:
+        with self._lock:
+            fetches = self.leaders + self.hits + self.merges
+            return {
+                "leaders": self.leaders,
+                "hits": self.hits,
+                "merges": self.merges,
+                "fallbacks": self.fallbacks,
+                # Share of fetches answered without a traversal of their own
+                "coalesced_ratio": (self.hits + self.merges - self.fallbacks) / fetches if fetches else 0.0,
+                "wait_ms": {name: value * 1000 if value is not None else None for name, value in self.wait.percentiles().items()},
+            }
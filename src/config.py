@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -5,3 +6,5 @@ from pathlib import Path
 class Config:
     BASE_DIR = Path(__file__).resolve().parent
     EXAMPLES_DIR = BASE_DIR / "graph" / "examples"
+    # Computed graph layouts, reused between visualizations of the same topology
+    LAYOUT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "comp-dist-av3-2" / "layouts"
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def first_unique(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sorted unique values and the position of the first occurrence of each,
+    like ``np.unique(values, return_index=True)``. A stable sort plus a
+    neighbor comparison is much faster than np.unique on large arrays.
+    """
+    order = np.argsort(values, kind="stable")
+    ordered = values[order]
+    keep = np.ones(len(ordered), dtype=bool)
+    keep[1:] = ordered[1:] != ordered[:-1]
+    return ordered[keep], order[keep]
+
+
+@dataclass
+class CSR:
+    """
+    Compressed sparse row adjacency: the neighbors of node i are
+    ``indices[indptr[i]:indptr[i + 1]]``, as positions in ``ids``.
+    """
+    ids: list[str]
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.ids)
+
+    def index(self) -> dict[str, int]:
+        return {node_id: i for i, node_id in enumerate(self.ids)}
+
+    def neighbors_of(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def expand(self, frontier: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """All (source, neighbor) pairs leaving the frontier, as two flat arrays."""
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=self.indices.dtype)
+            return empty, empty
+        sources = np.repeat(frontier, counts)
+        # Offset of each pair inside its source's neighbor slice
+        run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+        offsets = np.arange(total) - run_starts + np.repeat(starts, counts)
+        return sources, self.indices[offsets]
+
+    @classmethod
+    def from_neighbors(cls, neighbors: dict[str, list[str]]) -> "CSR":
+        ids = list(neighbors)
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        degrees = np.fromiter((len(neighbors[node_id]) for node_id in ids), dtype=np.int64, count=len(ids))
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        index_dtype = np.int32 if len(ids) < 2**31 else np.int64
+        indices = np.fromiter(
+            (index[neighbor] for node_id in ids for neighbor in neighbors[node_id]),
+            dtype=index_dtype,
+            count=int(indptr[-1]),
+        )
+        return cls(ids=ids, indptr=indptr, indices=indices)
+
+    @classmethod
+    def from_edges(cls, ids: list[str], sources: np.ndarray, targets: np.ndarray) -> tuple["CSR", np.ndarray]:
+        """
+        Undirected CSR from parallel arrays of edge endpoints (positions in
+        ``ids``). Neighbors keep edge order. Also returns, for every entry of
+        ``indices``, the number of the edge it came from.
+        """
+        n = len(ids)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        rows = np.stack([sources, targets], axis=1).ravel()
+        cols = np.stack([targets, sources], axis=1).ravel()
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        index_dtype = np.int32 if n < 2**31 else np.int64
+        return cls(ids=ids, indptr=indptr, indices=cols[order].astype(index_dtype)), order // 2
@@ -0,0 +1,279 @@
+"""
+Vectorized topology generators.
+
+Every generator returns an (m, 2) int64 array of undirected edges between
+node positions 0..n-1, without self-loops or duplicate edges. Node ids are
+only created when writing (``n1``, ``n2``, ... like the hexagonal example),
+so million-node graphs stay in compact arrays until then.
+"""
+from pathlib import Path
+import json
+import math
+
+import numpy as np
+
+from .csr import CSR, first_unique
+from .schema import GraphSchema
+
+
+MODELS = ("erdos_renyi", "barabasi_albert", "watts_strogatz", "random_regular", "hexagonal", "torus")
+
+
+def _simple(n: int, edges: np.ndarray) -> np.ndarray:
+    """Drop self-loops and duplicates, storing each edge as (low, high)."""
+    edges = np.sort(edges, axis=1)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    codes, _ = first_unique(edges[:, 0] * n + edges[:, 1])
+    return np.stack([codes // n, codes % n], axis=1)
+
+
+def degrees(n: int, edges: np.ndarray) -> np.ndarray:
+    return np.bincount(edges.ravel(), minlength=n)
+
+
+def erdos_renyi(n: int, avg_degree: float, seed: int | None = None) -> np.ndarray:
+    """G(n, m) with m = n * avg_degree / 2 edges drawn uniformly."""
+    rng = np.random.default_rng(seed)
+    target = min(int(round(n * avg_degree / 2)), n * (n - 1) // 2)
+    edges = np.empty((0, 2), dtype=np.int64)
+    while len(edges) < target:
+        missing = target - len(edges)
+        # Oversample a little so collisions rarely need another round
+        draw = rng.integers(0, n, size=(int(missing * 1.1) + 16, 2))
+        edges = _simple(n, np.concatenate([edges, draw]))
+    if len(edges) > target:
+        edges = edges[rng.permutation(len(edges))[:target]]
+    return edges
+
+
+def barabasi_albert(n: int, m: int, seed: int | None = None) -> np.ndarray:
+    """
+    Preferential attachment: every new node links to m existing nodes chosen
+    proportionally to degree.
+
+    Batagelj-Brandes formulation: edge k stores (source, target) at positions
+    2k and 2k + 1 of a virtual list; its target is the node at a uniformly
+    chosen earlier position, which is exactly degree-proportional. Even
+    positions are known sources; odd ones point to another edge's target, so
+    all targets are resolved together by pointer jumping instead of a loop.
+    """
+    if m < 1 or m >= n:
+        raise ValueError("barabasi_albert needs 1 <= m < n")
+    rng = np.random.default_rng(seed)
+
+    # Seed with a star on nodes 0..m so every position has a valid node
+    seed_edges = np.stack([np.arange(1, m + 1), np.zeros(m, dtype=np.int64)], axis=1)
+    num_seed = len(seed_edges)
+    sources = np.repeat(np.arange(m + 1, n, dtype=np.int64), m)
+    k = np.arange(num_seed, num_seed + len(sources), dtype=np.int64)
+    position = (rng.random(len(sources)) * (2 * k)).astype(np.int64)
+
+    # target[k] is either a node (resolved) or a position to follow
+    all_sources = np.concatenate([seed_edges[:, 0], sources])
+    all_targets = np.full(num_seed + len(sources), -1, dtype=np.int64)
+    all_targets[:num_seed] = seed_edges[:, 1]
+    pointer = np.full(num_seed + len(sources), -1, dtype=np.int64)
+    pointer[num_seed:] = position
+
+    pending = np.arange(num_seed, num_seed + len(sources))
+    while pending.size:
+        p = pointer[pending]
+        even = p % 2 == 0
+        all_targets[pending[even]] = all_sources[p[even] // 2]
+        odd_edges = p[~even] // 2
+        resolved = all_targets[odd_edges] >= 0
+        rest = pending[~even]
+        all_targets[rest[resolved]] = all_targets[odd_edges[resolved]]
+        # Jump: follow the pointer of the edge we depend on
+        unresolved = rest[~resolved]
+        pointer[unresolved] = pointer[odd_edges[~resolved]]
+        pending = unresolved
+
+    return _simple(n, np.stack([all_sources, all_targets], axis=1))
+
+
+def watts_strogatz(n: int, k: int, beta: float, seed: int | None = None) -> np.ndarray:
+    """Ring lattice where each node links to its k nearest neighbors, each edge rewired with probability beta."""
+    if k % 2 or k >= n:
+        raise ValueError("watts_strogatz needs an even k < n")
+    rng = np.random.default_rng(seed)
+    sources = np.repeat(np.arange(n, dtype=np.int64), k // 2)
+    offsets = np.tile(np.arange(1, k // 2 + 1, dtype=np.int64), n)
+    targets = (sources + offsets) % n
+    rewire = rng.random(len(targets)) < beta
+    targets[rewire] = rng.integers(0, n, size=int(rewire.sum()))
+    return _simple(n, np.stack([sources, targets], axis=1))
+
+
+def random_regular(n: int, d: int, seed: int | None = None) -> np.ndarray:
+    """
+    Configuration model: d stubs per node paired at random. Self-loops and
+    duplicate pairs are dropped, so a few nodes may end up with degree < d.
+    """
+    if (n * d) % 2:
+        raise ValueError("random_regular needs n * d to be even")
+    rng = np.random.default_rng(seed)
+    stubs = rng.permutation(np.repeat(np.arange(n, dtype=np.int64), d))
+    return _simple(n, stubs.reshape(-1, 2))
+
+
+HEX_DIRECTIONS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1), (1, -1), (-1, 1)], dtype=np.int64)
+
+
+def hex_coordinates(n: int) -> np.ndarray:
+    """Axial (q, r) coordinates of the first n cells, in the same order as generate_hexagonal_network."""
+    size = math.ceil(math.sqrt(n))
+    q, r = np.meshgrid(np.arange(-size, size + 1), np.arange(-size, size + 1), indexing="ij")
+    q, r = q.ravel(), r.ravel()
+    keep = np.abs(q + r) <= size
+    return np.stack([q[keep], r[keep]], axis=1)[:n]
+
+
+def hex_positions(n: int) -> dict[str, list[float]]:
+    """Cartesian centers of the hexagonal grid's cells, keyed by node id."""
+    coords = hex_coordinates(n).astype(float)
+    x = math.sqrt(3) * (coords[:, 0] + coords[:, 1] / 2)
+    y = 1.5 * coords[:, 1]
+    return {node_id: [px, py] for node_id, px, py in zip(node_ids(len(coords)), x.tolist(), y.tolist())}
+
+
+def hexagonal(n: int) -> np.ndarray:
+    """Hexagonal grid in axial coordinates (degree up to 6)."""
+    coords = hex_coordinates(n)
+    size = math.ceil(math.sqrt(n))
+    width = 2 * size + 3
+    cell = np.full((width, width), -1, dtype=np.int64)
+    cell[coords[:, 0] + size + 1, coords[:, 1] + size + 1] = np.arange(len(coords))
+
+    sources, targets = [], []
+    for dq, dr in HEX_DIRECTIONS[::2]:
+        neighbor = cell[coords[:, 0] + dq + size + 1, coords[:, 1] + dr + size + 1]
+        present = neighbor >= 0
+        sources.append(np.arange(len(coords))[present])
+        targets.append(neighbor[present])
+    return _simple(n, np.stack([np.concatenate(sources), np.concatenate(targets)], axis=1))
+
+
+def torus(rows: int, cols: int, hexagonal: bool = True) -> np.ndarray:
+    """Grid with wrap-around; every node has degree 6 (hexagonal) or 4."""
+    i, j = np.meshgrid(np.arange(rows), np.arange(cols), indexing="ij")
+    i, j = i.ravel(), j.ravel()
+    node = i * cols + j
+    directions = [(0, 1), (1, 0)] + ([(1, -1)] if hexagonal else [])
+    targets = [((i + di) % rows) * cols + (j + dj) % cols for di, dj in directions]
+    sources = np.tile(node, len(directions))
+    return _simple(rows * cols, np.stack([sources, np.concatenate(targets)], axis=1))
+
+
+def enforce_degree_bounds(n: int, edges: np.ndarray, min_degree: int = 0, max_degree: int | None = None, seed: int | None = None) -> np.ndarray:
+    """
+    Make every degree fall within [min_degree, max_degree], as Graph.from_schema
+    requires. Edges are dropped at random where a node has too many and added
+    between nodes that still have room where it has too few.
+    """
+    rng = np.random.default_rng(seed)
+
+    if max_degree is not None and (degrees(n, edges) > max_degree).any():
+        degree = degrees(n, edges)
+        edges = edges[rng.permutation(len(edges))]
+        # Keep an edge only if it is among the first max_degree edges of both
+        # endpoints; only endpoints over the bound need to be ranked
+        endpoints = edges.ravel()
+        hot = np.flatnonzero(degree[endpoints] > max_degree)
+        order = hot[np.argsort(endpoints[hot], kind="stable")]
+        sorted_endpoints = endpoints[order]
+        rank = np.zeros(len(endpoints), dtype=np.int64)
+        rank[order] = np.arange(len(order)) - np.searchsorted(sorted_endpoints, sorted_endpoints, side="left")
+        rank = rank.reshape(-1, 2)
+        edges = edges[(rank[:, 0] < max_degree) & (rank[:, 1] < max_degree)]
+
+    cap = max_degree if max_degree is not None else n - 1
+    for _ in range(32):
+        degree = degrees(n, edges)
+        deficit = np.maximum(min_degree - degree, 0)
+        if not deficit.any():
+            break
+        # Pair each missing stub with a random node that still has spare capacity
+        stubs = np.repeat(np.arange(n, dtype=np.int64), deficit)
+        spare = np.flatnonzero(degree < cap)
+        if len(spare) == 0:
+            raise ValueError(f"Could not satisfy min_neighbors={min_degree} with max_neighbors={max_degree}: no node has room for another link")
+        partners = spare[rng.integers(0, len(spare), size=len(stubs))]
+        added = _simple(n, np.concatenate([edges, np.stack([stubs, partners], axis=1)]))
+        if max_degree is not None:
+            added = enforce_degree_bounds(n, added, 0, max_degree, seed=rng.integers(2**32))
+        edges = added
+    else:
+        raise ValueError(f"Could not satisfy min_neighbors={min_degree} with max_neighbors={max_degree}")
+    return edges
+
+
+def generate(model: str, n: int, degree: int = 4, beta: float = 0.1, seed: int | None = None) -> tuple[int, np.ndarray]:
+    """Run one of MODELS, returning the actual node count and the edge array."""
+    match model:
+        case "erdos_renyi":
+            return n, erdos_renyi(n, degree, seed=seed)
+        case "barabasi_albert":
+            return n, barabasi_albert(n, max(1, degree // 2), seed=seed)
+        case "watts_strogatz":
+            return n, watts_strogatz(n, degree - degree % 2, beta, seed=seed)
+        case "random_regular":
+            return n, random_regular(n, degree, seed=seed)
+        case "hexagonal":
+            return n, hexagonal(n)
+        case "torus":
+            side = math.isqrt(n)
+            return side * side, torus(side, side)
+        case _:
+            raise ValueError(f"Unknown topology model: {model}")
+
+
+def node_ids(n: int) -> list[str]:
+    return [f"n{i}" for i in range(1, n + 1)]
+
+
+def round_robin_resources(n: int, num_resources: int) -> np.ndarray:
+    """Holder position of each resource r1..rR, spread round-robin like the hexagonal example."""
+    return np.arange(num_resources, dtype=np.int64) % n
+
+
+def to_schema(n: int, edges: np.ndarray, holders: np.ndarray | None = None, min_neighbors: int = 0, max_neighbors: int | None = None, positions: dict[str, list[float]] | None = None) -> GraphSchema:
+    ids = node_ids(n)
+    resources: dict[str, list[str]] = {node_id: [] for node_id in ids}
+    if holders is not None:
+        for r, holder in enumerate(holders.tolist(), start=1):
+            resources[ids[holder]].append(f"r{r}")
+    return GraphSchema(
+        num_nodes=n,
+        min_neighbors=min_neighbors,
+        max_neighbors=max_neighbors if max_neighbors is not None else int(degrees(n, edges).max(initial=0)),
+        resources=resources,
+        edges=[[ids[u], ids[v]] for u, v in edges.tolist()],
+        positions=positions,
+    )
+
+
+def write_json(path: Path | str, n: int, edges: np.ndarray, holders: np.ndarray | None = None, min_neighbors: int = 0, max_neighbors: int | None = None, positions: dict[str, list[float]] | None = None) -> None:
+    schema = to_schema(n, edges, holders, min_neighbors, max_neighbors, positions)
+    with open(path, "w") as f:
+        json.dump(schema.to_dict(), f)
+
+
+def write_binary(path: Path | str, n: int, edges: np.ndarray, holders: np.ndarray | None = None, min_neighbors: int = 0, max_neighbors: int | None = None) -> None:
+    """Write straight to the snapshot format, without building a schema."""
+    from snapshot import write_snapshot
+
+    csr, _ = CSR.from_edges(node_ids(n), edges[:, 0], edges[:, 1])
+    holders = holders if holders is not None else np.empty(0, dtype=np.int64)
+    order = np.argsort(holders, kind="stable")
+    holdings_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(holders, minlength=n), out=holdings_indptr[1:])
+    write_snapshot(
+        path,
+        csr,
+        [f"r{r}" for r in range(1, len(holders) + 1)],
+        holdings_indptr,
+        order.astype(np.int32),
+        min_neighbors=min_neighbors,
+        max_neighbors=max_neighbors,
+    )
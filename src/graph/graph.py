@@ -1,31 +1,156 @@
+import sys
+from typing import TYPE_CHECKING
+
 from .schema import GraphSchema
 from .node import Node
 
+if TYPE_CHECKING:
+    from .csr import CSR
+
 
 class Graph:
     nodes: list[Node]
     neighbors: dict[str, list[Node]]
     edge_list: list[tuple[str, str]] | None
+    latency: dict[str, dict[str, float]]
+    bandwidth: dict[str, dict[str, float]]
+    positions: dict[str, list[float]] | None
 
-    def __init__(self, nodes: list[Node] | None = None, neighbors: dict[str, list[Node]] | None = None):
+    DEFAULT_LATENCY = 1.0
+
+    def __init__(self, nodes: list[Node] | None = None, neighbors: dict[str, list[Node]] | None = None, latency: dict[str, dict[str, float]] | None = None, bandwidth: dict[str, dict[str, float]] | None = None):
         # Recomenda-se que se utilize métodos de fábrica
         # para criar instâncias dessa classe, como o método from_schema.
-        self.nodes = nodes if nodes is not None else []
+        nodes = nodes if nodes is not None else []
+        self.nodes = nodes
         self.neighbors = neighbors if neighbors is not None else {}
+        self.latency = latency if latency is not None else {}
+        self.bandwidth = bandwidth if bandwidth is not None else {}
+        self.edge_list = None
+        self.positions = None
+        # Bumped by every change to nodes or links, so data derived from the
+        # topology elsewhere (e.g. cached route costs) can tell it is stale
+        self.topology_version = 0
+        # Position of each node in self.nodes, for O(1) lookups
+        self._index: dict[str, int] = {node.id: i for i, node in enumerate(nodes)}
 
     def __getitem__(self, name: str) -> Node | None:
-        for node in self.nodes:
-            if node.id == name:
-                return node
-        return None
+        i = self._index.get(name)
+        if i is None:
+            return None
+        return self.nodes[i]
 
     def __setitem__(self, name: str, value: Node) -> None:
-        for i, node in enumerate(self.nodes):
-            if node.id == name:
-                self.nodes[i] = value
-                return
+        i = self._index.get(name)
+        if i is not None:
+            self.nodes[i] = value
+            return
+        self._index[name] = len(self.nodes)
         self.nodes.append(value)
 
+    def add_link(self, source: str, target: str, latency: float | None = None, bandwidth: float | None = None) -> None:
+        """Link two nodes already in the graph; linking nodes that are already linked does nothing."""
+        if target in self.neighbors[source]:
+            return
+        self.neighbors[source].append(target)
+        self.neighbors[target].append(source)
+        if latency is not None:
+            self.latency.setdefault(source, {})[target] = latency
+            self.latency.setdefault(target, {})[source] = latency
+        if bandwidth is not None:
+            self.bandwidth.setdefault(source, {})[target] = bandwidth
+            self.bandwidth.setdefault(target, {})[source] = bandwidth
+        self.edge_list = None
+        self.topology_version += 1
+
+    def remove_link(self, source: str, target: str) -> None:
+        self.neighbors[source].remove(target)
+        self.neighbors[target].remove(source)
+        for attributes in (self.latency, self.bandwidth):
+            attributes.get(source, {}).pop(target, None)
+            attributes.get(target, {}).pop(source, None)
+        self.edge_list = None
+        self.topology_version += 1
+
+    def add_node(self, node: Node, links: list[str] = ()) -> None:
+        """Add a node linked to ``links``, in time proportional to its degree."""
+        if node.id in self._index:
+            raise ValueError(f"Node {node.id} is already in the graph")
+        self[node.id] = node
+        self.neighbors[node.id] = []
+        for neighbor in links:
+            self.add_link(node.id, neighbor)
+        self.edge_list = None
+        self.topology_version += 1
+
+    def remove_node(self, node_id: str) -> list[str]:
+        """
+        Remove a node and its links, in time proportional to the degrees of
+        the node and its neighbors. Returns the ids it was linked to.
+        """
+        i = self._index.pop(node_id, None)
+        if i is None:
+            raise ValueError(f"Node {node_id} is not in the graph")
+        # Move the last node into the gap instead of shifting the list
+        last = self.nodes.pop()
+        if last.id != node_id:
+            self.nodes[i] = last
+            self._index[last.id] = i
+        former = self.neighbors.pop(node_id)
+        for neighbor in former:
+            self.neighbors[neighbor].remove(node_id)
+        for attributes in (self.latency, self.bandwidth):
+            for neighbor in attributes.pop(node_id, {}):
+                attributes.get(neighbor, {}).pop(node_id, None)
+        self.edge_list = None
+        self.topology_version += 1
+        return former
+
+    def link_latency(self, source: str, target: str) -> float:
+        return self.latency.get(source, {}).get(target, self.DEFAULT_LATENCY)
+
+    def path_latency(self, path: list[str]) -> float:
+        return sum(self.link_latency(path[i], path[i + 1]) for i in range(len(path) - 1))
+
+    def to_csr(self) -> "CSR":
+        # numpy is only needed by the array-based tools, not by plain searches
+        from .csr import CSR
+        return CSR.from_neighbors(self.neighbors)
+
+    @staticmethod
+    def store_link_attributes(latency: dict[str, dict[str, float]], bandwidth: dict[str, dict[str, float]], edge: list) -> None:
+        attributes = GraphSchema.edge_attributes(edge)
+        if "latency" in attributes:
+            latency.setdefault(edge[0], {})[edge[1]] = attributes["latency"]
+            latency.setdefault(edge[1], {})[edge[0]] = attributes["latency"]
+        if "bandwidth" in attributes:
+            bandwidth.setdefault(edge[0], {})[edge[1]] = attributes["bandwidth"]
+            bandwidth.setdefault(edge[1], {})[edge[0]] = attributes["bandwidth"]
+
+    @staticmethod
+    def check_degree(node: str, degree: int, min_neighbors: int | None, max_neighbors: int | None) -> None:
+        if min_neighbors is not None and degree < min_neighbors:
+            raise ValueError(
+                f"Node {node} has less than min_neighbors ({min_neighbors})"
+            )
+        if max_neighbors is not None and degree > max_neighbors:
+            raise ValueError(
+                f"Node {node} has more than max_neighbors ({max_neighbors})"
+            )
+
+    def derive_edge_list(self) -> list[list[str]]:
+        """Edge list rebuilt from the adjacency, for graphs loaded without one."""
+        seen = set()
+        edges = []
+        for node, neighbors in self.neighbors.items():
+            for neighbor in neighbors:
+                if (neighbor, node) in seen:
+                    seen.discard((neighbor, node))
+                    continue
+                seen.add((node, neighbor))
+                edges.append([node, neighbor])
+        return edges
+
     @classmethod
     def from_schema(cls, schema: GraphSchema) -> "Graph":
         unique_nodes = set()
@@ -34,18 +159,18 @@ class Graph:
             unique_nodes.add(edge[1])
         nodes = [Node(id=name) for name in unique_nodes]
         neighbors = {node.id: [] for node in nodes}
+        latency: dict[str, dict[str, float]] = {}
+        bandwidth: dict[str, dict[str, float]] = {}
+        intern = sys.intern
         for edge in schema.edges:
-            neighbors[edge[0]].append(edge[1])
-            neighbors[edge[1]].append(edge[0])
+            # Share the nodes' interned ids instead of one string per occurrence
+            source, target = intern(edge[0]), intern(edge[1])
+            neighbors[source].append(target)
+            neighbors[target].append(source)
+            cls.store_link_attributes(latency, bandwidth, edge)
         for node in neighbors:
-            if len(neighbors[node]) < schema.min_neighbors:
-                raise ValueError(
-                    f"Node {node} has less than min_neighbors ({schema.min_neighbors})"
-                )
-            if len(neighbors[node]) > schema.max_neighbors:
-                raise ValueError(
-                    f"Node {node} has more than max_neighbors ({schema.max_neighbors})"
-                )
-        instance = cls(nodes=nodes, neighbors=neighbors)
+            cls.check_degree(node, len(neighbors[node]), schema.min_neighbors, schema.max_neighbors)
+        instance = cls(nodes=nodes, neighbors=neighbors, latency=latency, bandwidth=bandwidth)
         instance.edge_list = schema.edges
+        instance.positions = schema.positions
         return instance
@@ -1,5 +1,12 @@
+import sys
+
+
 class Node:
+    # No per-instance __dict__: at millions of nodes it outweighs the data
+    __slots__ = ("id",)
+
     id: str
 
     def __init__(self, id: str):
-        self.id = id
+        # One string object per id, shared with the adjacency and the caches
+        self.id = sys.intern(id)
@@ -6,8 +6,17 @@
     "resources": {
         "n1": ["str"]
     },
-    "edges": [["str", "str"]]
+    "edges": [["str", "str"], ["str", "str", {"latency": "float", "bandwidth": "float"}]],
+    "positions": {
+        "n1": ["float", "float"]
+    }
 }
+
+Each edge may carry an optional third element with link attributes. Missing
+latency counts as 1.0, so an unweighted graph behaves as hop count.
+
+"positions" is optional: native 2D coordinates of the nodes (e.g. of a grid),
+which the visualizer draws as they are instead of computing a layout.
 """
 
 from dataclasses import dataclass
@@ -21,6 +30,7 @@ class GraphSchema:
     max_neighbors: int
     resources: dict[str, list[str]]
     edges: list[list[str]]
+    positions: dict[str, list[float]] | None = None
 
     @classmethod
     def from_dict(cls, data: dict) -> "GraphSchema":
@@ -30,4 +40,26 @@ class GraphSchema:
             max_neighbors=data["max_neighbors"],
             resources=data["resources"],
             edges=data["edges"],
+            positions=data.get("positions"),
         )
+
+    def to_dict(self) -> dict:
+        """The JSON form; positions are left out when the network has none."""
+        data = dict(self.__dict__)
+        if data["positions"] is None:
+            del data["positions"]
+        return data
+
+    @staticmethod
+    def edge_attributes(edge: list) -> dict:
+        """Link attributes of an edge, or an empty dict for an unweighted one."""
+        if len(edge) < 3 or edge[2] is None:
+            return {}
+        attributes = edge[2]
+        if not isinstance(attributes, dict):
+            # Shorthand: ["n1", "n2", 5.0] is a latency of 5.0
+            attributes = {"latency": attributes}
+        for key in ("latency", "bandwidth"):
+            if key in attributes and attributes[key] < 0:
+                raise ValueError(f"Edge {edge[0]}-{edge[1]} has negative {key}")
+        return attributes
@@ -0,0 +1,166 @@
+"""
+Mergeable log-bucketed histograms for latency, hop and message counts.
+
+Bucket boundaries grow geometrically, so any recorded value is reproduced
+within a fixed relative error (1% by default) whatever its magnitude, with a
+few hundred buckets at most. Histograms with the same error can be merged
+exactly by adding bucket counts, so workers can record separately and combine
+at the end.
+"""
+import math
+from typing import Iterable
+
+
+class Histogram:
+    __slots__ = ("relative_error", "_gamma", "_log_gamma", "buckets", "zeros", "count", "total", "min", "max", "integers")
+
+    def __init__(self, relative_error: float = 0.01):
+        if not 0 < relative_error < 1:
+            raise ValueError(f"relative_error must be in (0, 1), got {relative_error}")
+        self.relative_error = relative_error
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # Hop and message counts are integers; their quantiles are rounded back
+        self.integers = True
+
+    def record(self, value: float, count: int = 1) -> None:
+        if value < 0:
+            raise ValueError(f"Histogram values must be non-negative, got {value}")
+        if value == 0:
+            self.zeros += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if self.integers and value != int(value):
+            self.integers = False
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram") -> None:
+        if other.relative_error != self.relative_error:
+            raise ValueError("Cannot merge histograms with different relative errors")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.integers = self.integers and other.integers
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float | None:
+        """Value at quantile q in [0, 1], or None if the histogram is empty."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be in [0, 1], got {q}")
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return 0.0
+        seen = self.zeros
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of (gamma^(i-1), gamma^i] in relative terms
+                value = min(max(2 * self._gamma ** index / (self._gamma + 1), self.min), self.max)
+                return float(round(value)) if self.integers else value
+        return self.max
+
+    def percentiles(self, quantiles: Iterable[float] = (0.5, 0.9, 0.99, 0.999)) -> dict[str, float | None]:
+        return {f"p{q * 100:g}": self.quantile(q) for q in quantiles}
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_error": self.relative_error,
+            "buckets": {str(index): count for index, count in sorted(self.buckets.items())},
+            "zeros": self.zeros,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "integers": self.integers,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        histogram = cls(data["relative_error"])
+        histogram.buckets = {int(index): count for index, count in data["buckets"].items()}
+        histogram.zeros = data["zeros"]
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.integers = data.get("integers", False)
+        if histogram.count:
+            histogram.min = data["min"]
+            histogram.max = data["max"]
+        return histogram
+
+
+class HistogramRecorder:
+    """One Histogram per (metric, search method, cache mode)."""
+
+    def __init__(self, relative_error: float = 0.01):
+        self.relative_error = relative_error
+        self.histograms: dict[tuple[str, str, bool], Histogram] = {}
+
+    def histogram(self, metric: str, method: str, use_cache: bool) -> Histogram:
+        key = (metric, method, use_cache)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.relative_error)
+        return histogram
+
+    def record(self, method: str, use_cache: bool, **values: float | None) -> None:
+        """Record several metrics of one query, e.g. record("bfs", True, time_ms=0.4, steps=3)."""
+        for metric, value in values.items():
+            if value is not None:
+                self.histogram(metric, method, use_cache).record(value)
+
+    def merge(self, other: "HistogramRecorder") -> None:
+        for (metric, method, use_cache), histogram in other.histograms.items():
+            self.histogram(metric, method, use_cache).merge(histogram)
+
+    def percentile_table(self, quantiles: Iterable[float] = (0.5, 0.9, 0.99, 0.999)) -> list[dict]:
+        quantiles = tuple(quantiles)
+        rows = []
+        for (metric, method, use_cache), histogram in sorted(self.histograms.items()):
+            rows.append({
+                "metric": metric,
+                "search_method": method,
+                "use_cache": use_cache,
+                "count": histogram.count,
+                "mean": histogram.mean,
+                **histogram.percentiles(quantiles),
+                "max": histogram.max,
+            })
+        return rows
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_error": self.relative_error,
+            "histograms": [
+                {"metric": metric, "search_method": method, "use_cache": use_cache, **histogram.to_dict()}
+                for (metric, method, use_cache), histogram in sorted(self.histograms.items())
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HistogramRecorder":
+        recorder = cls(data["relative_error"])
+        for entry in data["histograms"]:
+            key = (entry["metric"], entry["search_method"], entry["use_cache"])
+            recorder.histograms[key] = Histogram.from_dict(entry)
+        return recorder
@@ -1,13 +1,23 @@
 import json
+import re
 
-from graph import Graph
+from graph import Graph, Node
 from graph import GraphSchema
 
 from network import Network, NetworkNode
 
 
+def _is_snapshot(path) -> bool:
+    # Imported lazily: snapshots need numpy, JSON networks do not
+    from snapshot import is_snapshot
+    return is_snapshot(path)
+
+
 class GraphLoader:
     def load(self, path):
+        if _is_snapshot(path):
+            from snapshot import Snapshot, SnapshotGraph
+            return SnapshotGraph(Snapshot(path))
         with open(path, "r") as f:
             data = json.load(f)
         graph_schema = GraphSchema.from_dict(data)
@@ -16,8 +26,197 @@ class GraphLoader:
 
 class NetworkLoader:
     def load(self, path):
+        if _is_snapshot(path):
+            from snapshot import load_snapshot
+            return load_snapshot(path)
         with open(path, "r") as f:
             data = json.load(f)
         graph_schema = GraphSchema.from_dict(data)
         network = Network.from_schema(graph_schema)
         return network
+
+
+class _JSONStream:
+    """
+    Minimal pull parser over a JSON file read in chunks. It walks the
+    containers of the network schema and hands back one small value (an
+    edge, a resource list, a scalar) at a time.
+    """
+
+    WHITESPACE = " \t\n\r"
+    # What skip() has to look at inside and outside of strings
+    STRUCTURE = re.compile(r'["{}\[\]]')
+    STRING_END = re.compile(r'["\\]')
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid network JSON: expected '{char}', found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def skip(self) -> None:
+        """
+        Step over the value here without building it. value() would decode a
+        large container again after every chunk; this scans it once.
+        """
+        if self.peek() not in "{[":
+            self.value()
+            return
+        depth = 0
+        in_string = False
+        while True:
+            match = (self.STRING_END if in_string else self.STRUCTURE).search(self.buffer, self.pos)
+            # An escape at the very end needs the next chunk to skip its character
+            if match is None or (match.group() == "\\" and match.end() == len(self.buffer)):
+                self.pos = len(self.buffer) if match is None else match.start()
+                if not self._fill():
+                    raise ValueError("Invalid network JSON: unexpected end of file")
+                continue
+            char = match.group()
+            self.pos = match.end()
+            if in_string:
+                if char == "\\":
+                    self.pos += 1
+                else:
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def items(self, close: str):
+        """Iterate the members of the container just opened, up to ``close``."""
+        if self.peek() == close:
+            self.pos += 1
+            return
+        while True:
+            yield
+            separator = self.peek()
+            self.pos += 1
+            if separator == close:
+                return
+            if separator != ",":
+                raise ValueError(f"Invalid network JSON: expected ',' or '{close}', found '{separator}'")
+
+
+class StreamingNetworkLoader:
+    """
+    Network loader for very large JSON topologies. ``edges``, ``resources``
+    and ``positions`` are read incrementally in chunks and go straight into
+    the graph; the raw edge list is never kept. max_neighbors is enforced while edges arrive
+    and min_neighbors once they are all in, without another pass.
+    """
+
+    def __init__(self, chunk_size: int = 1 << 20):
+        self.chunk_size = chunk_size
+
+    def load(self, path) -> Network:
+        neighbors: dict[str, list[str]] = {}
+        latency: dict[str, dict[str, float]] = {}
+        bandwidth: dict[str, dict[str, float]] = {}
+        resources: dict[str, list[str]] = {}
+        positions: dict[str, list[float]] | None = None
+        header: dict = {}
+        ids: dict[str, str] = {}
+
+        with open(path, "r") as f:
+            stream = _JSONStream(f, self.chunk_size)
+            stream.expect("{")
+            for _ in stream.items("}"):
+                key = stream.value()
+                stream.expect(":")
+                if key == "edges":
+                    stream.expect("[")
+                    max_neighbors = header.get("max_neighbors")
+                    for _ in stream.items("]"):
+                        edge = stream.value()
+                        # Share one string per id instead of one per occurrence
+                        source = ids.setdefault(edge[0], edge[0])
+                        target = ids.setdefault(edge[1], edge[1])
+                        for node, other in ((source, target), (target, source)):
+                            node_neighbors = neighbors.get(node)
+                            if node_neighbors is None:
+                                node_neighbors = neighbors[node] = []
+                            node_neighbors.append(other)
+                            if max_neighbors is not None and len(node_neighbors) > max_neighbors:
+                                Graph.check_degree(node, len(node_neighbors), None, max_neighbors)
+                        if len(edge) > 2:
+                            Graph.store_link_attributes(latency, bandwidth, edge)
+                elif key == "resources":
+                    stream.expect("{")
+                    for _ in stream.items("}"):
+                        node_id = stream.value()
+                        stream.expect(":")
+                        resources[ids.setdefault(node_id, node_id)] = stream.value()
+                elif key == "positions" and stream.peek() == "{":
+                    positions = {}
+                    stream.expect("{")
+                    for _ in stream.items("}"):
+                        node_id = stream.value()
+                        stream.expect(":")
+                        positions[ids.setdefault(node_id, node_id)] = stream.value()
+                elif stream.peek() in "{[":
+                    # Nothing else in the schema is a container; don't decode what is unused
+                    stream.skip()
+                else:
+                    header[key] = stream.value()
+
+        for key in ("min_neighbors", "max_neighbors"):
+            if key not in header:
+                raise ValueError(f"Invalid network JSON: missing '{key}'")
+        # Bounds that appeared after the edges could not be checked on the fly
+        for node, node_neighbors in neighbors.items():
+            Graph.check_degree(node, len(node_neighbors), header["min_neighbors"], header["max_neighbors"])
+
+        nodes = [NetworkNode(node_id, resources[node_id]) if node_id in resources else Node(id=node_id) for node_id in neighbors]
+        nodes.extend(NetworkNode(node_id, res_list) for node_id, res_list in resources.items() if node_id not in neighbors)
+        graph = Graph(nodes=nodes, neighbors=neighbors, latency=latency, bandwidth=bandwidth)
+        graph.positions = positions
+        return Network(graph)
@@ -1,15 +1,89 @@
 from config import Config
 from loader import NetworkLoader
-from cache import Cache
-from pathlib import Path
 import json
 
-from visualization.network import NetworkVisualizer
+from result import SearchResult
+from tracing import Tracer
+from metrics import MetricsRegistry
+from memory import network_footprint, peak_memory
+from session import FetchSession, load_queries
 
 
-def example(case_index: int = 1, search_method: str = "bfs", requester_id: str | None = None, resource: str | None = None, ttl: int | None = None, use_cache: bool = False, cache_file: str | None = None, visualize: bool = False):
-    if requester_id is None or resource is None:
-        raise ValueError("requester_id and resource must be provided for the example function.")
+def print_stats(result: SearchResult):
+    print(
+        f"Mensagens: {result.messages}, nós visitados: {result.nodes_visited}, "
+        f"duplicatas suprimidas: {result.duplicates_suppressed}, "
+        f"cache: {result.cache_hits}/{result.cache_probes} acertos, "
+        f"tempo: {result.elapsed * 1000:.3f} ms"
+    )
+
+
+def save_memory_report(path: str, network, search_method: str, peak_bytes: int):
+    report = {
+        "search_method": search_method,
+        "peak_bytes": peak_bytes,
+        "network": network_footprint(network),
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Pico de memória da busca: {peak_bytes} bytes; rede: {report['network']['per_node_bytes']:.0f} bytes/nó")
+    print(f"Relatório de memória salvo em {path}")
+
+
+def run_queries(network, queries_file: str, search_method: str, ttl: int | None, use_cache: bool, cache_file: str | None, tracer: Tracer | None, metrics: MetricsRegistry | None) -> list[SearchResult]:
+    """Every query in queries_file, in one FetchSession: the cache is loaded once and flushed when dirty."""
+    if ttl is None:
+        raise ValueError("TTL must be specified for fetch operation")
+    queries = list(load_queries(queries_file))
+    results = []
+    with FetchSession(network, ttl, search_method, use_cache=use_cache, cache_file=cache_file, tracer=tracer, metrics=metrics) as session:
+        for (requester_id, resource, *method), result in zip(queries, session.run(queries)):
+            print(f"Resource {resource} found by {requester_id} using {method[0] if method else search_method}: {result.path}")
+            results.append(result)
+    found = sum(result.found for result in results)
+    elapsed = sum(result.elapsed for result in results)
+    print(
+        f"Consultas: {len(results)}, encontradas: {found}, "
+        f"cache: {sum(result.cache_hits for result in results)}/{sum(result.cache_probes for result in results)} acertos, "
+        f"escritas do cache: {session.flushes}, tempo total: {elapsed * 1000:.3f} ms"
+    )
+    return results
+
+
+def run(network, search_method: str, requester_id: str | None, resource: str | None, ttl: int | None, use_cache: bool, cache_file: str | None, visualize: bool, trace_file: str | None, metrics_file: str | None, memory_file: str | None, render_file: str | None, render_every: int, queries_file: str | None = None):
+    if visualize or render_file:
+        visualizer = network.create_visualizer()
+    # The visualizer's tracer already records the search; export that one
+    tracer = visualizer.tracer if visualize or render_file else Tracer() if trace_file else None
+    metrics = MetricsRegistry() if metrics_file else None
+    def fetch():
+        if queries_file:
+            return run_queries(network, queries_file, search_method, ttl, use_cache, cache_file, tracer, metrics)
+        return network.fetch(requester_id, resource, search_method=search_method, ttl=ttl, use_cache=use_cache, cache_file=cache_file, tracer=tracer, metrics=metrics)
+    if memory_file:
+        result, peak_bytes = peak_memory(fetch)
+        save_memory_report(memory_file, network, search_method, peak_bytes)
+    else:
+        result = fetch()
+    if trace_file:
+        tracer.export(trace_file)
+        print(f"Trace salvo em {trace_file}")
+    if metrics:
+        metrics.write(metrics_file)
+        print(f"Métricas salvas em {metrics_file}")
+    if render_file:
+        frames = visualizer.render(render_file, every=render_every)
+        print(f"{frames} quadros renderizados em {render_file}")
+    if visualize:
+        visualizer.play()
+    if not queries_file:
+        print(f"Resource {resource} found by {requester_id} using {search_method}: {result.path}")
+        print_stats(result)
+
+
+def example(case_index: int = 1, search_method: str = "bfs", requester_id: str | None = None, resource: str | None = None, ttl: int | None = None, use_cache: bool = False, cache_file: str | None = None, visualize: bool = False, trace_file: str | None = None, metrics_file: str | None = None, memory_file: str | None = None, render_file: str | None = None, render_every: int = 1, queries_file: str | None = None):
+    if queries_file is None and (requester_id is None or resource is None):
+        raise ValueError("requester_id and resource (or queries_file) must be provided for the example function.")
     case_path = ""
     match case_index:
         case 1:
@@ -25,21 +99,11 @@ def example(case_index: int = 1, search_method: str = "bfs", requester_id: str |
             print(f"Caso de exemplo {case_index} não encontrado.")
             return
     network = NetworkLoader().load(case_path)
-    if visualize:
-        visualizer = network.create_visualizer()
-    found = network.fetch(requester_id, resource, search_method=search_method, ttl=ttl, use_cache=use_cache, cache_file=cache_file)
-    if visualize:
-        visualizer.play()
-    print(f"Resource {resource} found by {requester_id} using {search_method}: {found}")
+    run(network, search_method, requester_id, resource, ttl, use_cache, cache_file, visualize, trace_file, metrics_file, memory_file, render_file, render_every, queries_file)
 
-def case(case_path: str, search_method: str = "bfs", requester_id: str | None = None, resource: str | None = None, ttl: int | None = None, use_cache: bool = False, cache_file: str | None = None, visualize: bool = False):
-    if requester_id is None or resource is None:
-        raise ValueError("requester_id and resource must be provided for the case function.")
+def case(case_path: str, search_method: str = "bfs", requester_id: str | None = None, resource: str | None = None, ttl: int | None = None, use_cache: bool = False, cache_file: str | None = None, visualize: bool = False, trace_file: str | None = None, metrics_file: str | None = None, memory_file: str | None = None, render_file: str | None = None, render_every: int = 1, queries_file: str | None = None):
+    if queries_file is None and (requester_id is None or resource is None):
+        raise ValueError("requester_id and resource (or queries_file) must be provided for the case function.")
     print(f"Executando o caso específico: {case_path}...")
     network = NetworkLoader().load(case_path)
-    if visualize:
-        visualizer = network.create_visualizer()
-    found = network.fetch(requester_id, resource, search_method=search_method, ttl=ttl, use_cache=use_cache, cache_file=cache_file)
-    if visualize:
-        visualizer.play()
-    print(f"Resource {resource} found by {requester_id} using {search_method}: {found}")
+    run(network, search_method, requester_id, resource, ttl, use_cache, cache_file, visualize, trace_file, metrics_file, memory_file, render_file, render_every, queries_file)
@@ -0,0 +1,163 @@
+"""
+Memory accounting for networks, caches and searches.
+
+Two complementary measures:
+
+- ``deep_sizeof`` walks an object graph and adds up ``sys.getsizeof`` of
+  everything reachable, counting shared objects once. It answers "how much
+  does this structure keep resident".
+- ``peak_memory`` runs a callable under tracemalloc and reports the highest
+  allocation above the starting point. It answers "how much does one search
+  need while it runs", including temporaries freed before it returns.
+"""
+import sys
+import tracemalloc
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+if TYPE_CHECKING:
+    from cache import Cache
+    from network import Network
+
+T = TypeVar("T")
+
+# Leaves: sized, never followed
+_ATOMIC = (str, bytes, int, float, complex, bool, type(None), range)
+# Code and classes belong to the program, not to the data structure
+_SKIPPED = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def deep_sizeof(obj: object, seen: set[int] | None = None) -> int:
+    """
+    Bytes of ``obj`` and everything it references. Objects whose id is in
+    ``seen`` are skipped and every object sized is added to it, so passing the
+    same set to several calls splits shared objects between them without
+    counting them twice.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, _ATOMIC):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        else:
+            attributes = getattr(current, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            for cls in type(current).__mro__:
+                for slot in cls.__dict__.get("__slots__", ()):
+                    if hasattr(current, slot):
+                        stack.append(getattr(current, slot))
+    return total
+
+
+def peak_memory(run: Callable[[], T]) -> tuple[T, int]:
+    """
+    Call ``run`` and return its result with the peak number of bytes it had
+    allocated at once. If tracemalloc is already tracing (e.g. around a whole
+    benchmark), it is reused, which avoids restarting it for every call.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+    return result, max(0, peak - baseline)
+
+
+class _DictNode:
+    """A node as laid out before slots and resource bitsets, to measure what they save."""
+
+    def __init__(self, id: str, resources):
+        self.id = id
+        self.seen_packets = set()
+        # Loaders stored the list read from JSON
+        self.resources = list(resources)
+        # Allocated for every node, though searches keep their own duplicate state
+        self.seen_messages = set()
+
+
+def node_layout_savings(network: "Network", sample: int = 1000) -> dict:
+    """
+    Bytes per node of the current node objects against the old layout (a
+    ``__dict__``, a list of resource names and the unused ``seen_packets``
+    and ``seen_messages`` sets), over the first ``sample`` nodes.
+    """
+    nodes = network.graph.nodes[:sample]
+    current = legacy = 0
+    for node in nodes:
+        current += deep_sizeof(node)
+        legacy += deep_sizeof(_DictNode(node.id, getattr(node, "resources", ())))
+    n = len(nodes)
+    return {
+        "sampled_nodes": n,
+        "legacy_per_node_bytes": legacy / n if n else 0.0,
+        "per_node_bytes": current / n if n else 0.0,
+        "saved_per_node_bytes": (legacy - current) / n if n else 0.0,
+    }
+
+
+def network_footprint(network: "Network") -> dict:
+    """
+    Resident bytes of each part of a network, in total and per node.
+
+    Parts are sized in the order listed and share one ``seen`` set, so an
+    object referenced from several parts (node ids, above all) is charged to
+    the first one: the node objects.
+    """
+    graph = network.graph
+    n = len(graph.nodes)
+    seen: set[int] = set()
+    parts = {}
+    # The packed bitsets (or sets of names), not the decoded ``resources`` view
+    parts["resources"] = sum(
+        deep_sizeof(getattr(node, "_resources", ()), seen) + deep_sizeof(getattr(node, "_offset", 0), seen)
+        for node in graph.nodes
+    )
+    parts["nodes"] = deep_sizeof(graph.nodes, seen)
+    parts["adjacency"] = deep_sizeof(graph.neighbors, seen)
+    parts["index"] = deep_sizeof(graph._index, seen)
+    parts["links"] = deep_sizeof([graph.latency, graph.bandwidth, graph.edge_list], seen)
+    parts["resource_index"] = deep_sizeof(network._resource_index, seen)
+    total = sum(parts.values())
+    return {
+        "nodes": n,
+        "bytes": total,
+        "per_node_bytes": total / n if n else 0.0,
+        "parts": parts,
+        "per_node": {name: size / n if n else 0.0 for name, size in parts.items()},
+    }
+
+
+def cache_footprint(cache: "Cache") -> dict:
+    """Resident bytes of a cache's routes and route costs, per node and per entry."""
+    entries = sum(len(routes) for routes in cache.nodes.values())
+    routes = deep_sizeof(cache.nodes)
+    costs = deep_sizeof(cache.costs)
+    total = routes + costs
+    return {
+        "nodes": len(cache.nodes),
+        "entries": entries,
+        "bytes": total,
+        "routes_bytes": routes,
+        "costs_bytes": costs,
+        "per_node_bytes": total / len(cache.nodes) if cache.nodes else 0.0,
+        "per_entry_bytes": total / entries if entries else 0.0,
+    }
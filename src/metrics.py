@@ -0,0 +1,263 @@
+"""
+Counters, gauges and histograms for long-running search sessions.
+
+A MetricsRegistry holds metric families; each family has fixed label names and
+one child per combination of label values. Histograms reuse the log-bucketed
+``histogram.Histogram`` and are exported as OpenMetrics summaries (quantiles
+plus _sum and _count). The registry renders OpenMetrics text, writes it to a
+file, or serves it on localhost over HTTP.
+
+Instrumentation records once per search, cache operation or fetch, never
+inside a traversal loop, and only when a registry was passed in.
+"""
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+from histogram import Histogram
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+    from result import SearchResult
+
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        if amount < 0:
+            raise ValueError(f"Counters can only increase, got {amount}")
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class MetricFamily:
+    def __init__(self, name: str, kind: str, help: str, labels: Iterable[str] = (), unit: str | None = None, relative_error: float = 0.01):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.label_names = tuple(labels)
+        self.unit = unit
+        self.relative_error = relative_error
+        self.children: dict[tuple[str, ...], Counter | Gauge | Histogram] = {}
+
+    def labels(self, *values: str) -> Counter | Gauge | Histogram:
+        """Child for these label values, in the order of ``label_names``."""
+        # Stored as text, so non-str values must find the same child
+        key = tuple(map(str, values))
+        child = self.children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            if self.kind == "counter":
+                child = Counter()
+            elif self.kind == "gauge":
+                child = Gauge()
+            else:
+                child = Histogram(self.relative_error)
+            child = self.children.setdefault(key, child)
+        return child
+
+    def _label_text(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        kind = "summary" if self.kind == "histogram" else self.kind
+        lines = [f"# TYPE {self.name} {kind}"]
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        lines.append(f"# HELP {self.name} {_escape(self.help)}")
+        for values, child in sorted(self.children.items()):
+            if self.kind == "counter":
+                lines.append(f"{self.name}_total{self._label_text(values)} {_number(child.value)}")
+            elif self.kind == "gauge":
+                lines.append(f"{self.name}{self._label_text(values)} {_number(child.value)}")
+            else:
+                for q in QUANTILES:
+                    value = child.quantile(q)
+                    if value is not None:
+                        quantile = f'quantile="{q:g}"'
+                        lines.append(f"{self.name}{self._label_text(values, quantile)} {_number(value)}")
+                lines.append(f"{self.name}_sum{self._label_text(values)} {_number(child.total)}")
+                lines.append(f"{self.name}_count{self._label_text(values)} {child.count}")
+        return lines
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Metric families by name. Asking twice for the same name returns the same
+    family, so several components can share one registry.
+
+    Updates from instrumentation go through ``lock``; rendering takes it too,
+    so a scrape never sees half of an observation.
+    """
+
+    def __init__(self, relative_error: float = 0.01):
+        self.relative_error = relative_error
+        self.families: dict[str, MetricFamily] = {}
+        self.lock = threading.Lock()
+
+    def _family(self, name: str, kind: str, help: str, labels: Iterable[str], unit: str | None) -> MetricFamily:
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = MetricFamily(name, kind, help, labels, unit, self.relative_error)
+        elif family.kind != kind or family.label_names != tuple(labels):
+            raise ValueError(f"Metric {name} already registered as a {family.kind} with labels {family.label_names}")
+        return family
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = (), unit: str | None = None) -> MetricFamily:
+        return self._family(name, "counter", help, labels, unit)
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = (), unit: str | None = None) -> MetricFamily:
+        return self._family(name, "gauge", help, labels, unit)
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (), unit: str | None = None) -> MetricFamily:
+        return self._family(name, "histogram", help, labels, unit)
+
+    def to_openmetrics(self) -> str:
+        with self.lock:
+            lines = [line for _, family in sorted(self.families.items()) for line in family.render()]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path | str) -> None:
+        Path(path).write_text(self.to_openmetrics())
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """
+        Serve the metrics at http://host:port/metrics from a daemon thread.
+        Port 0 picks a free port (see ``server.server_address``); stop with
+        ``server.shutdown()``.
+        """
+        # Only the served mode pays for http.server (and email, html, ...)
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.to_openmetrics().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class SearchMetrics:
+    """Per-method search metrics, recorded from the SearchResult of each search."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.searches = registry.counter("search_queries", "Searches run.", ("method", "found"))
+        self.cache_probes = registry.counter("search_cache_probes", "Cache lookups made by searches.", ("method",))
+        self.cache_hits = registry.counter("search_cache_hits", "Cache lookups that returned a route.", ("method",))
+        self.duplicates = registry.counter("search_duplicates_suppressed", "Deliveries dropped as duplicates.", ("method",))
+        self.messages = registry.histogram("search_messages", "Query messages sent per search.", ("method",))
+        self.visited = registry.histogram("search_nodes_visited", "Nodes that checked for the resource per search.", ("method",))
+        self.hops = registry.histogram("search_hops", "Length of the path found, in hops.", ("method",))
+        self.duration = registry.histogram("search_duration_seconds", "Wall time per search.", ("method",), unit="seconds")
+
+    def observe(self, method: str, result: "SearchResult") -> None:
+        with self.registry.lock:
+            self.searches.labels(method, "true" if result.path is not None else "false").inc()
+            if result.cache_probes:
+                self.cache_probes.labels(method).inc(result.cache_probes)
+                self.cache_hits.labels(method).inc(result.cache_hits)
+            if result.duplicates_suppressed:
+                self.duplicates.labels(method).inc(result.duplicates_suppressed)
+            self.messages.labels(method).record(result.messages)
+            self.visited.labels(method).record(result.nodes_visited)
+            if result.path is not None:
+                self.hops.labels(method).record(len(result.path) - 1)
+            self.duration.labels(method).record(result.elapsed)
+
+
+class CacheMetrics:
+    """Timings of Cache.update/follow/flush, plus entry counts and bytes written."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.operations = registry.histogram("cache_operation_seconds", "Wall time of cache operations.", ("operation",), unit="seconds")
+        self.follow_results = registry.counter("cache_follows", "Cached routes followed.", ("valid",))
+        self.entries = registry.gauge("cache_entries", "Routes stored in the cache at the last flush.")
+        self.nodes = registry.gauge("cache_nodes", "Nodes with at least one cached route at the last flush.")
+        self.bytes_written = registry.counter("cache_written_bytes", "Bytes written to the cache file.", unit="bytes")
+
+    def observe_update(self, seconds: float) -> None:
+        with self.registry.lock:
+            self.operations.labels("update").record(seconds)
+
+    def observe_follow(self, seconds: float, valid: bool) -> None:
+        with self.registry.lock:
+            self.operations.labels("follow").record(seconds)
+            self.follow_results.labels("true" if valid else "false").inc()
+
+    def observe_flush(self, seconds: float, bytes_written: int, nodes: int, entries: int) -> None:
+        with self.registry.lock:
+            self.operations.labels("flush").record(seconds)
+            self.bytes_written.labels().inc(bytes_written)
+            self.nodes.labels().set(nodes)
+            self.entries.labels().set(entries)
+
+
+class CoalesceMetrics:
+    """Outcomes of coalesced fetches (leader, hit, merge, fallback) and how long followers waited."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.fetches = registry.counter("coalesce_fetches", "Fetches by coalescing outcome.", ("outcome",))
+        self.wait = registry.histogram("coalesce_wait_seconds", "Time a coalesced fetch waited for its leader.", unit="seconds")
+
+    def observe(self, outcome: str) -> None:
+        with self.registry.lock:
+            self.fetches.labels(outcome).inc()
+
+    def observe_wait(self, seconds: float) -> None:
+        with self.registry.lock:
+            self.wait.labels().record(seconds)
@@ -1,28 +1,40 @@
+from typing import TYPE_CHECKING, Iterable
+
 from graph import Graph, GraphSchema
-from visualization.network import NetworkVisualizer
 from .network_node import NetworkNode
 from search import NetworkSearch
+from result import SearchResult
+from tracing import Tracer
+from metrics import MetricsRegistry
 from cache import Cache
 from pathlib import Path
 import json
+import time
+
+if TYPE_CHECKING:
+    # matplotlib and networkx load only once a visualizer is created
+    from visualization.network import NetworkVisualizer
 
 
 class Network:
     graph: Graph
-    visualizer: NetworkVisualizer | None
+    visualizer: "NetworkVisualizer | None"
 
-    def __init__(self, graph: Graph, visualizer: NetworkVisualizer | None = None):
+    def __init__(self, graph: Graph, visualizer: "NetworkVisualizer | None" = None):
         self.graph = graph
         self.visualizer = visualizer
+        self._resource_index: dict[str, set[str]] | None = None
 
     def __getitem__(self, name: str) -> Graph:
         return self.graph[name]
 
     def __setitem__(self, name: str, value: NetworkNode) -> None:
         self.graph[name] = value
+        self._resource_index = None
 
     def create_visualizer(self):
-        visualizer = NetworkVisualizer(self.edge_list)
+        from visualization.network import NetworkVisualizer
+        visualizer = NetworkVisualizer(self.edge_list, positions=self.graph.positions)
         self.visualizer = visualizer
         return self.visualizer
 
@@ -30,10 +42,78 @@ class Network:
     def neighbors(self) -> dict[str, list[str]]:
         return self.graph.neighbors
 
+    def path_latency(self, path: list[str]) -> float:
+        return self.graph.path_latency(path)
+
     @property
     def edge_list(self) -> list[list[str, str]] | None:
+        if self.graph.edge_list is None:
+            return self.graph.derive_edge_list()
         return self.graph.edge_list
 
+    @property
+    def resource_index(self) -> dict[str, set[str]]:
+        """Map of resource -> ids of the nodes holding it, built on first use."""
+        if self._resource_index is None:
+            index: dict[str, set[str]] = {}
+            for node in self.graph.nodes:
+                for resource in getattr(node, "resources", ()):
+                    index.setdefault(resource, set()).add(node.id)
+            self._resource_index = index
+        return self._resource_index
+
+    def holders(self, resource: str) -> set[str]:
+        return self.resource_index.get(resource, set())
+
+    def place_resources(self, resources: dict[str, list[str]]) -> None:
+        """Replace the resources held by each node, e.g. with a replica placement."""
+        for node_id in list(self.neighbors):
+            self.graph[node_id] = NetworkNode(node_id, set(resources.get(node_id, [])))
+        self._resource_index = None
+
+    # Incremental updates for churn: each costs time proportional to the
+    # node's degree and resources, and keeps the resource index current
+    # instead of dropping it
+
+    def _index_resources(self, node_id: str, resources: frozenset[str], add: bool) -> None:
+        if self._resource_index is None:
+            return
+        for resource in resources:
+            if add:
+                self._resource_index.setdefault(resource, set()).add(node_id)
+            else:
+                holders = self._resource_index.get(resource)
+                if holders is not None:
+                    holders.discard(node_id)
+                    if not holders:
+                        del self._resource_index[resource]
+
+    def join(self, node_id: str, resources: Iterable[str] = (), links: list[str] = ()) -> None:
+        """Add a peer holding ``resources``, linked to the peers in ``links``."""
+        node = NetworkNode(node_id, resources)
+        self.graph.add_node(node, links)
+        self._index_resources(node_id, node.resources, add=True)
+
+    def leave(self, node_id: str) -> tuple[frozenset[str], list[str]]:
+        """Remove a peer and its links; returns what it held and who it was linked to."""
+        node = self.graph[node_id]
+        if node is None:
+            raise ValueError(f"Node {node_id} is not in the network")
+        resources = getattr(node, "resources", frozenset())
+        self._index_resources(node_id, resources, add=False)
+        return resources, self.graph.remove_node(node_id)
+
+    def set_resources(self, node_id: str, resources: Iterable[str]) -> None:
+        """Replace what one peer holds, updating only its entries in the index."""
+        node = self.graph[node_id]
+        if node is None:
+            raise ValueError(f"Node {node_id} is not in the network")
+        updated = NetworkNode(node_id, resources)
+        before = getattr(node, "resources", frozenset())
+        self._index_resources(node_id, before - updated.resources, add=False)
+        self._index_resources(node_id, updated.resources - before, add=True)
+        self.graph[node_id] = updated
+
     @classmethod
     def from_schema(cls, schema: GraphSchema) -> "Network":
         graph = Graph.from_schema(schema)
@@ -46,12 +126,19 @@ class Network:
     def __repr__(self) -> str:
         return f"Network(graph={self.graph})"
 
-    def fetch(self, requester_id: str, resource: str, search_method: str = "flood", ttl: int | None = None, use_cache: bool = False, cache_file: str | None = None) -> bool:
+    def fetch(self, requester_id: str, resource: str, search_method: str = "flood", ttl: int | None = None, use_cache: bool = False, cache_file: str | None = None, tracer: Tracer | None = None, metrics: MetricsRegistry | None = None, cache: Cache | None = None) -> SearchResult:
+        """
+        Run one search from requester_id. With ``cache``, the search uses that
+        (possibly shared) cache instead of loading ``cache_file``; use_cache
+        is then implied.
+        """
         if ttl is None:
             raise ValueError("TTL must be specified for fetch operation")
 
-        cache = None
-        if use_cache:
+        start_time = time.perf_counter()
+
+        use_cache = use_cache or cache is not None
+        if use_cache and cache is None:
             if cache_file is None:
                 cache_file = "cache.json"
             cache_path = Path(cache_file)
@@ -63,9 +150,9 @@ class Network:
             else:
                 cache_data = {}
 
-            cache = Cache(nodes=cache_data, file_path=cache_path, network=self)
+            cache = Cache(nodes=cache_data, file_path=cache_path, network=self, metrics=metrics)
 
-        network_search = NetworkSearch(self, ttl, cache=cache, visualize_step_function=self.visualizer.add_step if self.visualizer else None)
+        network_search = NetworkSearch(self, ttl, cache=cache, tracer=tracer if tracer is not None else (self.visualizer.tracer if self.visualizer else None), metrics=metrics)
         match search_method:
             case "bfs":
                 path = network_search.bfs(requester_id, resource, use_cache=use_cache)
@@ -77,6 +164,14 @@ class Network:
                 path = network_search.flood_parallel(requester_id, resource, use_cache=use_cache)
             case "flood":
                 path = network_search.flood(requester_id, resource, use_cache=use_cache)
+            case "dijkstra":
+                path = network_search.dijkstra(requester_id, resource, use_cache=use_cache)
             case _:
                 raise ValueError(f"Unknown search method: {search_method}")
+        if metrics is not None:
+            # Includes loading the cache file, which the search itself does not see
+            with metrics.lock:
+                metrics.histogram(
+                    "fetch_duration_seconds", "Wall time of Network.fetch, cache loading included.", ("method",), unit="seconds"
+                ).labels(search_method).record(time.perf_counter() - start_time)
         return path
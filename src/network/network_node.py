@@ -1,57 +1,79 @@
+import sys
+import threading
+from typing import Iterable
+
 from graph import Node
-from network.packet import Packet
+
+# Process-wide resource table: each resource name gets a bit position the
+# first time any node holds it
+RESOURCE_IDS: dict[str, int] = {}
+RESOURCE_NAMES: list[str] = []
+_resource_lock = threading.Lock()
+
+# Widest bitset a node keeps. Bitsets start at the node's lowest id, so a
+# node holding nearby ids stays small however large the catalog; ids spread
+# wider than this are kept as a set of names instead.
+BITSET_LIMIT = 256
+
+
+def resource_id(resource: str) -> int:
+    bit = RESOURCE_IDS.get(resource)
+    if bit is None:
+        with _resource_lock:
+            bit = RESOURCE_IDS.get(resource)
+            if bit is None:
+                bit = RESOURCE_IDS[resource] = len(RESOURCE_NAMES)
+                RESOURCE_NAMES.append(sys.intern(resource))
+    return bit
+
+
+def pack_resources(resources: Iterable[str]) -> tuple[int | frozenset[str], int]:
+    """
+    (bitset, offset) where bit i of the bitset is resource id offset + i, or
+    (frozenset of names, 0) when the ids are too far apart.
+    """
+    bits = [resource_id(resource) for resource in resources]
+    if not bits:
+        return 0, 0
+    offset = min(bits)
+    if max(bits) - offset >= BITSET_LIMIT:
+        return frozenset(RESOURCE_NAMES[bit] for bit in bits), 0
+    mask = 0
+    for bit in bits:
+        mask |= 1 << (bit - offset)
+    return mask, offset
 
 
 class NetworkNode(Node):
-    seen_messages: set[tuple[int | str, str]]
+    __slots__ = ("_resources", "_offset", "neighbors")
+
     neighbors: dict[str, list[Node]]
 
-    def __init__(self, id: str, resources: set[str]):
+    def __init__(self, id: str, resources: Iterable[str]):
         super().__init__(id)
-        self.seen_packets: set[int] = set()
-        self.resources = resources
-        self.seen_messages = set()
+        self._resources, self._offset = pack_resources(resources)
+
+    @property
+    def resources(self) -> frozenset[str]:
+        packed = self._resources
+        if packed.__class__ is not int:
+            return packed
+        names = []
+        while packed:
+            low = packed & -packed
+            names.append(RESOURCE_NAMES[self._offset + low.bit_length() - 1])
+            packed ^= low
+        return frozenset(names)
 
     def set_neighbors(self, neighbors: dict[str, list[Node]]):
         self.neighbors = neighbors
 
     def has_resource(self, resource: str) -> bool:
-        return resource in self.resources
-
-    def receive_flood(self, packet: Packet, node_id: str, stats: dict) -> bool:
-        stats['total_messages'] += 1
-
-        msg_signature = (packet.source_id, node_id)
-        if msg_signature in self.seen_messages:
-            return False  # Message already seen
-        self.seen_messages.add(msg_signature)
-
-        if packet.target_resource in self.resources:
-            return True
-
-        if packet.ttl <= 0:
-            return False
-
-        packet.ttl -= 1
-        current_path = packet.path + [self.id] if packet.path else [self.id]
-
-        # explorar vizinhos
-        found_somewhere = False
-        for neighbor in self.neighbors:
-            if neighbor.id != node_id:
-                new_packet = Packet(
-                    source_id=packet.source_id,
-                    target_id=packet.target_id,
-                    seq_num=packet.seq_num,
-                    content=packet.content,
-                    ttl=packet.ttl,
-                    path=current_path.copy()
-                )
-
-                if neighbor.receive_flood(new_packet, self.id, stats):
-                    found_somewhere = True
-
-        if found_somewhere:
-            packet.path = current_path
-            self.send_packet(packet)
-        return found_somewhere
+        packed = self._resources
+        if packed.__class__ is int:
+            # Most nodes of a large network hold nothing
+            if not packed:
+                return False
+            bit = RESOURCE_IDS.get(resource, -1) - self._offset
+            return bit >= 0 and packed >> bit & 1 == 1
+        return resource in packed
@@ -0,0 +1,138 @@
+"""
+Replica placement for unstructured search.
+
+A placement decides how many copies each resource gets (allocation) and which
+nodes hold them (placement). The output has the same shape as
+``GraphSchema.resources`` so it can be handed straight to ``Network``.
+
+Allocation strategies, for a query distribution q_i and R total replicas:
+
+- uniform:      r_i = R / m
+- proportional: r_i ∝ q_i
+- square_root:  r_i ∝ sqrt(q_i)   (minimizes expected search size)
+"""
+import math
+import random
+
+
+STRATEGIES = ("uniform", "proportional", "square_root")
+
+
+def zipf_popularity(resources: list[str], alpha: float = 1.0) -> dict[str, float]:
+    """Zipf query distribution where the i-th resource has weight 1 / i^alpha."""
+    weights = [1.0 / (rank ** alpha) for rank in range(1, len(resources) + 1)]
+    total = sum(weights)
+    return {resource: weight / total for resource, weight in zip(resources, weights)}
+
+
+def allocate_replicas(popularity: dict[str, float], total_replicas: int, strategy: str = "square_root", max_replicas: int | None = None) -> dict[str, int]:
+    """
+    Split ``total_replicas`` among resources according to ``strategy``.
+
+    Every resource gets at least one replica and at most ``max_replicas``
+    (usually the number of nodes, since a node holds a resource only once).
+    Fractional shares are rounded with the largest remainder method.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown replication strategy: {strategy}")
+    if total_replicas < len(popularity):
+        raise ValueError(f"total_replicas ({total_replicas}) must be at least the number of resources ({len(popularity)})")
+
+    match strategy:
+        case "uniform":
+            weights = {resource: 1.0 for resource in popularity}
+        case "proportional":
+            weights = dict(popularity)
+        case "square_root":
+            weights = {resource: math.sqrt(q) for resource, q in popularity.items()}
+
+    cap = max_replicas if max_replicas is not None else total_replicas
+    if total_replicas > cap * len(popularity):
+        raise ValueError(f"total_replicas ({total_replicas}) exceeds {len(popularity)} resources x max_replicas ({cap})")
+
+    # Water-filling: resources whose ideal share falls outside [1, cap] are
+    # clamped and the rest of the budget is re-spread over the others.
+    shares: dict[str, float] = {}
+    open_resources = list(popularity)
+    budget = float(total_replicas)
+    while open_resources:
+        weight_sum = sum(weights[r] for r in open_resources)
+        for resource in open_resources:
+            if weight_sum > 0:
+                shares[resource] = budget * weights[resource] / weight_sum
+            else:
+                shares[resource] = budget / len(open_resources)
+        clamped = [r for r in open_resources if shares[r] < 1 or shares[r] > cap]
+        if not clamped:
+            break
+        for resource in clamped:
+            shares[resource] = 1.0 if shares[resource] < 1 else float(cap)
+            budget -= shares[resource]
+        clamped_set = set(clamped)
+        open_resources = [r for r in open_resources if r not in clamped_set]
+
+    replicas = {resource: int(share) for resource, share in shares.items()}
+    leftover = total_replicas - sum(replicas.values())
+    by_remainder = sorted(popularity, key=lambda r: shares[r] - replicas[r], reverse=True)
+    for resource in by_remainder:
+        if leftover == 0:
+            break
+        if replicas[resource] < cap:
+            replicas[resource] += 1
+            leftover -= 1
+
+    return replicas
+
+
+def place_replicas(node_ids: list[str], replicas: dict[str, int], capacity: int, seed: int | None = None) -> dict[str, list[str]]:
+    """
+    Assign each resource's replicas to distinct nodes, holding at most
+    ``capacity`` resources per node.
+
+    Resources with the most replicas are placed first, always on the nodes with
+    the most free storage, so the budget is spread evenly.
+    """
+    if sum(replicas.values()) > capacity * len(node_ids):
+        raise ValueError(f"{sum(replicas.values())} replicas do not fit in {len(node_ids)} nodes with capacity {capacity}")
+
+    rng = random.Random(seed)
+    free = {node_id: capacity for node_id in node_ids}
+    placement: dict[str, list[str]] = {node_id: [] for node_id in node_ids}
+
+    for resource, count in sorted(replicas.items(), key=lambda item: -item[1]):
+        if count > len(node_ids):
+            raise ValueError(f"Resource {resource} needs {count} replicas but there are only {len(node_ids)} nodes")
+        candidates = [node_id for node_id in node_ids if free[node_id] > 0]
+        rng.shuffle(candidates)
+        candidates.sort(key=lambda node_id: -free[node_id])
+        if len(candidates) < count:
+            raise ValueError(f"Not enough free storage to place {count} replicas of {resource}")
+        for node_id in candidates[:count]:
+            placement[node_id].append(resource)
+            free[node_id] -= 1
+
+    return placement
+
+
+def replicate(node_ids: list[str], popularity: dict[str, float], capacity: int, strategy: str = "square_root", seed: int | None = None) -> dict[str, list[str]]:
+    """Allocate and place replicas using the whole storage budget of the nodes."""
+    total = min(capacity * len(node_ids), len(popularity) * len(node_ids))
+    replicas = allocate_replicas(popularity, total, strategy=strategy, max_replicas=len(node_ids))
+    return place_replicas(node_ids, replicas, capacity, seed=seed)
+
+
+def expected_search_size(popularity: dict[str, float], replicas: dict[str, int], num_nodes: int) -> float:
+    """
+    Expected number of nodes probed by a blind search until a replica is hit,
+    averaged over the query distribution: sum_i q_i * N / r_i.
+    """
+    total = sum(popularity.values())
+    return sum(q / total * num_nodes / replicas[resource] for resource, q in popularity.items())
+
+
+def count_replicas(placement: dict[str, list[str]]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for resources in placement.values():
+        for resource in resources:
+            counts[resource] = counts.get(resource, 0) + 1
+    return counts
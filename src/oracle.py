@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from graph.csr import CSR, first_unique
+
+if TYPE_CHECKING:
+    from network import Network
+
+
+class HopOracle:
+    """
+    Precomputed optimal hop counts from every node to the nearest holder of
+    every resource, plus the next hop on such a shortest path.
+
+    Tables are (num_resources, num_nodes) arrays. Distances use uint8 when
+    they fit (uint16 otherwise) and next hops the smallest unsigned type that
+    can index every node; the dtype maximum marks "unreachable".
+    """
+
+    def __init__(self, ids: list[str], resources: list[str], distance: np.ndarray, next_hop: np.ndarray):
+        self.ids = ids
+        self.resources = resources
+        self.distance_table = distance
+        self.next_hop_table = next_hop
+        self._node_index = {node_id: i for i, node_id in enumerate(ids)}
+        self._resource_index = {resource: i for i, resource in enumerate(resources)}
+        self._unreachable = np.iinfo(distance.dtype).max
+
+    @classmethod
+    def build(cls, network: "Network") -> "HopOracle":
+        csr = network.graph.to_csr()
+        index = csr.index()
+        resources = sorted(network.resource_index)
+
+        n = csr.num_nodes
+        hop_dtype = np.uint16 if n < np.iinfo(np.uint16).max else np.uint32
+        no_hop = np.iinfo(hop_dtype).max
+        unreachable = np.iinfo(np.uint16).max
+
+        distance = np.full((len(resources), n), unreachable, dtype=np.uint16)
+        next_hop = np.full((len(resources), n), no_hop, dtype=hop_dtype)
+
+        for row, resource in enumerate(resources):
+            holders = [index[h] for h in network.holders(resource) if h in index]
+            cls._multi_source_bfs(csr, np.array(holders, dtype=np.int64), distance[row], next_hop[row], unreachable)
+
+        reachable = distance[distance != unreachable]
+        if reachable.size == 0 or reachable.max() < np.iinfo(np.uint8).max:
+            narrow = np.full(distance.shape, np.iinfo(np.uint8).max, dtype=np.uint8)
+            mask = distance != unreachable
+            narrow[mask] = distance[mask]
+            distance = narrow
+
+        return cls(csr.ids, resources, distance, next_hop)
+
+    @staticmethod
+    def _multi_source_bfs(csr: CSR, sources: np.ndarray, distance: np.ndarray, next_hop: np.ndarray, unreachable: int) -> None:
+        """Level-synchronous BFS from all holders at once, filling one table row in place."""
+        if sources.size == 0:
+            return
+        distance[sources] = 0
+        next_hop[sources] = sources
+        frontier = sources
+        level = 0
+        while frontier.size:
+            level += 1
+            origins, reached = csr.expand(frontier)
+            fresh = distance[reached] == unreachable
+            origins, reached = origins[fresh], reached[fresh]
+            reached, first = first_unique(reached)
+            distance[reached] = level
+            # One step closer to the nearest holder is the node that reached us
+            next_hop[reached] = origins[first]
+            frontier = reached
+
+    def distance(self, node_id: str, resource: str) -> int | None:
+        """Optimal number of hops from node_id to the nearest holder, or None if unreachable."""
+        row = self._resource_index.get(resource)
+        column = self._node_index.get(node_id)
+        if row is None or column is None:
+            return None
+        value = self.distance_table[row, column]
+        return None if value == self._unreachable else int(value)
+
+    def next_hop(self, node_id: str, resource: str) -> str | None:
+        if self.distance(node_id, resource) is None:
+            return None
+        hop = self.next_hop_table[self._resource_index[resource], self._node_index[node_id]]
+        return self.ids[hop]
+
+    def path(self, node_id: str, resource: str) -> list[str] | None:
+        """A shortest path to the nearest holder, following the next-hop table."""
+        if self.distance(node_id, resource) is None:
+            return None
+        row = self._resource_index[resource]
+        current = self._node_index[node_id]
+        path = [node_id]
+        while self.distance_table[row, current] != 0:
+            current = int(self.next_hop_table[row, current])
+            path.append(self.ids[current])
+        return path
+
+    def save(self, path: Path | str) -> None:
+        np.savez(
+            path,
+            ids=np.array(self.ids),
+            resources=np.array(self.resources),
+            distance=self.distance_table,
+            next_hop=self.next_hop_table,
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "HopOracle":
+        with np.load(path) as data:
+            return cls(
+                ids=data["ids"].tolist(),
+                resources=data["resources"].tolist(),
+                distance=data["distance"],
+                next_hop=data["next_hop"],
+            )
@@ -0,0 +1,62 @@
+from dataclasses import dataclass, fields
+
+
+@dataclass(slots=True, eq=False)
+class SearchResult:
+    """
+    Outcome of one search: the path found (None if the resource was not
+    reached) plus what it cost.
+
+    - messages: query messages sent between nodes, including the hops of a
+      cached route that was followed
+    - nodes_visited: nodes that checked for the resource
+    - duplicates_suppressed: deliveries dropped because the node had already
+      seen or processed the query
+    - cache_probes / cache_hits: cache lookups made and how many returned a route
+    - elapsed: wall time of the search in seconds
+
+    It behaves like the path itself, so ``result[-1]``, ``len(result)`` and
+    ``result == ["n1", "n2"]`` work, and it is falsy when nothing was found.
+    """
+    path: list[str] | None = None
+    messages: int = 0
+    nodes_visited: int = 0
+    duplicates_suppressed: int = 0
+    cache_probes: int = 0
+    cache_hits: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def found(self) -> bool:
+        return self.path is not None
+
+    @property
+    def hops(self) -> int | None:
+        return len(self.path) - 1 if self.path is not None else None
+
+    def __bool__(self) -> bool:
+        return self.path is not None
+
+    def __len__(self) -> int:
+        return len(self.path) if self.path is not None else 0
+
+    def __iter__(self):
+        return iter(self.path if self.path is not None else ())
+
+    def __getitem__(self, index):
+        if self.path is None:
+            raise IndexError("search found no path")
+        return self.path[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SearchResult):
+            # Timing differs between otherwise identical searches
+            return all(getattr(self, f.name) == getattr(other, f.name) for f in fields(self) if f.name != "elapsed")
+        if isinstance(other, list) or other is None:
+            return self.path == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def as_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
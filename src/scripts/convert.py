@@ -0,0 +1,31 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+from graph import GraphSchema
+
+
+parser = argparse.ArgumentParser(description="Converte redes entre JSON e o formato binário (snapshot).")
+parser.add_argument("input", type=Path, help="Arquivo de entrada (.json ou .snapshot).")
+parser.add_argument("output", type=Path, help="Arquivo de saída (.json ou .snapshot).")
+
+
+def convert():
+    args = parser.parse_args()
+    # numpy is only needed here, not for plain JSON runs
+    from snapshot import SUFFIX, Snapshot, is_snapshot, write_schema_snapshot
+
+    start = time.perf_counter()
+    if is_snapshot(args.input):
+        if args.output.suffix == SUFFIX:
+            parser.error("input is already a snapshot")
+        schema = Snapshot(args.input).to_schema()
+        with open(args.output, "w") as f:
+            json.dump(schema.to_dict(), f, indent=2)
+    else:
+        with open(args.input, "r") as f:
+            schema = GraphSchema.from_dict(json.load(f))
+        write_schema_snapshot(args.output, schema)
+    elapsed = time.perf_counter() - start
+    print(f"{args.input} -> {args.output} ({elapsed:.2f}s)")
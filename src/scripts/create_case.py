@@ -48,5 +48,5 @@ def template():
             ["n12", "n2"],
         ],
         )
-    _json = json.dumps(schema.__dict__, indent=4)
+    _json = json.dumps(schema.to_dict(), indent=4)
     print(_json)
@@ -0,0 +1,42 @@
+import argparse
+import time
+from pathlib import Path
+
+
+parser = argparse.ArgumentParser(description="Gera topologias grandes de forma vetorizada.")
+parser.add_argument("--model", default="erdos_renyi", help="Modelo de topologia (erdos_renyi, barabasi_albert, watts_strogatz, random_regular, hexagonal, torus).")
+parser.add_argument("--nodes", type=int, default=1000, help="Número de nós.")
+parser.add_argument("--degree", type=int, default=4, help="Grau médio/alvo do modelo.")
+parser.add_argument("--beta", type=float, default=0.1, help="Probabilidade de religação (watts_strogatz).")
+parser.add_argument("--min-neighbors", type=int, default=1, help="Grau mínimo exigido.")
+parser.add_argument("--max-neighbors", type=int, default=None, help="Grau máximo permitido.")
+parser.add_argument("--resources", type=int, default=0, help="Número de recursos distribuídos em round-robin.")
+parser.add_argument("--seed", type=int, default=None, help="Semente aleatória.")
+parser.add_argument("--output", type=Path, required=True, help="Arquivo de saída (.json ou .snapshot).")
+
+
+def generate():
+    args = parser.parse_args()
+    from graph.generators import MODELS, degrees, enforce_degree_bounds, generate, hex_positions, round_robin_resources, write_binary, write_json
+    from snapshot import SUFFIX
+
+    if args.model not in MODELS:
+        parser.error(f"unknown model {args.model!r}, choose from {', '.join(MODELS)}")
+
+    start = time.perf_counter()
+    n, edges = generate(args.model, args.nodes, degree=args.degree, beta=args.beta, seed=args.seed)
+    edges = enforce_degree_bounds(n, edges, args.min_neighbors, args.max_neighbors, seed=args.seed)
+    holders = round_robin_resources(n, args.resources) if args.resources else None
+    generated = time.perf_counter()
+
+    if args.output.suffix == SUFFIX:
+        write_binary(args.output, n, edges, holders, args.min_neighbors, args.max_neighbors)
+    else:
+        # The grid's own coordinates spare the visualizer a layout
+        positions = hex_positions(n) if args.model == "hexagonal" else None
+        write_json(args.output, n, edges, holders, args.min_neighbors, args.max_neighbors, positions)
+    written = time.perf_counter()
+
+    degree = degrees(n, edges)
+    print(f"{args.model}: {n} nós, {len(edges)} arestas, grau {degree.min()}..{degree.max()} (média {degree.mean():.2f})")
+    print(f"Geração: {generated - start:.2f}s, escrita: {written - generated:.2f}s -> {args.output}")
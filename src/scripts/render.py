@@ -0,0 +1,34 @@
+import argparse
+import time
+from pathlib import Path
+
+from loader import NetworkLoader
+from tracing import load_trace
+
+
+parser = argparse.ArgumentParser(description="Renderiza um trace de busca (--trace) em GIF, MP4 ou quadros PNG, sem abrir janela.")
+parser.add_argument("network", type=Path, help="Arquivo da rede (.json ou .snapshot).")
+parser.add_argument("trace", type=Path, help="Trace salvo com --trace (JSON lines).")
+parser.add_argument("output", type=Path, help="Saída: .gif, .mp4 (requer ffmpeg) ou um diretório para quadros PNG.")
+parser.add_argument("--fps", type=int, default=10, help="Quadros por segundo.")
+parser.add_argument("--every", type=int, default=1, help="Renderiza um a cada N passos.")
+parser.add_argument("--layout", choices=("auto", "spring", "pivot_mds"), default="auto", help="Algoritmo de layout quando a rede não traz posições (cacheado em disco).")
+parser.add_argument("--max-frames", type=int, default=None, help="Limite de quadros (aumenta --every se necessário).")
+
+
+def render():
+    args = parser.parse_args()
+    # matplotlib is only needed here, not for plain runs
+    from visualization.layout import LayoutCache
+    from visualization.render import ReplayRenderer
+
+    network = NetworkLoader().load(str(args.network))
+    searches, events = load_trace(args.trace)
+    start = time.perf_counter()
+    positions = network.graph.positions
+    if positions is None:
+        positions = LayoutCache().layout(network.edge_list, args.layout)
+    renderer = ReplayRenderer(network.edge_list, positions={node_id: tuple(xy) for node_id, xy in positions.items()})
+    frames = renderer.render(searches, events, args.output, fps=args.fps, every=args.every, max_frames=args.max_frames)
+    elapsed = time.perf_counter() - start
+    print(f"{frames} quadros -> {args.output} ({elapsed:.2f}s)")
@@ -9,14 +9,20 @@ parser.add_argument("--ttl", type=int, default=None, help="O TTL para a busca.")
 parser.add_argument("--use-cache", action="store_true", help="Habilitar o uso de cache na busca.")
 parser.add_argument("--cache-file", type=str, default=None, help="Caminho para o arquivo de cache.")
 parser.add_argument("--visualize", default=False, help="Abrir uma janela de visualização da execução do algoritmo.", action='store_true')
+parser.add_argument("--render", type=str, default=None, help="Renderizar a execução sem janela: .gif, .mp4 (requer ffmpeg) ou diretório de quadros PNG.")
+parser.add_argument("--render-every", type=int, default=1, help="Renderizar um a cada N passos.")
+parser.add_argument("--trace", type=str, default=None, help="Salvar os eventos da busca (JSON lines) neste arquivo.")
+parser.add_argument("--metrics", type=str, default=None, help="Salvar as métricas (formato OpenMetrics) neste arquivo.")
+parser.add_argument("--queries", type=str, default=None, help="Arquivo de consultas, uma por linha: 'requester_id recurso [método]'. Todas rodam numa mesma sessão, com a rede e o cache carregados uma vez.")
+parser.add_argument("--memory", type=str, default=None, help="Medir o pico de memória da busca e o tamanho da rede; salva o relatório JSON neste arquivo.")
 
 def example():
     parser.add_argument("--index", type=int, help="O índice do caso a ser executado.")
 
     args = parser.parse_args()
-    example_main(case_index=args.index, search_method=args.search_method, requester_id=args.requester_id, resource=args.resource, ttl=args.ttl, use_cache=args.use_cache, cache_file=args.cache_file, visualize=args.visualize)
+    example_main(case_index=args.index, search_method=args.search_method, requester_id=args.requester_id, resource=args.resource, ttl=args.ttl, use_cache=args.use_cache, cache_file=args.cache_file, visualize=args.visualize, trace_file=args.trace, metrics_file=args.metrics, memory_file=args.memory, render_file=args.render, render_every=args.render_every, queries_file=args.queries)
 
 def case():
     parser.add_argument("--path", type=str, help="O caminho do arquivo do caso a ser executado.")
     args = parser.parse_args()
-    case_main(case_path=args.path, search_method=args.search_method, requester_id=args.requester_id, resource=args.resource, ttl=args.ttl, use_cache=args.use_cache, cache_file=args.cache_file, visualize=args.visualize)
+    case_main(case_path=args.path, search_method=args.search_method, requester_id=args.requester_id, resource=args.resource, ttl=args.ttl, use_cache=args.use_cache, cache_file=args.cache_file, visualize=args.visualize, trace_file=args.trace, metrics_file=args.metrics, memory_file=args.memory, render_file=args.render, render_every=args.render_every, queries_file=args.queries)
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import time
+from contextlib import suppress
+from pathlib import Path
+
+from session import FetchSession, load_queries
+
+
+serve_parser = argparse.ArgumentParser(description="Servidor local de consultas: mantém a rede e o cache carregados e responde buscas em JSON lines.")
+serve_parser.add_argument("network", type=Path, help="Arquivo da rede (.json ou .snapshot).")
+serve_parser.add_argument("--ttl", type=int, required=True, help="O TTL das buscas.")
+serve_parser.add_argument("--search-method", type=str, default="bfs", help="Método de busca padrão das consultas.")
+serve_parser.add_argument("--host", type=str, default="127.0.0.1", help="Endereço TCP local.")
+serve_parser.add_argument("--port", type=int, default=7464, help="Porta TCP.")
+serve_parser.add_argument("--unix", type=str, default=None, help="Ouvir neste socket Unix em vez de TCP.")
+serve_parser.add_argument("--use-cache", action="store_true", help="Habilitar o uso de cache nas buscas.")
+serve_parser.add_argument("--cache-file", type=str, default=None, help="Caminho para o arquivo de cache.")
+serve_parser.add_argument("--batch-window", type=float, default=1.0, help="Janela (ms) em que consultas pelo mesmo recurso e método formam um lote; pedidos repetidos de um solicitante compartilham a busca.")
+serve_parser.add_argument("--shared-traversal", action="store_true", help="Responder cada lote BFS com uma única travessia a partir dos detentores; nela o TTL limita saltos, não nós desenfileirados.")
+
+query_parser = argparse.ArgumentParser(description="Envia um arquivo de consultas ao servidor local por uma única conexão.")
+query_parser.add_argument("queries", type=Path, help="Arquivo de consultas, uma por linha: 'requester_id recurso [método]'.")
+query_parser.add_argument("--host", type=str, default="127.0.0.1", help="Endereço TCP do servidor.")
+query_parser.add_argument("--port", type=int, default=7464, help="Porta TCP do servidor.")
+query_parser.add_argument("--unix", type=str, default=None, help="Conectar a este socket Unix em vez de TCP.")
+
+
+def serve():
+    args = serve_parser.parse_args()
+    from server import serve as run_server
+
+    with FetchSession(args.network, args.ttl, args.search_method, use_cache=args.use_cache, cache_file=args.cache_file, shared_traversal=args.shared_traversal) as session:
+        with suppress(KeyboardInterrupt):
+            asyncio.run(run_server(session, args.host, args.port, args.unix, args.batch_window / 1000))
+
+
+def query():
+    args = query_parser.parse_args()
+    from server import QueryClient
+
+    queries = list(load_queries(args.queries))
+    start = time.perf_counter()
+    with QueryClient(args.host, args.port, args.unix) as client:
+        responses = client.fetch_many(queries)
+        stats = client.stats()
+    elapsed = time.perf_counter() - start
+    for (requester_id, resource, *_), response in zip(queries, responses):
+        if response["ok"]:
+            print(f"Resource {resource} found by {requester_id}: {response['path']} ({response['latency_ms']:.3f} ms, lote de {response['batch_size']})")
+        else:
+            print(f"Erro em {requester_id} {resource}: {response['error']}")
+    latency = stats["latency_percentiles_ms"]
+    print(
+        f"Consultas: {len(responses)} em {elapsed * 1000:.1f} ms; latência no servidor p50 {latency['p50'] or 0:.3f} ms, "
+        f"p99 {latency['p99'] or 0:.3f} ms; buscas economizadas: {stats['searches_saved']}"
+    )
@@ -1,24 +1,32 @@
-from typing import Callable
+from typing import Callable, Iterable, Iterator
+from collections import deque
+from itertools import count
 from uuid import uuid4
+import heapq
+import time
 from graph import Graph
 import random
 from cache import Cache
 from network.packet import Packet
-from visualization.step import VisualizationStep
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from result import SearchResult
+from tracing import NULL_TRACER, EventType, Emitter, NullTracer, Tracer
+from metrics import MetricsRegistry, SearchMetrics
 import threading
 
 
 class NetworkSearch:
-    def __init__(self, network: Graph, ttl: int,  cache: Cache| None = None, visualize_step_function: Callable | None = None):
+    def __init__(self, network: Graph, ttl: int,  cache: Cache| None = None, tracer: Tracer | NullTracer | None = None, metrics: MetricsRegistry | None = None):
         self.network = network
         self.cache = cache
         self.ttl = ttl
-        self.step_function = visualize_step_function
+        self.tracer = tracer if tracer is not None else NULL_TRACER
+        self.metrics = SearchMetrics(metrics) if metrics is not None else None
 
-    def _use_cache(self, target_resource: str, current_path: list[str]) -> list[str] | None:
+    def _use_cache(self, target_resource: str, current_path: list[str], result: SearchResult | None = None, emit: Emitter | None = None) -> list[str] | None:
         if self.cache is None:
             return None
+        if result is not None:
+            result.cache_probes += 1
         current_node_id = current_path[-1]
         node_cache = self.cache[current_node_id]
         if node_cache is None:
@@ -26,22 +34,63 @@ class NetworkSearch:
         cache_path = node_cache.get(target_resource)
         if cache_path is None:
             return None
-        return self.cache.follow(cache_path, current_path, target_resource)
+        path = self.cache.follow(cache_path, current_path, target_resource)
+        if path is not None and emit:
+            emit(EventType.CACHE_HIT, current_node_id, path[-1])
+        if path is not None and result is not None:
+            result.cache_hits += 1
+            # The query still travels along the cached route
+            result.messages += len(cache_path)
+        return path
+
+    @staticmethod
+    def _parent(path: list[str]) -> str | None:
+        return path[-2] if len(path) > 1 else None
+
+    def _finish(self, result: SearchResult, path: list[str] | None, start_time: float, method: str) -> SearchResult:
+        result.path = path
+        result.elapsed = time.perf_counter() - start_time
+        if self.metrics is not None:
+            self.metrics.observe(method, result)
+        return result
 
-    def flood(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> list[str] | None:
+    def flood(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> SearchResult:
+        start_time = time.perf_counter()
+        result = SearchResult()
+        emit = self.tracer.begin(start_node_id, target_resource)
         if use_cache:
-            cache_result = self._use_cache(target_resource, [start_node_id])
+            cache_result = self._use_cache(target_resource, [start_node_id], result, emit)
             if cache_result is not None:
                 print(f"Cache hit for {target_resource} at {start_node_id}: {cache_result}")
-                return cache_result
+                return self._finish(result, cache_result, start_time, "flood")
             else:
                 print(f"No cache entry for {target_resource} at {start_node_id}")
 
         start_node = self.network[start_node_id]
         if start_node is None:
-            return None
+            return self._finish(result, None, start_time, "flood")
 
-        # Initialize the packet
+        for current_node_id, current_packet in self._flood_reach(start_node_id, result, emit):
+            # Check if the current node has the target resource
+            if self.network[current_node_id].has_resource(target_resource):
+                if self.cache:
+                    self.cache.update(target_resource, current_packet.path)
+                if emit:
+                    emit(EventType.FOUND, current_node_id, self._parent(current_packet.path), current_packet.ttl)
+                return self._finish(result, current_packet.path, start_time, "flood")
+
+        return self._finish(result, None, start_time, "flood")
+
+    def _flood_reach(self, start_node_id: str, result: SearchResult, emit: Emitter | None) -> Iterator[tuple[str, Packet]]:
+        """
+        The traversal behind flood, flood_many and iter_flood: yields
+        (node_id, packet) for every node the query reaches, in arrival order,
+        before that node forwards it. A node forwards to each neighbor that
+        has not seen the message yet (the requester has); the neighbor gets
+        the TTL minus one and is reached only if that is still positive.
+        Visits, messages and suppressed duplicates are counted into
+        ``result``. Stop the flood by leaving the loop.
+        """
         packet = Packet(
             source_id=start_node_id,
             target_id="",
@@ -49,137 +98,150 @@ class NetworkSearch:
             ttl=self.ttl,
             path=[start_node_id]
         )
-        stats = {'total_messages': 0}
-
-        # Initialize visited nodes and queue for BFS-like traversal
-        visited = set()
-        queue = [(start_node_id, packet)]
+        # Nodes this message reached. Kept per search, not on the shared
+        # nodes, so concurrent searches never touch each other's state
+        seen = {start_node_id}
+        queue = deque([(start_node_id, packet)])
 
         while queue:
-            current_node_id, current_packet = queue.pop(0)
-            current_node = self.network[current_node_id]
-
-            # Save the visualization step
-            self.save_step(start_node_id, current_node_id, visited, current_packet.path, False, current_packet.ttl, current_packet.thread_id)
-
-            # Check if the current node has the target resource
-            if current_node.has_resource(target_resource):
-                if self.cache:
-                    self.cache.update(target_resource, current_packet.path)
-                self.save_step(start_node_id, current_node_id, visited, current_packet.path, True, current_packet.ttl, current_packet.thread_id)
-                return current_packet.path
-
-            # Mark the current node as visited
-            visited.add(current_node_id)
+            current_node_id, current_packet = queue.popleft()
+            result.nodes_visited += 1
+            if emit:
+                emit(EventType.VISIT, current_node_id, self._parent(current_packet.path), current_packet.ttl)
+            yield current_node_id, current_packet
 
             # Propagate the packet to neighbors
-            neighbors = self.network.neighbors.get(current_node_id, [])
-            for neighbor_id in neighbors:
-                neighbor_node = self.network[neighbor_id]
-
+            for neighbor_id in self.network.neighbors.get(current_node_id, []):
                 # Check if the neighbor has already seen this message
-                if current_packet.seq_num in neighbor_node.seen_messages:
+                if neighbor_id in seen:
+                    result.duplicates_suppressed += 1
+                    if emit:
+                        emit(EventType.DROP, current_node_id, neighbor_id, current_packet.ttl)
                     continue
-
-                # Mark the message as seen by the neighbor
-                neighbor_node.seen_messages.add(current_packet.seq_num)
-
-                # Create a new packet for the neighbor
-                new_packet = Packet(
-                    source_id=current_packet.source_id,
-                    target_id=current_packet.target_id,
-                    seq_num=current_packet.seq_num,
-                    ttl=current_packet.ttl - 1,
-                    path=current_packet.path + [neighbor_id]
-                )
+                seen.add(neighbor_id)
 
                 # Check if the TTL has expired
-                if new_packet.ttl > 0:
-                    queue.append((neighbor_id, new_packet))
-                    stats['total_messages'] += 1
-
-        # If the resource is not found, save the final step
-        self.save_step(start_node_id, None, visited, packet.path, False, packet.ttl, packet.thread_id)
-        return None
-
-    def bfs(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> list[str] | None:
+                if current_packet.ttl - 1 > 0:
+                    queue.append((neighbor_id, Packet(
+                        source_id=current_packet.source_id,
+                        target_id=current_packet.target_id,
+                        seq_num=current_packet.seq_num,
+                        ttl=current_packet.ttl - 1,
+                        path=current_packet.path + [neighbor_id]
+                    )))
+                    result.messages += 1
+                    if emit:
+                        emit(EventType.FORWARD, current_node_id, neighbor_id, current_packet.ttl - 1)
+                elif emit:
+                    emit(EventType.DROP, current_node_id, neighbor_id, 0)
+
+    def bfs(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> SearchResult:
+        start_time = time.perf_counter()
+        result = SearchResult()
+        emit = self.tracer.begin(start_node_id, target_resource)
         visited = set()
         queue = [(start_node_id, [start_node_id])]
         jumps = 0
 
         while queue and jumps <= self.ttl:
             if use_cache:
-                cache_result = self._use_cache(target_resource, queue[0][1])
+                cache_result = self._use_cache(target_resource, queue[0][1], result, emit)
                 if cache_result is not None:
-                    return cache_result
+                    return self._finish(result, cache_result, start_time, "bfs")
 
             current_node_id, path = queue.pop(0)
             current_node = self.network[current_node_id]
 
-            self.save_step(start_node_id, current_node_id, visited, path, False)
+            if emit:
+                emit(EventType.VISIT, current_node_id, self._parent(path), self.ttl - jumps)
 
             if current_node.has_resource(target_resource):
+                result.nodes_visited += 1
                 if self.cache:
                     self.cache.update(target_resource, path)
-                self.save_step(start_node_id, current_node_id, visited, path, True)
-                return path
+                if emit:
+                    emit(EventType.FOUND, current_node_id, self._parent(path), self.ttl - jumps)
+                return self._finish(result, path, start_time, "bfs")
 
             if current_node_id not in visited:
+                result.nodes_visited += 1
                 visited.add(current_node_id)
                 neighbors = self.network.neighbors.get(current_node_id, [])
                 for neighbor in neighbors:
                     if neighbor not in visited:
                         queue.append((neighbor, path + [neighbor]))
+                        result.messages += 1
+                        if emit:
+                            emit(EventType.FORWARD, current_node_id, neighbor, self.ttl - jumps)
+            else:
+                result.duplicates_suppressed += 1
+                if emit:
+                    emit(EventType.DROP, self._parent(path), current_node_id, self.ttl - jumps)
             jumps += 1
 
-        self.save_step(start_node_id, None, visited, path, False)
-        return None
+        return self._finish(result, None, start_time, "bfs")
 
-    def dfs(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> list[str] | None:
+    def dfs(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> SearchResult:
+        start_time = time.perf_counter()
+        result = SearchResult()
+        emit = self.tracer.begin(start_node_id, target_resource)
         visited = set()
         stack = [(start_node_id, [start_node_id])]
         jumps = 0
 
         while stack and jumps <= self.ttl:
             if use_cache:
-                cache_result = self._use_cache(target_resource, stack[-1][1])
+                cache_result = self._use_cache(target_resource, stack[-1][1], result, emit)
                 if cache_result is not None:
-                    return cache_result
+                    return self._finish(result, cache_result, start_time, "dfs")
 
             current_node_id, path = stack.pop()
             current_node = self.network[current_node_id]
 
-            self.save_step(start_node_id, current_node_id, visited, path, False)
+            if emit:
+                emit(EventType.VISIT, current_node_id, self._parent(path), self.ttl - jumps)
 
             if current_node.has_resource(target_resource):
+                result.nodes_visited += 1
                 if self.cache:
                     self.cache.update(target_resource, path)
-                self.save_step(start_node_id, current_node_id, visited, path, True)
-                return path
+                if emit:
+                    emit(EventType.FOUND, current_node_id, self._parent(path), self.ttl - jumps)
+                return self._finish(result, path, start_time, "dfs")
 
             if current_node_id not in visited:
+                result.nodes_visited += 1
                 visited.add(current_node_id)
                 neighbors = self.network.neighbors.get(current_node_id, [])
                 for neighbor in neighbors:
                     if neighbor not in visited:
                         stack.append((neighbor, path + [neighbor]))
+                        result.messages += 1
+                        if emit:
+                            emit(EventType.FORWARD, current_node_id, neighbor, self.ttl - jumps)
+            else:
+                result.duplicates_suppressed += 1
+                if emit:
+                    emit(EventType.DROP, self._parent(path), current_node_id, self.ttl - jumps)
             jumps += 1
 
-        self.save_step(start_node_id, None, visited, path, False)
-        return None
+        return self._finish(result, None, start_time, "dfs")
 
-    def random_walk(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> list[str] | None:
+    def random_walk(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> SearchResult:
+        start_time = time.perf_counter()
+        result = SearchResult()
+        emit = self.tracer.begin(start_node_id, target_resource)
         if use_cache:
-            cache_result = self._use_cache(target_resource, [start_node_id])
+            cache_result = self._use_cache(target_resource, [start_node_id], result, emit)
             if cache_result is not None:
                 print(f"Cache hit for {target_resource} at {start_node_id}: {cache_result}")
-                return cache_result
+                return self._finish(result, cache_result, start_time, "random_walk")
             else:
                 print(f"No cache entry for {target_resource} at {start_node_id}")
 
         start_node = self.network[start_node_id]
         if start_node is None:
-            return None
+            return self._finish(result, None, start_time, "random_walk")
 
         # Initialize the packet
         packet = Packet(
@@ -189,23 +251,25 @@ class NetworkSearch:
             ttl=self.ttl,
             path=[start_node_id]
         )
-        stats = {'total_messages': 0}
 
         # Start the random walk
         current_node_id = start_node_id
         visited = set()
         while packet.ttl > 0:
             current_node = self.network[current_node_id]
+            result.nodes_visited += 1
 
-            # Save the visualization step
-            self.save_step(start_node_id, current_node_id, visited, packet.path, False, packet.ttl, packet.thread_id)
+            # Trace the visit
+            if emit:
+                emit(EventType.VISIT, current_node_id, self._parent(packet.path), packet.ttl)
 
             # Check if the current node has the target resource
             if current_node.has_resource(target_resource):
                 if self.cache:
                     self.cache.update(target_resource, packet.path)
-                self.save_step(start_node_id, current_node_id, visited, packet.path, True, packet.ttl, packet.thread_id)
-                return packet.path
+                if emit:
+                    emit(EventType.FOUND, current_node_id, self._parent(packet.path), packet.ttl)
+                return self._finish(result, packet.path, start_time, "random_walk")
 
             # Mark the current node as visited
             visited.add(current_node_id)
@@ -219,27 +283,31 @@ class NetworkSearch:
                 break
 
             # Choose a random neighbor and update the packet
-            current_node_id = random.choice(unvisited_neighbors)
-            packet.path.append(current_node_id)
+            next_node_id = random.choice(unvisited_neighbors)
+            packet.path.append(next_node_id)
             packet.ttl -= 1
-            stats['total_messages'] += 1
+            result.messages += 1
+            if emit:
+                emit(EventType.FORWARD, current_node_id, next_node_id, packet.ttl)
+            current_node_id = next_node_id
 
-        # If the resource is not found, save the final step
-        self.save_step(start_node_id, None, visited, packet.path, False, packet.ttl, packet.thread_id)
-        return None
+        return self._finish(result, None, start_time, "random_walk")
 
-    def flood_parallel(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> list[str] | None:
+    def flood_parallel(self, start_node_id: str, target_resource: str, use_cache: bool = False) -> SearchResult:
+        start_time = time.perf_counter()
+        search_result = SearchResult()
+        emit = self.tracer.begin(start_node_id, target_resource)
         if use_cache:
-            cache_result = self._use_cache(target_resource, [start_node_id])
+            cache_result = self._use_cache(target_resource, [start_node_id], search_result, emit)
             if cache_result is not None:
                 print(f"Cache hit for {target_resource} at {start_node_id}: {cache_result}")
-                return cache_result
+                return self._finish(search_result, cache_result, start_time, "flood_parallel")
             else:
                 print(f"No cache entry for {target_resource} at {start_node_id}")
 
         start_node = self.network[start_node_id]
         if start_node is None:
-            return None
+            return self._finish(search_result, None, start_time, "flood_parallel")
 
         # Initialize the packet
         packet = Packet(
@@ -250,10 +318,12 @@ class NetworkSearch:
             path=[start_node_id],
             thread_id=None
         )
-        stats = {'total_messages': 0}
 
         # Initialize visited nodes and queue for BFS-like traversal
         visited = set()
+        # Nodes this message reached (the requester included), shared by this
+        # search's workers only
+        seen = {start_node_id}
         queue = [(start_node_id, packet)]
 
         # Thread-safe structures
@@ -264,8 +334,9 @@ class NetworkSearch:
             nonlocal result
             current_node = self.network[current_node_id]
 
-            # Save the visualization step
-            self.save_step(start_node_id, current_node_id, visited, current_packet.path, False, current_packet.ttl, current_packet.thread_id)
+            # Trace the visit
+            if emit:
+                emit(EventType.VISIT, current_node_id, self._parent(current_packet.path), current_packet.ttl, current_packet.thread_id)
 
             # Check if the current node has the target resource
             if current_node.has_resource(target_resource):
@@ -274,27 +345,33 @@ class NetworkSearch:
                         result = current_packet.path
                         if self.cache:
                             self.cache.update(target_resource, current_packet.path)
-                self.save_step(start_node_id, current_node_id, visited, current_packet.path, True, current_packet.ttl, current_packet.thread_id)
+                if emit:
+                    emit(EventType.FOUND, current_node_id, self._parent(current_packet.path), current_packet.ttl, current_packet.thread_id)
                 return
 
             # Mark the current node as visited
             with visited_lock:
                 if current_node_id in visited:
+                    search_result.duplicates_suppressed += 1
                     return
                 visited.add(current_node_id)
+                search_result.nodes_visited += 1
 
             # Propagate the packet to neighbors
             neighbors = self.network.neighbors.get(current_node_id, [])
             for neighbor_id in neighbors:
-                neighbor_node = self.network[neighbor_id]
-
-                # Check if the neighbor has already seen this message
-                if current_packet.seq_num in neighbor_node.seen_messages:
+                # Check and mark in one step, so two workers cannot both forward to it
+                with visited_lock:
+                    duplicate = neighbor_id in seen
+                    if duplicate:
+                        search_result.duplicates_suppressed += 1
+                    else:
+                        seen.add(neighbor_id)
+                if duplicate:
+                    if emit:
+                        emit(EventType.DROP, current_node_id, neighbor_id, current_packet.ttl, threading.get_ident())
                     continue
 
-                # Mark the message as seen by the neighbor
-                neighbor_node.seen_messages.add(current_packet.seq_num)
-
                 # Create a new packet for the neighbor
                 new_packet = Packet(
                     source_id=current_packet.source_id,
@@ -309,8 +386,12 @@ class NetworkSearch:
                 if new_packet.ttl > 0:
                     with visited_lock:
                         queue.append((neighbor_id, new_packet))
-                    stats['total_messages'] += 1
-                    stats[threading.get_ident()] = None
+                        search_result.messages += 1
+                    if emit:
+                        emit(EventType.FORWARD, current_node_id, neighbor_id, new_packet.ttl, new_packet.thread_id)
+
+        # Imported here: only the parallel search needs it
+        from concurrent.futures import ThreadPoolExecutor, as_completed
 
         # Use ThreadPoolExecutor for parallel processing
         with ThreadPoolExecutor() as executor:
@@ -324,12 +405,253 @@ class NetworkSearch:
                 for future in as_completed(futures):
                     future.result()  # Raise exceptions if any occurred
 
-        # If the resource is not found, save the final step
-        if result is None:
-            self.save_step(start_node_id, None, visited, packet.path, False, packet.ttl, packet.thread_id)
-        return result
+        return self._finish(search_result, result, start_time, "flood_parallel")
+
+    def dijkstra(self, start_node_id: str, target_resource: str, use_cache: bool = False, heuristic: Callable[[str], float] | None = None) -> SearchResult:
+        """
+        Lowest-latency path to a holder of the resource, using at most TTL hops.
+
+        Nodes are expanded from a heap ordered by accumulated link latency. A
+        node may be reached again with more latency but fewer hops, which can
+        still matter under the hop limit, so a label is only pruned when an
+        earlier one is no worse in both. With a ``heuristic`` (an admissible
+        lower bound on the latency left to a holder) this becomes A*.
+        """
+        start_time = time.perf_counter()
+        result = SearchResult()
+        emit = self.tracer.begin(start_node_id, target_resource)
+        if use_cache:
+            cache_result = self._use_cache(target_resource, [start_node_id], result, emit)
+            if cache_result is not None:
+                return self._finish(result, cache_result, start_time, "dijkstra")
+
+        if self.network[start_node_id] is None:
+            return self._finish(result, None, start_time, "dijkstra")
+
+        graph = self.network.graph
+        tie = count()
+        labels: dict[str, list[tuple[float, int]]] = {start_node_id: [(0.0, 0)]}
+        estimate = heuristic(start_node_id) if heuristic else 0.0
+        heap = [(estimate, next(tie), 0.0, start_node_id, [start_node_id])]
+
+        while heap:
+            _, _, cost, current_node_id, path = heapq.heappop(heap)
+            current_node = self.network[current_node_id]
+            result.nodes_visited += 1
+
+            if emit:
+                emit(EventType.VISIT, current_node_id, self._parent(path), self.ttl - len(path) + 1)
+
+            if current_node.has_resource(target_resource):
+                if self.cache:
+                    self.cache.update(target_resource, path, keep_cheapest=True)
+                if emit:
+                    emit(EventType.FOUND, current_node_id, self._parent(path), self.ttl - len(path) + 1)
+                return self._finish(result, path, start_time, "dijkstra")
 
-    def save_step(self, requester_id: str, current_node_id: str, visited_nodes: set[str], path: list[str], found: bool, ttl: int = 0, thread_id: int | None = None) -> None:
-        if self.step_function:
-            step = VisualizationStep(requester_id=requester_id, current_node_id=current_node_id, visited_nodes=visited_nodes, path=path, found=found, ttl=ttl, thread_id=thread_id)
-            self.step_function(step)
+            hops = len(path) - 1
+            if hops >= self.ttl:
+                continue
+
+            for neighbor in self.network.neighbors.get(current_node_id, []):
+                if neighbor in path:
+                    continue
+                neighbor_cost = cost + graph.link_latency(current_node_id, neighbor)
+                neighbor_labels = labels.setdefault(neighbor, [])
+                if any(c <= neighbor_cost and h <= hops + 1 for c, h in neighbor_labels):
+                    result.duplicates_suppressed += 1
+                    if emit:
+                        emit(EventType.DROP, current_node_id, neighbor, self.ttl - hops - 1)
+                    continue
+                neighbor_labels.append((neighbor_cost, hops + 1))
+                estimate = neighbor_cost + (heuristic(neighbor) if heuristic else 0.0)
+                heapq.heappush(heap, (estimate, next(tie), neighbor_cost, neighbor, path + [neighbor]))
+                result.messages += 1
+                if emit:
+                    emit(EventType.FORWARD, current_node_id, neighbor, self.ttl - hops - 1)
+
+        return self._finish(result, None, start_time, "dijkstra")
+
+    def flood_many(self, start_node_id: str, target_resources: set[str], use_cache: bool = False) -> tuple[dict[str, list[str] | None], int]:
+        """
+        Look up several resources with a single flood. Every visited node is
+        checked against all outstanding targets; a target is dropped once
+        found and the flood goes on for the others until TTL expires.
+
+        Returns a map of resource -> path (None if not found) and the number
+        of messages sent, those along cached routes included. Metrics record
+        it as one "flood_many" search, found only if every target was, with
+        the hops of the farthest one.
+        """
+        start_time = time.perf_counter()
+        result = SearchResult()
+        paths: dict[str, list[str] | None] = {resource: None for resource in target_resources}
+        outstanding = set(target_resources)
+        emit = self.tracer.begin(start_node_id, ",".join(sorted(target_resources)))
+
+        if use_cache:
+            for resource in list(outstanding):
+                cache_result = self._use_cache(resource, [start_node_id], result, emit)
+                if cache_result is not None:
+                    paths[resource] = cache_result
+                    outstanding.discard(resource)
+
+        if self.network[start_node_id] is not None and outstanding:
+            for current_node_id, current_packet in self._flood_reach(start_node_id, result, emit):
+                current_node = self.network[current_node_id]
+                for resource in [r for r in outstanding if current_node.has_resource(r)]:
+                    paths[resource] = current_packet.path
+                    outstanding.discard(resource)
+                    if self.cache:
+                        self.cache.update(resource, current_packet.path)
+                    if emit:
+                        emit(EventType.FOUND, current_node_id, self._parent(current_packet.path), current_packet.ttl)
+                if not outstanding:
+                    break
+
+        found = [path for path in paths.values() if path is not None]
+        farthest = max(found, key=len) if found and len(found) == len(paths) else None
+        self._finish(result, farthest, start_time, "flood_many")
+        return paths, result.messages
+
+    def bfs_batch(self, start_node_ids: Iterable[str], target_resource: str, use_cache: bool = False) -> tuple[dict[str, list[str] | None], SearchResult]:
+        """
+        Answer several requesters of the same resource with one traversal: a
+        BFS outward from every holder at once (as HopOracle does), stopped as
+        soon as all requesters are reached. Each requester gets a shortest
+        route to its nearest holder. Requesters farther than TTL hops are not
+        found. Needs a Network, for its resource index.
+
+        This is not bfs run once per requester: here TTL bounds the hops,
+        while bfs counts every dequeued node against it, so bfs can miss
+        holders that are within TTL hops. Ties between equally near holders
+        may also break differently.
+
+        Returns a map of requester -> path (None if not found) and the cost of
+        the whole batch as a path-less SearchResult.
+        """
+        start_time = time.perf_counter()
+        cost = SearchResult()
+        requesters = list(dict.fromkeys(start_node_ids))
+        paths: dict[str, list[str] | None] = {node_id: None for node_id in requesters}
+        emit = self.tracer.begin(",".join(requesters), target_resource)
+
+        outstanding = set(requesters)
+        if use_cache:
+            for node_id in requesters:
+                cache_result = self._use_cache(target_resource, [node_id], cost, emit)
+                if cache_result is not None:
+                    paths[node_id] = cache_result
+                    outstanding.discard(node_id)
+
+        # toward[node] is the next hop from node to its nearest holder
+        toward: dict[str, str | None] = {}
+        frontier = []
+        for holder in self.network.holders(target_resource):
+            toward[holder] = None
+            frontier.append(holder)
+        depth = 0
+        while frontier and outstanding:
+            next_frontier = []
+            for node_id in frontier:
+                cost.nodes_visited += 1
+                if emit:
+                    emit(EventType.VISIT, node_id, toward[node_id], self.ttl - depth)
+                if node_id in outstanding:
+                    outstanding.discard(node_id)
+                    path = [node_id]
+                    while toward[path[-1]] is not None:
+                        path.append(toward[path[-1]])
+                    paths[node_id] = path
+                    if self.cache:
+                        self.cache.update(target_resource, path)
+                    if emit:
+                        emit(EventType.FOUND, node_id, toward[node_id], self.ttl - depth)
+                    if not outstanding:
+                        break
+                if depth == self.ttl:
+                    continue
+                for neighbor in self.network.neighbors.get(node_id, []):
+                    if neighbor in toward:
+                        cost.duplicates_suppressed += 1
+                        continue
+                    toward[neighbor] = node_id
+                    next_frontier.append(neighbor)
+                    cost.messages += 1
+                    if emit:
+                        emit(EventType.FORWARD, node_id, neighbor, self.ttl - depth - 1)
+            frontier = next_frontier
+            depth += 1
+
+        cost.elapsed = time.perf_counter() - start_time
+        return paths, cost
+
+    def iter_bfs(self, start_node_id: str, target_resource: str, limit: int | None = None) -> Iterator[tuple[str, list[str]]]:
+        """
+        Yield (holder_id, path) for every node holding the resource, nearest
+        first, in the order bfs reaches them: as there, TTL bounds the nodes
+        taken off the queue, duplicates included, so the first result is the
+        one bfs returns. Stops after ``limit`` results; closing the generator
+        early stops the traversal.
+        """
+        if self.network[start_node_id] is None or limit == 0:
+            return
+
+        emit = self.tracer.begin(start_node_id, target_resource)
+        found = 0
+        visited = set()
+        queue = deque([(start_node_id, [start_node_id])])
+        jumps = 0
+
+        while queue and jumps <= self.ttl:
+            current_node_id, path = queue.popleft()
+            jumps += 1
+            if current_node_id in visited:
+                if emit:
+                    emit(EventType.DROP, self._parent(path), current_node_id, self.ttl - jumps + 1)
+                continue
+            visited.add(current_node_id)
+            current_node = self.network[current_node_id]
+
+            if emit:
+                emit(EventType.VISIT, current_node_id, self._parent(path), self.ttl - jumps + 1)
+
+            if current_node.has_resource(target_resource):
+                # Only the nearest holder goes to the cache, so later (longer)
+                # paths do not overwrite the shortest one.
+                if self.cache and found == 0:
+                    self.cache.update(target_resource, path)
+                if emit:
+                    emit(EventType.FOUND, current_node_id, self._parent(path), self.ttl - jumps + 1)
+                yield current_node_id, path
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+            for neighbor in self.network.neighbors.get(current_node_id, []):
+                if neighbor not in visited:
+                    queue.append((neighbor, path + [neighbor]))
+                    if emit:
+                        emit(EventType.FORWARD, current_node_id, neighbor, self.ttl - jumps + 1)
+
+    def iter_flood(self, start_node_id: str, target_resource: str, limit: int | None = None) -> Iterator[tuple[str, list[str]]]:
+        """
+        Flooding variant of ``iter_bfs``: the query keeps propagating past the
+        holders it reaches until the packet TTL expires, yielding each holder
+        as it is discovered. The first result is the one flood returns.
+        """
+        if self.network[start_node_id] is None or limit == 0:
+            return
+
+        emit = self.tracer.begin(start_node_id, target_resource)
+        found = 0
+        for current_node_id, current_packet in self._flood_reach(start_node_id, SearchResult(), emit):
+            if self.network[current_node_id].has_resource(target_resource):
+                if self.cache and found == 0:
+                    self.cache.update(target_resource, current_packet.path)
+                if emit:
+                    emit(EventType.FOUND, current_node_id, self._parent(current_packet.path), current_packet.ttl)
+                yield current_node_id, current_packet.path
+                found += 1
+                if limit is not None and found >= limit:
+                    return
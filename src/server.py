@@ -0,0 +1,275 @@
+"""
+Local query server: one resident FetchSession behind an asyncio server on
+localhost TCP or a Unix socket, so clients pay for loading the network and
+the cache once instead of on every CLI run.
+
+The protocol is JSON lines, one object per line in each direction:
+
+    {"id": 7, "requester_id": "n1", "resource": "r1", "search_method": "bfs"}
+    {"id": 7, "ok": true, "path": ["n1", "n2"], "found": true, "hops": 1, ...,
+     "batch_size": 3, "latency_ms": 0.42}
+
+``op`` defaults to "fetch"; "stats" and "ping" are also understood. Errors
+come back as ``{"id": ..., "ok": false, "error": "..."}``. Clients may
+pipeline: requests are served concurrently and answered as they complete,
+so responses can arrive out of order and carry the request's ``id``.
+
+Fetches for the same resource and method that arrive within
+``batch_window`` seconds of each other form one batch, answered by
+FetchSession.fetch_batch: one search per distinct requester, shared by its
+repeated requests, so answers never depend on batching. A session with
+shared_traversal answers a BFS batch with one traversal instead, bounding
+TTL in hops. Each response reports the batch size and the request's latency
+from the line being read to the response being written.
+"""
+import asyncio
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from typing import Iterable
+
+from histogram import Histogram
+from result import SearchResult
+from session import FetchSession, Query
+
+
+class QueryServer:
+    def __init__(self, session: FetchSession, batch_window: float = 0.001):
+        if batch_window < 0:
+            raise ValueError(f"batch_window must be non-negative, got {batch_window}")
+        self.session = session
+        self.batch_window = batch_window
+        self.latency = Histogram()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.searches_saved = 0
+        self.server: asyncio.Server | None = None
+        self._pending: dict[tuple[str, str], list[tuple[str, asyncio.Future]]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        # Searches run off the event loop, one at a time: the loop keeps
+        # reading requests, and batching them, while a search runs
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: str | None = None) -> asyncio.Server:
+        """Listen on host:port (port 0 picks a free one) or, with path, on a Unix socket."""
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    @property
+    def address(self) -> tuple[str, int] | str:
+        return self.server.sockets[0].getsockname()
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "searches_saved": self.searches_saved,
+            "cache_flushes": self.session.flushes,
+            "latency_percentiles_ms": {name: value * 1000 if value is not None else None for name, value in self.latency.percentiles().items()},
+        }
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        responses = set()
+        try:
+            while line := await reader.readline():
+                task = self._spawn(self._respond(line, time.perf_counter(), writer))
+                responses.add(task)
+                task.add_done_callback(responses.discard)
+            if responses:
+                await asyncio.gather(*responses)
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _respond(self, line: bytes, received: float, writer: asyncio.StreamWriter) -> None:
+        response = await self._answer(line)
+        latency = time.perf_counter() - received
+        response["latency_ms"] = latency * 1000
+        if response["ok"]:
+            self.latency.record(latency)
+        else:
+            self.errors += 1
+        if writer.is_closing():
+            return
+        writer.write(json.dumps(response).encode() + b"\n")
+        with suppress(ConnectionError):
+            await writer.drain()
+
+    async def _answer(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return {"id": None, "ok": False, "error": f"invalid JSON: {error}"}
+        if not isinstance(request, dict):
+            return {"id": None, "ok": False, "error": "request must be a JSON object"}
+        request_id = request.get("id")
+        try:
+            match request.get("op", "fetch"):
+                case "fetch":
+                    for field in ("requester_id", "resource"):
+                        if field not in request:
+                            raise ValueError(f"missing field {field!r}")
+                    if self.session.network[request["requester_id"]] is None:
+                        raise ValueError(f"unknown node {request['requester_id']!r}")
+                    method = request.get("search_method") or self.session.search_method
+                    result, batch_size = await self._enqueue(request["requester_id"], request["resource"], method)
+                    self.requests += 1
+                    return {"id": request_id, "ok": True, **self._result_fields(result), "batch_size": batch_size}
+                case "stats":
+                    return {"id": request_id, "ok": True, **self.stats()}
+                case "ping":
+                    return {"id": request_id, "ok": True}
+                case op:
+                    raise ValueError(f"unknown op {op!r}")
+        except Exception as error:
+            # A bad query answers with an error; the server and the
+            # connection stay up
+            return {"id": request_id, "ok": False, "error": f"{type(error).__name__}: {error}"}
+
+    @staticmethod
+    def _result_fields(result: SearchResult) -> dict:
+        return {
+            "path": result.path,
+            "found": result.found,
+            "hops": result.hops,
+            "messages": result.messages,
+            "nodes_visited": result.nodes_visited,
+            "cache_hits": result.cache_hits,
+        }
+
+    def _enqueue(self, requester_id: str, resource: str, method: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (resource, method)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            loop.call_later(self.batch_window, self._dispatch, key)
+        batch.append((requester_id, future))
+        return future
+
+    def _dispatch(self, key: tuple[str, str]) -> None:
+        self._spawn(self._run_batch(key, self._pending.pop(key)))
+
+    async def _run_batch(self, key: tuple[str, str], batch: list[tuple[str, asyncio.Future]]) -> None:
+        resource, method = key
+        requester_ids = [requester_id for requester_id, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.session.fetch_batch, requester_ids, resource, method,
+            )
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.batches += 1
+        searches = 1 if self.session.shares_traversal(method, len(results)) else len(results)
+        self.searches_saved += len(batch) - searches
+        for requester_id, future in batch:
+            if not future.done():
+                future.set_result((results[requester_id], len(batch)))
+
+
+async def serve(session: FetchSession, host: str = "127.0.0.1", port: int = 0, path: str | None = None, batch_window: float = 0.001) -> None:
+    """Run a QueryServer until cancelled (Ctrl+C under asyncio.run)."""
+    server = QueryServer(session, batch_window)
+    await server.start(host, port, path)
+    print(f"Servidor de consultas ouvindo em {server.address}")
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+class QueryClient:
+    """
+    Blocking client for QueryServer that keeps one connection open. fetch
+    makes one round trip; fetch_many pipelines a whole list of queries.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int | None = None, path: str | None = None, timeout: float | None = None):
+        if path is not None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            sock.connect(path)
+        elif port is not None:
+            sock = socket.create_connection((host, port), timeout=timeout)
+        else:
+            raise ValueError("QueryClient needs a port or a Unix socket path")
+        self._socket = sock
+        self._file = sock.makefile("rwb")
+        self._next_id = 0
+
+    def _send(self, request: dict) -> int:
+        self._next_id += 1
+        self._file.write(json.dumps({**request, "id": self._next_id}).encode() + b"\n")
+        return self._next_id
+
+    def _receive(self) -> dict:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    def request(self, **fields) -> dict:
+        self._send(fields)
+        self._file.flush()
+        return self._receive()
+
+    def fetch(self, requester_id: str, resource: str, search_method: str | None = None) -> dict:
+        request = {"requester_id": requester_id, "resource": resource}
+        if search_method is not None:
+            request["search_method"] = search_method
+        response = self.request(**request)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response
+
+    def fetch_many(self, queries: Iterable[Query]) -> list[dict]:
+        """Send every query before reading any response; responses come back in query order."""
+        ids = []
+        for requester_id, resource, *method in queries:
+            request = {"requester_id": requester_id, "resource": resource}
+            if method:
+                request["search_method"] = method[0]
+            ids.append(self._send(request))
+        self._file.flush()
+        responses = {}
+        for _ in ids:
+            response = self._receive()
+            responses[response["id"]] = response
+        return [responses[request_id] for request_id in ids]
+
+    def stats(self) -> dict:
+        return self.request(op="stats")
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> "QueryClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,154 @@
+"""
+Persistent fetch session: one network and one cache kept in memory for many
+queries.
+
+A plain ``Network.fetch`` with use_cache loads the cache file, runs one
+search and rewrites the whole file. A session loads the cache once, with
+deferred writes, and flushes it only when it holds changes: every
+``flush_every`` updated entries, every ``flush_interval`` seconds from a
+background timer, and at close. Queries that only hit the cache never
+write anything.
+"""
+import json
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Iterator
+
+from cache import Cache
+from loader import NetworkLoader
+from metrics import MetricsRegistry
+from network import Network
+from result import SearchResult
+from search import NetworkSearch
+from tracing import Tracer
+
+# (requester_id, resource) or (requester_id, resource, search_method)
+Query = tuple[str, str] | tuple[str, str, str]
+
+
+def load_queries(path: str | Path) -> Iterator[Query]:
+    """
+    Queries from a text file, one per line: ``requester_id resource
+    [search_method]``. Blank lines and lines starting with # are skipped.
+    """
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            if len(fields) not in (2, 3):
+                raise ValueError(f"{path}:{line_number}: expected 'requester_id resource [search_method]', got {line.strip()!r}")
+            yield tuple(fields)
+
+
+class FetchSession:
+    """
+    Serves fetches from a resident network and cache. Use it as a context
+    manager, or call close() so the last changes reach the cache file.
+
+    With shared_traversal, fetch_batch answers the requesters of a BFS batch
+    with one traversal (NetworkSearch.bfs_batch), in which TTL bounds hops.
+    """
+
+    def __init__(self, network: Network | str | Path, ttl: int, search_method: str = "bfs", use_cache: bool = True, cache_file: str | Path | None = None, flush_every: int = 100, flush_interval: float | None = 5.0, tracer: Tracer | None = None, metrics: MetricsRegistry | None = None, shared_traversal: bool = False):
+        if flush_every < 1:
+            raise ValueError(f"flush_every must be at least 1, got {flush_every}")
+        if flush_interval is not None and flush_interval <= 0:
+            raise ValueError(f"flush_interval must be positive, got {flush_interval}")
+        self.network = network if isinstance(network, Network) else NetworkLoader().load(network)
+        self.ttl = ttl
+        self.search_method = search_method
+        self.flush_every = flush_every
+        self.shared_traversal = shared_traversal
+        self.tracer = tracer
+        self.metrics = metrics
+        self.queries = 0
+        self.flushes = 0
+        self.cache = self._load_cache(Path(cache_file or "cache.json")) if use_cache else None
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = None
+        if self.cache is not None and flush_interval is not None:
+            self._timer = threading.Thread(target=self._flush_periodically, args=(flush_interval,), name="cache-flush", daemon=True)
+            self._timer.start()
+
+    def _load_cache(self, path: Path) -> Cache:
+        nodes = {}
+        if path.exists():
+            with path.open("r") as f:
+                nodes = json.load(f)
+        return Cache(nodes=nodes, file_path=path, network=self.network, deferred_write=True, metrics=self.metrics)
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            self.flush()
+
+    def fetch(self, requester_id: str, resource: str, search_method: str | None = None) -> SearchResult:
+        if self._closed.is_set():
+            raise ValueError("fetch on a closed session")
+        result = self.network.fetch(
+            requester_id, resource, search_method=search_method or self.search_method, ttl=self.ttl,
+            cache=self.cache, tracer=self.tracer, metrics=self.metrics,
+        )
+        self.queries += 1
+        if self.cache is not None and self.cache.dirty >= self.flush_every:
+            self.flush()
+        return result
+
+    def fetch_batch(self, requester_ids: list[str], resource: str, search_method: str | None = None) -> dict[str, SearchResult]:
+        """
+        Fetch one resource for several requesters. Repeated requests from one
+        requester share its search. By default every distinct requester gets
+        the result fetch would return. With shared_traversal, a BFS batch is
+        answered by a single traversal outward from the holders: TTL then
+        bounds the hops of each route, where bfs counts dequeued nodes, so
+        far requesters may be found that bfs would miss. Every result then
+        carries the cost of the whole traversal.
+        """
+        if self._closed.is_set():
+            raise ValueError("fetch on a closed session")
+        search_method = search_method or self.search_method
+        requester_ids = list(dict.fromkeys(requester_ids))
+        if not self.shares_traversal(search_method, len(requester_ids)):
+            return {requester_id: self.fetch(requester_id, resource, search_method) for requester_id in requester_ids}
+        search = NetworkSearch(self.network, self.ttl, cache=self.cache, tracer=self.tracer, metrics=self.metrics)
+        paths, cost = search.bfs_batch(requester_ids, resource, use_cache=self.cache is not None)
+        self.queries += len(requester_ids)
+        if self.cache is not None and self.cache.dirty >= self.flush_every:
+            self.flush()
+        return {requester_id: replace(cost, path=path) for requester_id, path in paths.items()}
+
+    def shares_traversal(self, search_method: str, requesters: int) -> bool:
+        """Whether fetch_batch answers this many distinct requesters with one traversal."""
+        return self.shared_traversal and search_method == "bfs" and requesters > 1
+
+    def run(self, queries: Iterator[Query] | list[Query]) -> Iterator[SearchResult]:
+        """Fetch each query in order, yielding results as they complete."""
+        for requester_id, resource, *method in queries:
+            yield self.fetch(requester_id, resource, method[0] if method else None)
+
+    def flush(self) -> bool:
+        """Write the cache file if it changed since the last write; returns whether it wrote."""
+        if self.cache is None:
+            return False
+        # Timer and threshold flushes never interleave their writes
+        with self._flush_lock:
+            wrote = self.cache.flush_if_dirty()
+            if wrote:
+                self.flushes += 1
+        return wrote
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+        self.flush()
+
+    def __enter__(self) -> "FetchSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,363 @@
+"""
+Discrete-event simulation of lookups as messages over links with latency
+and bandwidth.
+
+NetworkSearch measures wall time, which reflects how fast the interpreter
+runs rather than how the network behaves. Here every query and response is
+a message event on a heap ordered by simulated time:
+
+- a message crossing a link waits for the link to be free (links are FIFO
+  per direction), takes ``message_size / bandwidth`` to transmit and then
+  ``latency`` to arrive. Latency is in milliseconds (``Graph.latency``,
+  1.0 when unset); bandwidth is in bytes per millisecond
+  (``Graph.bandwidth``, ``default_bandwidth`` when unset, unlimited when
+  that is None);
+- nodes only know what their messages tell them: a flooded query reaches
+  nodes that already saw it and is dropped there, and responses travel back
+  hop by hop along the route the query took.
+
+Methods:
+
+- ``flood``: forwarded to every neighbor but the sender while TTL lasts;
+- ``random``: one walker that never revisits a node;
+- ``bfs``: expanding ring, i.e. floods with TTL 2, 4, 8, ... up to the TTL,
+  the next one starting once the previous ring has died out unanswered (an
+  idealized timeout);
+- with a cache, a requester whose cached route still holds sends the query
+  along that route instead.
+
+Queries in flight at the same time share the links, so queueing shows up in
+the response times once a link's bandwidth is the bottleneck.
+"""
+import heapq
+import random
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from cache import Cache
+from histogram import Histogram
+
+if TYPE_CHECKING:
+    from network import Network
+
+METHODS = ("flood", "random", "bfs")
+
+# Event kinds
+_ARRIVAL, _QUERY, _RESPONSE = 0, 1, 2
+
+# Fields of a directed link's state
+_LATENCY, _TRANSMIT, _FREE_AT, _BUSY, _CARRIED = range(5)
+
+
+@dataclass(slots=True, eq=False)
+class SimulatedQuery:
+    """
+    One lookup and what it cost in simulated time.
+
+    - method: the search method, or "cache" when a cached route answered it
+    - path: requester to holder, None if nothing was found
+    - response_time: from issue to the first response reaching the requester
+    - finished_at: when the answer arrived or the search died out
+    - messages / responses: query and response messages sent
+    - duplicates: query messages dropped by a node that had already seen them
+    """
+    requester: str
+    resource: str
+    method: str
+    issued_at: float
+    path: list[str] | None = None
+    response_time: float | None = None
+    finished_at: float | None = None
+    messages: int = 0
+    responses: int = 0
+    duplicates: int = 0
+
+    @property
+    def found(self) -> bool:
+        return self.path is not None
+
+    @property
+    def hops(self) -> int | None:
+        return len(self.path) - 1 if self.path is not None else None
+
+
+class _Lookup:
+    """Per-query protocol state, kept apart from the reported result."""
+    __slots__ = ("query", "mode", "ttl", "seen", "parent", "route", "outstanding", "answered", "done")
+
+    def __init__(self, query: SimulatedQuery):
+        self.query = query
+        self.mode = query.method
+        self.ttl = 0
+        self.seen: set[str] = set()
+        self.parent: dict[str, str] = {}
+        self.route: list[str] = []
+        self.outstanding = 0
+        self.answered = False
+        self.done = False
+
+
+class NetworkSimulator:
+    """
+    Links are read from the network once, when the simulator is built; build
+    a new one after changing the network.
+    """
+
+    def __init__(self, network: "Network", ttl: int, cache: Cache | None = None, message_size: float = 64.0, default_bandwidth: float | None = None, seed: int | None = None):
+        if ttl < 1:
+            raise ValueError(f"ttl must be at least 1, got {ttl}")
+        if message_size <= 0:
+            raise ValueError(f"message_size must be positive, got {message_size}")
+        if default_bandwidth is not None and default_bandwidth <= 0:
+            raise ValueError(f"default_bandwidth must be positive, got {default_bandwidth}")
+        self.network = network
+        self.ttl = ttl
+        self.cache = cache
+        self.message_size = message_size
+        self.default_bandwidth = default_bandwidth
+        self.rng = random.Random(seed)
+        self.now = 0.0
+        self.events = 0
+        self.queries: list[SimulatedQuery] = []
+        self._events: list[tuple] = []
+        self._sequence = 0
+        # source -> target -> [latency, transmit time, free at, time busy, messages carried],
+        # so sending a message costs one lookup instead of one per attribute
+        graph = network.graph
+        self._links: dict[str, dict[str, list[float]]] = {}
+        for source, neighbors in graph.neighbors.items():
+            latency = graph.latency.get(source, {})
+            bandwidth = graph.bandwidth.get(source, {})
+            links = self._links[source] = {}
+            for target in neighbors:
+                rate = bandwidth.get(target, default_bandwidth)
+                links[target] = [latency.get(target, graph.DEFAULT_LATENCY), message_size / rate if rate is not None else 0.0, 0.0, 0.0, 0]
+
+    def submit(self, requester: str, resource: str, method: str = "flood", at: float | None = None) -> SimulatedQuery:
+        """Schedule a lookup issued at simulated time ``at`` (now by default); filled in by run()."""
+        if method not in METHODS:
+            raise ValueError(f"Unknown search method: {method}")
+        if self.network[requester] is None:
+            raise ValueError(f"Node {requester} is not in the network")
+        at = self.now if at is None else at
+        if at < self.now:
+            raise ValueError(f"Cannot issue a query at {at}, the simulation is already at {self.now}")
+        query = SimulatedQuery(requester, resource, method, at)
+        self.queries.append(query)
+        self._push(at, _ARRIVAL, _Lookup(query), requester, None, 0, None)
+        return query
+
+    def _push(self, at: float, kind: int, lookup: _Lookup, node: str, sender: str | None, ttl: int, holder: str | None) -> None:
+        self._sequence += 1
+        heapq.heappush(self._events, (at, self._sequence, kind, lookup, node, sender, ttl, holder))
+
+    def _send(self, lookup: _Lookup, source: str, target: str, kind: int, ttl: int, holder: str | None = None) -> None:
+        """
+        Queue a message from ``source`` to ``target``. Queries carry their
+        remaining TTL (their position, along a cached route); responses
+        carry their position along ``lookup.route``, or -1 and the
+        ``holder`` when they follow the parent links of a flood.
+        """
+        link = self._links[source][target]
+        start = self.now
+        transmit = link[_TRANSMIT]
+        if transmit:
+            if link[_FREE_AT] > start:
+                start = link[_FREE_AT]
+            link[_FREE_AT] = start + transmit
+            link[_BUSY] += transmit
+        link[_CARRIED] += 1
+        if kind == _QUERY:
+            lookup.query.messages += 1
+            lookup.outstanding += 1
+        else:
+            lookup.query.responses += 1
+        self._sequence += 1
+        heapq.heappush(self._events, (start + transmit + link[_LATENCY], self._sequence, kind, lookup, target, source, ttl, holder))
+
+    def run(self, until: float | None = None) -> list[SimulatedQuery]:
+        """Process events up to simulated time ``until`` (all of them by default)."""
+        events = self._events
+        pop = heapq.heappop
+        handlers = (self._on_arrival, self._on_query, self._on_response)
+        processed = 0
+        while events and (until is None or events[0][0] <= until):
+            at, _, kind, lookup, node, sender, ttl, holder = pop(events)
+            self.now = at
+            handlers[kind](lookup, node, sender, ttl, holder)
+            processed += 1
+        self.events += processed
+        if until is not None and until > self.now:
+            self.now = until
+        return self.queries
+
+    def link_utilization(self) -> dict[tuple[str, str], float]:
+        """Share of the simulated time each directed link that carried a message spent transmitting."""
+        return {
+            (source, target): link[_BUSY] / self.now if self.now > 0 else 0.0
+            for source, links in self._links.items()
+            for target, link in links.items()
+            if link[_CARRIED]
+        }
+
+    def stats(self) -> dict:
+        finished = [query for query in self.queries if query.finished_at is not None]
+        found = [query for query in finished if query.found]
+        response_time = Histogram()
+        for query in found:
+            response_time.record(query.response_time)
+        utilization = self.link_utilization()
+        busiest = max(utilization, key=utilization.get, default=None)
+        if busiest is not None and not utilization[busiest]:
+            # Unlimited bandwidth: no link is ever busy
+            busiest = None
+        return {
+            "queries": len(self.queries),
+            "finished": len(finished),
+            "success_rate": len(found) / len(finished) if finished else 0.0,
+            "cache_answers": sum(query.method == "cache" for query in finished),
+            "messages": sum(query.messages for query in self.queries),
+            "responses": sum(query.responses for query in self.queries),
+            "duplicates": sum(query.duplicates for query in self.queries),
+            "response_time_ms": {"mean": response_time.mean if found else None, **response_time.percentiles((0.5, 0.99))},
+            "events": self.events,
+            "simulated_ms": self.now,
+            "links_used": len(utilization),
+            "link_utilization_mean": sum(utilization.values()) / len(utilization) if utilization else 0.0,
+            "link_utilization_max": utilization[busiest] if busiest is not None else 0.0,
+            "busiest_link": list(busiest) if busiest is not None else None,
+        }
+
+    # Protocol
+
+    def _holds(self, node: str, resource: str) -> bool:
+        return self.network[node].has_resource(resource)
+
+    def _finish(self, lookup: _Lookup, path: list[str] | None) -> None:
+        lookup.done = True
+        query = lookup.query
+        query.finished_at = self.now
+        if path is not None:
+            query.path = path
+            query.response_time = self.now - query.issued_at
+            if self.cache is not None and len(path) > 1:
+                self.cache.update(query.resource, path)
+
+    def _on_arrival(self, lookup: _Lookup, node: str, sender: str | None, ttl: int, holder: None) -> None:
+        query = lookup.query
+        if self._holds(node, query.resource):
+            self._finish(lookup, [node])
+            return
+        if self.cache is not None:
+            node_cache = self.cache[node]
+            cached = node_cache.get(query.resource) if node_cache is not None else None
+            route = self.cache.follow(cached, [node], query.resource) if cached else None
+            if route is not None:
+                query.method = lookup.mode = "cache"
+                lookup.route = route
+                self._send(lookup, node, route[1], _QUERY, 1)
+                return
+        if lookup.mode == "random":
+            lookup.route = [node]
+            lookup.seen.add(node)
+            self._walk(lookup, node, self.ttl)
+        else:
+            self._start_ring(lookup, 2 if lookup.mode == "bfs" else self.ttl)
+
+    def _start_ring(self, lookup: _Lookup, ttl: int) -> None:
+        requester = lookup.query.requester
+        lookup.ttl = min(ttl, self.ttl)
+        lookup.seen = {requester}
+        lookup.parent = {}
+        if lookup.ttl > 1:
+            self._forward(lookup, requester, None, lookup.ttl - 1)
+        self._check_quiet(lookup)
+
+    def _forward(self, lookup: _Lookup, node: str, sender: str | None, ttl: int) -> None:
+        """Flood a query to every neighbor but the sender; _send inlined, as floods send most messages."""
+        now = self.now
+        push = heapq.heappush
+        events = self._events
+        sent = 0
+        for target, link in self._links[node].items():
+            if target == sender:
+                continue
+            start = now
+            transmit = link[_TRANSMIT]
+            if transmit:
+                if link[_FREE_AT] > start:
+                    start = link[_FREE_AT]
+                link[_FREE_AT] = start + transmit
+                link[_BUSY] += transmit
+            link[_CARRIED] += 1
+            self._sequence += 1
+            push(events, (start + transmit + link[_LATENCY], self._sequence, _QUERY, lookup, target, node, ttl, None))
+            sent += 1
+        lookup.query.messages += sent
+        lookup.outstanding += sent
+
+    def _check_quiet(self, lookup: _Lookup) -> None:
+        if lookup.outstanding or lookup.answered or lookup.done:
+            return
+        if lookup.mode == "bfs" and lookup.ttl < self.ttl:
+            self._start_ring(lookup, lookup.ttl * 2)
+        else:
+            self._finish(lookup, None)
+
+    def _walk(self, lookup: _Lookup, node: str, ttl: int) -> None:
+        seen = lookup.seen
+        candidates = [neighbor for neighbor in self._links[node] if neighbor not in seen]
+        if ttl > 1 and candidates:
+            self._send(lookup, node, self.rng.choice(candidates), _QUERY, ttl - 1)
+        else:
+            self._finish(lookup, None)
+
+    def _on_query(self, lookup: _Lookup, node: str, sender: str, ttl: int, holder: None) -> None:
+        lookup.outstanding -= 1
+        resource = lookup.query.resource
+        match lookup.mode:
+            case "cache":
+                # ttl carries the position along the cached route
+                route = lookup.route
+                if ttl < len(route) - 1:
+                    self._send(lookup, node, route[ttl + 1], _QUERY, ttl + 1)
+                else:
+                    lookup.answered = True
+                    self._send(lookup, node, sender, _RESPONSE, ttl - 1)
+            case "random":
+                lookup.route.append(node)
+                lookup.seen.add(node)
+                if self._holds(node, resource):
+                    lookup.answered = True
+                    self._send(lookup, node, sender, _RESPONSE, len(lookup.route) - 2)
+                else:
+                    self._walk(lookup, node, ttl)
+            case _:
+                if node in lookup.seen:
+                    lookup.query.duplicates += 1
+                    self._check_quiet(lookup)
+                    return
+                lookup.seen.add(node)
+                lookup.parent[node] = sender
+                if self._holds(node, resource):
+                    # Holders answer and stop forwarding; other branches go on
+                    lookup.answered = True
+                    self._send(lookup, node, sender, _RESPONSE, -1, node)
+                elif ttl > 1:
+                    self._forward(lookup, node, sender, ttl - 1)
+                self._check_quiet(lookup)
+
+    def _on_response(self, lookup: _Lookup, node: str, sender: str, ttl: int, holder: str | None) -> None:
+        if ttl < 0:
+            if node != lookup.query.requester:
+                self._send(lookup, node, lookup.parent[node], _RESPONSE, -1, holder)
+            elif not lookup.done:
+                path = [holder]
+                while path[-1] != node:
+                    path.append(lookup.parent[path[-1]])
+                path.reverse()
+                self._finish(lookup, path)
+        elif ttl > 0:
+            self._send(lookup, node, lookup.route[ttl - 1], _RESPONSE, ttl - 1)
+        elif not lookup.done:
+            self._finish(lookup, list(lookup.route))
@@ -0,0 +1,402 @@
+"""
+Binary network snapshots.
+
+Layout (little-endian):
+
+    8 bytes   magic b"P2PSNAP\\x01"
+    8 bytes   header length (uint64)
+    N bytes   JSON header: num_nodes, min/max_neighbors and, for every array,
+              its dtype, shape and byte offset from the start of the file
+    ...       arrays, each aligned to 64 bytes
+
+Arrays:
+
+    node_offsets, node_names          id string table (NUL-terminated UTF-8
+                                      strings + start offsets)
+    name_order                        node positions sorted by id, for
+                                      binary search lookups
+    indptr, indices                   CSR adjacency
+    resource_offsets, resource_names  resource string table
+    holdings_indptr, holdings         resource ids held by each node (CSR)
+    latency, bandwidth                optional per-adjacency link attributes
+                                      (NaN when unset), aligned with indices
+
+Opening a snapshot memory-maps the arrays without parsing anything; ids and
+neighbor lists are decoded only when a node is looked up, and lookups binary
+search ``name_order`` instead of building an id -> position dict.
+"""
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+import json
+
+import numpy as np
+
+from graph import Graph, GraphSchema
+from graph.csr import CSR
+from network import Network, NetworkNode
+
+
+MAGIC = b"P2PSNAP\x01"
+ALIGNMENT = 64
+SUFFIX = ".snapshot"
+
+
+def _string_table(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [s.encode("utf-8") + b"\0" for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+def _decode_table(offsets: np.ndarray, blob: np.ndarray) -> list[str]:
+    # Splitting on the terminators is much faster than slicing by offset;
+    # NUL never occurs inside a multi-byte UTF-8 sequence.
+    if len(offsets) <= 1:
+        return []
+    return blob.tobytes().decode("utf-8").split("\0")[:-1]
+
+
+def write_snapshot(path: Path | str, csr: CSR, resource_names: list[str], holdings_indptr: np.ndarray, holdings: np.ndarray, min_neighbors: int = 0, max_neighbors: int | None = None, latency: np.ndarray | None = None, bandwidth: np.ndarray | None = None) -> None:
+    """Write a snapshot from already built arrays (see the module docstring)."""
+    node_offsets, node_names = _string_table(csr.ids)
+    resource_offsets, resource_blob = _string_table(resource_names)
+    arrays = {
+        "node_offsets": node_offsets,
+        "node_names": node_names,
+        "name_order": np.argsort(np.array(csr.ids, dtype=str), kind="stable").astype(np.int64),
+        "indptr": np.asarray(csr.indptr, dtype=np.int64),
+        "indices": np.asarray(csr.indices),
+        "resource_offsets": resource_offsets,
+        "resource_names": resource_blob,
+        "holdings_indptr": np.asarray(holdings_indptr, dtype=np.int64),
+        "holdings": np.asarray(holdings, dtype=np.int32),
+    }
+    if latency is not None:
+        arrays["latency"] = np.asarray(latency, dtype=np.float64)
+    if bandwidth is not None:
+        arrays["bandwidth"] = np.asarray(bandwidth, dtype=np.float64)
+
+    degree = np.diff(arrays["indptr"])
+    header = {
+        "version": 1,
+        "num_nodes": csr.num_nodes,
+        "min_neighbors": min_neighbors,
+        "max_neighbors": max_neighbors if max_neighbors is not None else int(degree.max(initial=0)),
+        "arrays": {},
+    }
+
+    # Offsets depend on the header size, which depends on the offsets: lay the
+    # arrays out after a generously padded header.
+    layout = {name: {"dtype": array.dtype.str, "shape": list(array.shape)} for name, array in arrays.items()}
+    header["arrays"] = layout
+    reserved = len(json.dumps(header)) + 32 * len(arrays) + 256
+    offset = _align(len(MAGIC) + 8 + reserved)
+    for name, array in arrays.items():
+        layout[name]["offset"] = offset
+        offset = _align(offset + array.nbytes)
+
+    header_bytes = json.dumps(header).encode("utf-8").ljust(reserved, b" ")
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(offset)
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_schema_snapshot(path: Path | str, schema: GraphSchema) -> None:
+    """Convert a JSON schema to a snapshot without building Node objects."""
+    ids: list[str] = []
+    index: dict[str, int] = {}
+    for edge in schema.edges:
+        for node_id in (edge[0], edge[1]):
+            if node_id not in index:
+                index[node_id] = len(ids)
+                ids.append(node_id)
+    for node_id in schema.resources:
+        if node_id not in index:
+            index[node_id] = len(ids)
+            ids.append(node_id)
+
+    n = len(ids)
+    sources = np.fromiter((index[edge[0]] for edge in schema.edges), dtype=np.int64, count=len(schema.edges))
+    targets = np.fromiter((index[edge[1]] for edge in schema.edges), dtype=np.int64, count=len(schema.edges))
+    attributes = [GraphSchema.edge_attributes(edge) for edge in schema.edges]
+    latency = np.array([a.get("latency", np.nan) for a in attributes], dtype=np.float64)
+    bandwidth = np.array([a.get("bandwidth", np.nan) for a in attributes], dtype=np.float64)
+
+    csr, edge_of = CSR.from_edges(ids, sources, targets)
+    latency = latency[edge_of]
+    bandwidth = bandwidth[edge_of]
+
+    resource_names: list[str] = []
+    resource_index: dict[str, int] = {}
+    holdings_indptr = np.zeros(n + 1, dtype=np.int64)
+    held: list[list[int]] = [[] for _ in range(n)]
+    for node_id, resources in schema.resources.items():
+        for resource in resources:
+            if resource not in resource_index:
+                resource_index[resource] = len(resource_names)
+                resource_names.append(resource)
+            held[index[node_id]].append(resource_index[resource])
+    np.cumsum(np.fromiter((len(h) for h in held), dtype=np.int64, count=n), out=holdings_indptr[1:])
+    holdings = np.fromiter((r for h in held for r in h), dtype=np.int32, count=int(holdings_indptr[-1]))
+
+    write_snapshot(
+        path,
+        csr,
+        resource_names,
+        holdings_indptr,
+        holdings,
+        min_neighbors=schema.min_neighbors,
+        max_neighbors=schema.max_neighbors,
+        latency=latency if not np.isnan(latency).all() else None,
+        bandwidth=bandwidth if not np.isnan(bandwidth).all() else None,
+    )
+
+
+class Snapshot:
+    """A memory-mapped snapshot file."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a network snapshot")
+            header_length = int.from_bytes(f.read(8), "little")
+            self.header = json.loads(f.read(header_length))
+
+        # One mapping of the whole file; every array is a view into it
+        self._raw = np.memmap(self.path, dtype=np.uint8, mode="r")
+        self.arrays: dict[str, np.ndarray] = {}
+        for name, spec in self.header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            nbytes = dtype.itemsize * int(np.prod(shape))
+            self.arrays[name] = self._raw[spec["offset"]:spec["offset"] + nbytes].view(dtype).reshape(shape)
+
+        self._ids: list[str] | None = None
+        self._resource_names: list[str] | None = None
+        self._index: dict[str, int] | None = None
+
+    @property
+    def num_nodes(self) -> int:
+        return self.header["num_nodes"]
+
+    @property
+    def ids(self) -> list[str]:
+        if self._ids is None:
+            self._ids = _decode_table(self.arrays["node_offsets"], self.arrays["node_names"])
+        return self._ids
+
+    @property
+    def resource_names(self) -> list[str]:
+        if self._resource_names is None:
+            self._resource_names = _decode_table(self.arrays["resource_offsets"], self.arrays["resource_names"])
+        return self._resource_names
+
+    @property
+    def index(self) -> dict[str, int]:
+        if self._index is None:
+            self._index = dict(zip(self.ids, range(self.num_nodes)))
+        return self._index
+
+    def name_of(self, i: int) -> str:
+        if self._ids is not None:
+            return self._ids[i]
+        offsets = self.arrays["node_offsets"]
+        return self.arrays["node_names"][offsets[i]:offsets[i + 1] - 1].tobytes().decode("utf-8")
+
+    def index_of(self, name: str) -> int | None:
+        """Position of a node id, or None. O(log n) until the full index is built."""
+        if self._index is not None:
+            return self._index.get(name)
+        order = self.arrays["name_order"]
+        lo, hi = 0, self.num_nodes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.name_of(int(order[mid])) < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.num_nodes:
+            i = int(order[lo])
+            if self.name_of(i) == name:
+                return i
+        return None
+
+    @property
+    def csr(self) -> CSR:
+        return CSR(ids=self.ids, indptr=self.arrays["indptr"], indices=self.arrays["indices"])
+
+    def neighbor_indices(self, i: int) -> np.ndarray:
+        indptr = self.arrays["indptr"]
+        return self.arrays["indices"][indptr[i]:indptr[i + 1]]
+
+    def resources_of(self, i: int) -> set[str]:
+        indptr = self.arrays["holdings_indptr"]
+        held = self.arrays["holdings"][indptr[i]:indptr[i + 1]].tolist()
+        if self._resource_names is not None:
+            return {self._resource_names[r] for r in held}
+        offsets = self.arrays["resource_offsets"]
+        blob = self.arrays["resource_names"]
+        return {blob[offsets[r]:offsets[r + 1] - 1].tobytes().decode("utf-8") for r in held}
+
+    def to_schema(self) -> GraphSchema:
+        ids = self.ids
+        indptr = self.arrays["indptr"]
+        indices = self.arrays["indices"]
+        latency = self.arrays.get("latency")
+        bandwidth = self.arrays.get("bandwidth")
+        edges = []
+        for i in range(self.num_nodes):
+            for position in range(int(indptr[i]), int(indptr[i + 1])):
+                j = int(indices[position])
+                if i >= j:
+                    continue
+                edge = [ids[i], ids[j]]
+                attributes = {}
+                if latency is not None and not np.isnan(latency[position]):
+                    attributes["latency"] = float(latency[position])
+                if bandwidth is not None and not np.isnan(bandwidth[position]):
+                    attributes["bandwidth"] = float(bandwidth[position])
+                if attributes:
+                    edge.append(attributes)
+                edges.append(edge)
+        return GraphSchema(
+            num_nodes=self.num_nodes,
+            min_neighbors=self.header["min_neighbors"],
+            max_neighbors=self.header["max_neighbors"],
+            resources={ids[i]: sorted(self.resources_of(i)) for i in range(self.num_nodes)},
+            edges=edges,
+        )
+
+
+class _NeighborView(Mapping):
+    """Read-only ``dict[str, list[str]]`` over the snapshot's CSR adjacency."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+
+    def __getitem__(self, node_id: str) -> list[str]:
+        i = self.snapshot.index_of(node_id)
+        if i is None:
+            raise KeyError(node_id)
+        name_of = self.snapshot.name_of
+        return [name_of(j) for j in self.snapshot.neighbor_indices(i).tolist()]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.snapshot.ids)
+
+    def __len__(self) -> int:
+        return self.snapshot.num_nodes
+
+    def __contains__(self, node_id: object) -> bool:
+        return isinstance(node_id, str) and self.snapshot.index_of(node_id) is not None
+
+
+class _LinkView(Mapping):
+    """Per-node link attribute map (``Graph.latency``/``bandwidth``) over a snapshot array."""
+
+    def __init__(self, snapshot: Snapshot, values: np.ndarray):
+        self.snapshot = snapshot
+        self.values = values
+
+    def __getitem__(self, node_id: str) -> dict[str, float]:
+        i = self.snapshot.index_of(node_id)
+        if i is None:
+            raise KeyError(node_id)
+        indptr = self.snapshot.arrays["indptr"]
+        start, end = int(indptr[i]), int(indptr[i + 1])
+        name_of = self.snapshot.name_of
+        return {
+            name_of(j): float(value)
+            for j, value in zip(self.snapshot.arrays["indices"][start:end].tolist(), self.values[start:end].tolist())
+            if value == value
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.snapshot.ids)
+
+    def __len__(self) -> int:
+        return self.snapshot.num_nodes
+
+
+class SnapshotGraph(Graph):
+    """
+    Graph backed by a memory-mapped snapshot. Nodes are created on first
+    access and kept, so repeated lookups return the same node object.
+    """
+
+    def __init__(self, snapshot: Snapshot):
+        latency = snapshot.arrays.get("latency")
+        bandwidth = snapshot.arrays.get("bandwidth")
+        super().__init__(
+            nodes=[],
+            neighbors=_NeighborView(snapshot),
+            latency=_LinkView(snapshot, latency) if latency is not None else {},
+            bandwidth=_LinkView(snapshot, bandwidth) if bandwidth is not None else {},
+        )
+        self.snapshot = snapshot
+        self._materialized: dict[str, NetworkNode] = {}
+
+    def __getitem__(self, name: str) -> NetworkNode | None:
+        node = self._materialized.get(name)
+        if node is None:
+            i = self.snapshot.index_of(name)
+            if i is None:
+                return None
+            node = NetworkNode(name, self.snapshot.resources_of(i))
+            self._materialized[name] = node
+        return node
+
+    def __setitem__(self, name: str, value: NetworkNode) -> None:
+        self._materialized[name] = value
+
+    @property
+    def nodes(self) -> list[NetworkNode]:
+        return [self[node_id] for node_id in self.snapshot.ids]
+
+    @nodes.setter
+    def nodes(self, value: list) -> None:
+        # Graph.__init__ assigns an empty list; nodes come from the snapshot
+        pass
+
+    @property
+    def edge_list(self) -> list[list[str]]:
+        return self.derive_edge_list()
+
+    @edge_list.setter
+    def edge_list(self, value: list | None) -> None:
+        pass
+
+    def derive_edge_list(self) -> list[list[str]]:
+        ids = self.snapshot.ids
+        indptr = self.snapshot.arrays["indptr"].tolist()
+        indices = self.snapshot.arrays["indices"].tolist()
+        return [
+            [ids[i], ids[j]]
+            for i in range(self.snapshot.num_nodes)
+            for j in indices[indptr[i]:indptr[i + 1]]
+            if i < j
+        ]
+
+    def to_csr(self) -> CSR:
+        return self.snapshot.csr
+
+
+def load_snapshot(path: Path | str) -> Network:
+    return Network(SnapshotGraph(Snapshot(path)))
+
+
+def is_snapshot(path: Path | str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
@@ -0,0 +1,195 @@
+"""
+Low-overhead search tracing.
+
+A search asks the tracer for an emitter with ``begin``; the emitter records
+compact events (what happened at which node) instead of snapshots of the
+visited set and path, so recording is O(1) per event. Events go into a ring
+buffer of preallocated slots: once it is full the oldest events are
+overwritten. ``NullTracer`` hands out no emitter at all, so a search without
+tracing pays a single ``if`` per event site.
+"""
+import json
+import random
+import sys
+import threading
+from dataclasses import dataclass
+from enum import IntEnum
+from itertools import count
+from pathlib import Path
+from typing import Callable
+
+
+class EventType(IntEnum):
+    VISIT = 0      # node checks for the resource; peer is the node it came from
+    FORWARD = 1    # node sends the query on to peer
+    FOUND = 2      # node holds the resource
+    CACHE_HIT = 3  # node answers from its cache; peer is the cached holder
+    DROP = 4       # query from node to peer discarded (duplicate or TTL expired)
+
+
+@dataclass(slots=True)
+class TraceEvent:
+    search: int
+    type: EventType
+    node: str
+    peer: str | None = None
+    ttl: int = 0
+    thread: int | None = None
+
+
+@dataclass(slots=True)
+class TracedSearch:
+    search: int
+    requester: str
+    resource: str
+
+
+Emitter = Callable[..., None]
+
+
+class NullTracer:
+    """Tracing disabled: searches get no emitter and skip every event site."""
+    enabled = False
+
+    def begin(self, requester: str, resource: str) -> Emitter | None:
+        return None
+
+
+NULL_TRACER = NullTracer()
+
+
+class Tracer:
+    """
+    Records events of a sampled fraction of searches into a ring buffer of
+    ``capacity`` events. Safe to use from several threads. Searches whose
+    events have all been overwritten are eventually forgotten, so
+    ``searches`` stays bounded too.
+    """
+    enabled = True
+
+    def __init__(self, capacity: int = 1 << 16, sample_rate: float = 1.0, seed: int | None = None):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be in [0, 1], got {sample_rate}")
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._search_ids = count()
+        self.searches: dict[int, TracedSearch] = {}
+        # One preallocated column per field; slot i holds event number i mod capacity
+        self._search = [0] * capacity
+        self._type = [0] * capacity
+        self._node: list[str | None] = [None] * capacity
+        self._peer: list[str | None] = [None] * capacity
+        self._ttl = [0] * capacity
+        self._thread: list[int | None] = [None] * capacity
+        # Number of the event in each slot, written last; -1 while empty
+        self._number = [-1] * capacity
+        # Shared with every emitter, so clear() can swap the counter in place
+        self._cursor = [count()]
+
+    def begin(self, requester: str, resource: str) -> Emitter | None:
+        """Start tracing one search; returns None if the search is not sampled."""
+        with self._lock:
+            if self.sample_rate < 1.0 and self._rng.random() >= self.sample_rate:
+                return None
+            search = next(self._search_ids)
+            self.searches[search] = TracedSearch(search, requester, resource)
+            if len(self.searches) > 2 * self.capacity:
+                self._prune_searches()
+
+        # Bound locally so each event costs no attribute lookups on self
+        cursor, capacity = self._cursor, self.capacity
+        # sys._is_gil_enabled only exists from 3.13 on; older builds always have the GIL
+        claim = None if getattr(sys, "_is_gil_enabled", lambda: True)() else self._lock
+        search_column, type_column, node_column = self._search, self._type, self._node
+        peer_column, ttl_column, thread_column, number_column = self._peer, self._ttl, self._thread, self._number
+
+        def emit(event_type: EventType, node: str, peer: str | None = None, ttl: int = 0, thread: int | None = None) -> None:
+            if claim is None:
+                # The GIL makes next() on itertools.count atomic, so threads never share a slot
+                n = next(cursor[0])
+            else:
+                # Free-threaded builds give no such guarantee
+                with claim:
+                    n = next(cursor[0])
+            i = n % capacity
+            search_column[i] = search
+            type_column[i] = event_type
+            node_column[i] = node
+            peer_column[i] = peer
+            ttl_column[i] = ttl
+            thread_column[i] = thread
+            number_column[i] = n
+        return emit
+
+    def _prune_searches(self) -> None:
+        """Forget searches none of whose events are left in the buffer (called with the lock held)."""
+        buffered = {self._search[i] for i, n in enumerate(self._number) if n >= 0}
+        # Searches begun after the newest buffered one may not have emitted yet
+        newest = max(buffered, default=max(self.searches) - 1)
+        self.searches = {search: traced for search, traced in self.searches.items() if search in buffered or search > newest}
+
+    @property
+    def recorded(self) -> int:
+        """Events recorded since the last clear(), overwritten ones included."""
+        return max(self._number) + 1
+
+    @property
+    def overwritten(self) -> int:
+        """Events lost because the buffer wrapped around."""
+        return max(0, self.recorded - self.capacity)
+
+    def events(self) -> list[TraceEvent]:
+        """Events still in the buffer, oldest first."""
+        recorded = self.recorded
+        number = self._number
+        return [
+            TraceEvent(
+                self._search[i], EventType(self._type[i]), self._node[i], self._peer[i], self._ttl[i], self._thread[i]
+            )
+            for n in range(max(0, recorded - self.capacity), recorded)
+            # Skip slots an emitter has claimed but not finished writing
+            if number[i := n % self.capacity] == n
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.searches.clear()
+            self._number[:] = [-1] * self.capacity
+            self._cursor[0] = count()
+
+    def export(self, path: Path | str) -> None:
+        """
+        Write the trace as JSON lines: one line per traced search
+        ({"search", "requester", "resource"}) followed by one line per event.
+        """
+        with open(path, "w") as f:
+            for traced in self.searches.values():
+                f.write(json.dumps({"search": traced.search, "requester": traced.requester, "resource": traced.resource}) + "\n")
+            for event in self.events():
+                f.write(json.dumps({
+                    "search": event.search,
+                    "type": event.type.name.lower(),
+                    "node": event.node,
+                    "peer": event.peer,
+                    "ttl": event.ttl,
+                    "thread": event.thread,
+                }) + "\n")
+
+
+def load_trace(path: Path | str) -> tuple[dict[int, TracedSearch], list[TraceEvent]]:
+    searches: dict[int, TracedSearch] = {}
+    events: list[TraceEvent] = []
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if "type" in record:
+                events.append(TraceEvent(
+                    record["search"], EventType[record["type"].upper()], record["node"], record["peer"], record["ttl"], record["thread"]
+                ))
+            else:
+                searches[record["search"]] = TracedSearch(record["search"], record["requester"], record["resource"])
+    return searches, events
@@ -0,0 +1,146 @@
+"""
+Graph layouts for the visualizer, computed once per topology.
+
+- Small graphs use networkx's spring layout, as the visualizer always did.
+- Large graphs use pivot MDS (Brandes & Pich): BFS distances from a few dozen
+  pivot nodes, then classical MDS on those columns only. It costs
+  O(pivots * (V + E)) with numpy instead of O(V^2) per spring iteration, and
+  lays meshes such as the hexagonal grid out close to their true shape.
+
+Native coordinates from the network file (``positions``) beat both; see
+``NetworkVisualizer.layout``. Computed layouts are stored by ``LayoutCache``
+under a hash of the edge list, so the next visualization of the same
+topology loads them instead.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+from config import Config
+from graph.csr import CSR, first_unique
+
+LAYOUTS = ("auto", "spring", "pivot_mds")
+# Largest graph "auto" still hands to the spring layout; networkx also
+# switches to a scipy-based variant above this size
+SPRING_LIMIT = 500
+
+Positions = dict[str, tuple[float, float]]
+
+
+def edge_hash(edges: list[list[str]]) -> str:
+    """Hash of the topology: edge order, endpoint order and link attributes do not matter."""
+    pairs = sorted(f"{u}\t{v}" if u <= v else f"{v}\t{u}" for u, v, *_ in edges)
+    digest = hashlib.sha256()
+    for pair in pairs:
+        digest.update(pair.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def _csr(edges: list[list[str]]) -> CSR:
+    index: dict[str, int] = {}
+    sources = np.fromiter((index.setdefault(edge[0], len(index)) for edge in edges), dtype=np.int64, count=len(edges))
+    targets = np.fromiter((index.setdefault(edge[1], len(index)) for edge in edges), dtype=np.int64, count=len(edges))
+    csr, _ = CSR.from_edges(list(index), sources, targets)
+    return csr
+
+
+def _bfs_distances(csr: CSR, source: int) -> np.ndarray:
+    """Hop distance from source to every node, -1 where unreachable."""
+    distance = np.full(csr.num_nodes, -1, dtype=np.int64)
+    distance[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while frontier.size:
+        level += 1
+        _, reached = csr.expand(frontier)
+        reached = reached[distance[reached] < 0]
+        reached, _ = first_unique(reached)
+        distance[reached] = level
+        frontier = reached
+    return distance
+
+
+def pivot_mds(csr: CSR, pivots: int = 50, seed: int = 0) -> np.ndarray:
+    """(n, 2) coordinates from pivot MDS, scaled into [-1, 1] like networkx layouts."""
+    n = csr.num_nodes
+    if n == 0:
+        return np.empty((0, 2))
+    if n <= 2:
+        return np.array([[-1.0, 0.0], [1.0, 0.0]])[:n]
+    k = min(pivots, n)
+    rng = np.random.default_rng(seed)
+    columns = np.empty((n, k))
+    # Max-min pivots: each one is the node farthest from those already picked
+    nearest = np.full(n, np.inf)
+    pivot = int(rng.integers(n))
+    for j in range(k):
+        distance = _bfs_distances(csr, pivot).astype(float)
+        # Other components sit just beyond the farthest reachable node
+        distance[distance < 0] = distance.max() + 1
+        columns[:, j] = distance
+        nearest = np.minimum(nearest, distance)
+        pivot = int(nearest.argmax())
+
+    squared = columns ** 2
+    centered = -0.5 * (squared - squared.mean(axis=0) - squared.mean(axis=1, keepdims=True) + squared.mean())
+    eigenvalues, eigenvectors = np.linalg.eigh(centered.T @ centered)
+    coordinates = centered @ eigenvectors[:, np.argsort(eigenvalues)[::-1][:2]]
+    coordinates -= coordinates.mean(axis=0)
+    scale = np.abs(coordinates).max()
+    return coordinates / scale if scale > 0 else coordinates
+
+
+def compute_layout(edges: list[list[str]], algorithm: str = "auto", seed: int = 0) -> Positions:
+    if algorithm not in LAYOUTS:
+        raise ValueError(f"Unknown layout {algorithm!r}, choose from {', '.join(LAYOUTS)}")
+    csr = _csr(edges)
+    if algorithm == "auto":
+        algorithm = "spring" if csr.num_nodes <= SPRING_LIMIT else "pivot_mds"
+    if algorithm == "spring":
+        import networkx as nx
+        G = nx.Graph()
+        G.add_edges_from(edge[:2] for edge in edges)
+        return {node_id: (float(x), float(y)) for node_id, (x, y) in nx.spring_layout(G, seed=seed).items()}
+    coordinates = pivot_mds(csr, seed=seed)
+    return {node_id: (float(x), float(y)) for node_id, (x, y) in zip(csr.ids, coordinates.tolist())}
+
+
+class LayoutCache:
+    """
+    Layouts on disk, one .npz file per (topology, algorithm, seed), by
+    default under Config.LAYOUT_CACHE_DIR.
+    """
+
+    def __init__(self, directory: Path | str | None = None):
+        self.directory = Path(directory) if directory is not None else Config.LAYOUT_CACHE_DIR
+
+    def path(self, edges: list[list[str]], algorithm: str = "auto", seed: int = 0) -> Path:
+        return self.directory / f"{edge_hash(edges)}-{algorithm}-{seed}.npz"
+
+    def get(self, path: Path) -> Positions | None:
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            return {node_id: (float(x), float(y)) for node_id, (x, y) in zip(data["ids"].tolist(), data["xy"].tolist())}
+
+    def put(self, path: Path, positions: Positions) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        ids = list(positions)
+        xy = np.array([positions[node_id] for node_id in ids], dtype=float).reshape(-1, 2)
+        # Written aside and renamed, so a concurrent reader never sees half a file
+        partial = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(partial, "wb") as f:
+            np.savez(f, ids=np.array(ids), xy=xy)
+        os.replace(partial, path)
+
+    def layout(self, edges: list[list[str]], algorithm: str = "auto", seed: int = 0) -> Positions:
+        """The cached layout of this topology, computed and stored on the first call."""
+        path = self.path(edges, algorithm, seed)
+        positions = self.get(path)
+        if positions is None:
+            positions = compute_layout(edges, algorithm, seed)
+            self.put(path, positions)
+        return positions
@@ -1,26 +1,86 @@
-import matplotlib.pyplot as plt
-import networkx as nx
+from typing import TYPE_CHECKING
+
+from tracing import EventType, TraceEvent, TracedSearch, Tracer
 from .step import VisualizationStep
 
+if TYPE_CHECKING:
+    from .layout import LayoutCache
+
 
 class NetworkVisualizer:
-    def __init__(self, edges):
+    def __init__(self, edges, capacity: int = 1 << 16, positions: dict[str, list[float]] | None = None, layout: str = "auto", layout_cache: "LayoutCache | None" = None):
         self.edges = edges
-        self.steps: list[VisualizationStep] = []
+        # Searches record compact events; frames are only rebuilt when played
+        self.tracer = Tracer(capacity=capacity)
+        self.positions = {node_id: tuple(xy) for node_id, xy in positions.items()} if positions is not None else None
+        self.layout_algorithm = layout
+        self.layout_cache = layout_cache
+
+    def layout(self) -> dict[str, tuple[float, float]]:
+        """
+        Node coordinates: the network's native positions when it has them,
+        otherwise a computed layout, loaded from the layout cache when this
+        topology was drawn before. Kept for the visualizer's lifetime.
+        """
+        if self.positions is None:
+            from .layout import LayoutCache
+            cache = self.layout_cache if self.layout_cache is not None else LayoutCache()
+            self.positions = cache.layout(self.edges, self.layout_algorithm)
+        return self.positions
 
-    def add_step(self, step: VisualizationStep):
-        step.visited_nodes = step.visited_nodes.copy()
-        step.path = step.path.copy()
-        self.steps.append(step)
+    @property
+    def steps(self) -> list[VisualizationStep]:
+        return self.build_steps(self.tracer.searches, self.tracer.events())
+
+    @staticmethod
+    def build_steps(searches: dict[int, TracedSearch], events: list[TraceEvent]) -> list[VisualizationStep]:
+        """
+        Replay VISIT/FOUND events into one frame each, rebuilding paths. Steps
+        carry no visited set: play() grows one per search as it goes, since
+        copying it into every step would cost O(V) per step.
+        """
+        steps = []
+        paths: dict[int, dict[str, list[str]]] = {}
+        for event in events:
+            if event.type not in (EventType.VISIT, EventType.FOUND):
+                continue
+            search_paths = paths.setdefault(event.search, {})
+            if event.type == EventType.VISIT:
+                parent_path = search_paths.get(event.peer, [event.peer]) if event.peer is not None else []
+                search_paths[event.node] = parent_path + [event.node]
+            steps.append(VisualizationStep(
+                requester_id=searches[event.search].requester if event.search in searches else None,
+                current_node_id=event.node,
+                path=search_paths.get(event.node, [event.node]),
+                found=event.type == EventType.FOUND,
+                ttl=event.ttl,
+                thread_id=event.thread,
+                search=event.search,
+            ))
+        return steps
+
+    def render(self, output, fps: int = 10, every: int = 1, max_frames: int | None = None, positions: dict[str, tuple[float, float]] | None = None) -> int:
+        """Write the recorded searches to a GIF, MP4 or PNG frames without opening a window; see ReplayRenderer."""
+        from .render import ReplayRenderer
+        renderer = ReplayRenderer(self.edges, positions=positions if positions is not None else self.layout())
+        return renderer.render(self.tracer.searches, self.tracer.events(), output, fps=fps, every=every, max_frames=max_frames)
 
     def play(self, fps: int = 1):
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         G = nx.Graph()
-        G.add_edges_from(self.edges)
-        pos = nx.spring_layout(G)
+        G.add_edges_from(edge[:2] for edge in self.edges)
+        pos = self.layout()
 
-        steps = sorted(self.steps.copy(), key=lambda s: (s.thread_id if s.thread_id is not None else 0, self.steps.index(s)))
+        steps = self.steps
+        order = {id(step): i for i, step in enumerate(steps)}
+        steps = sorted(steps, key=lambda s: (s.thread_id if s.thread_id is not None else 0, order[id(s)]))
 
-        for step in steps:
+        # Nodes of each search's earlier steps, grown one step at a time
+        visited: dict[int | None, set[str]] = {}
+        for i, step in enumerate(steps):
+            visited_nodes = visited.setdefault(step.search, set())
             plt.clf()
             node_colors = []
             for node in G.nodes():
@@ -30,16 +90,17 @@ class NetworkVisualizer:
                     node_colors.append('yellow' if not step.found else 'green')
                 elif node in step.path:
                     node_colors.append('grey')
-                elif node in step.visited_nodes:
+                elif node in visited_nodes:
                     node_colors.append('lightgrey')
                 else:
                     node_colors.append('white')
 
             plt.suptitle(f"Step Visualization, Thread ID: {getattr(step, 'thread_id', 'N/A')}")
-            plt.text(0.5, 0.01, f"Requester: {step.requester_id} | Current Node: {step.current_node_id} | Visited: {step.visited_nodes}", ha='center', va='bottom', transform=plt.gcf().transFigure)
+            plt.text(0.5, 0.01, f"Requester: {step.requester_id} | Current Node: {step.current_node_id} | Visited: {visited_nodes}", ha='center', va='bottom', transform=plt.gcf().transFigure)
             plt.text(0.5, 0.05, f"TTL: {step.ttl} | Found: {step.found} | Path: {step.path}", ha='center', va='bottom', transform=plt.gcf().transFigure)
             nx.draw(G, pos, with_labels=True, node_color=node_colors, edge_color='gray', node_size=500)
-            if self.steps.index(step) == len(self.steps) - 1:
+            visited_nodes.add(step.current_node_id)
+            if i == len(steps) - 1:
                 plt.show()
             else:
                 plt.pause(1 / fps)
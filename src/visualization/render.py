@@ -0,0 +1,239 @@
+"""
+Headless rendering of search replays to PNG frames, GIF or MP4.
+
+The graph is drawn once with the Agg canvas (no window, no pyplot state),
+with every node white. Frames are then drawn on top of the previous one:
+only the nodes whose color changed since the last frame are redrawn, through
+a small overlay collection whose offsets and face colors are swapped in, plus
+the caption. A frame costs time proportional to what changed, not to the
+size of the graph. Node colors follow ``NetworkVisualizer.play``: requester
+light blue, current node yellow (green when it holds the resource), path to
+it grey, visited light grey.
+"""
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+
+from tracing import EventType, TraceEvent, TracedSearch
+
+WHITE = to_rgba("white")
+LIGHTBLUE = to_rgba("lightblue")
+YELLOW = to_rgba("yellow")
+GREEN = to_rgba("green")
+GREY = to_rgba("grey")
+LIGHTGREY = to_rgba("lightgrey")
+
+# Above this many nodes, labels would only be clutter
+LABEL_LIMIT = 100
+
+
+class ReplayRenderer:
+    def __init__(
+        self,
+        edges: list[list[str]],
+        positions: dict[str, tuple[float, float]] | None = None,
+        figsize: tuple[float, float] = (8, 8),
+        dpi: int = 100,
+        node_size: float | None = None,
+        labels: bool | None = None,
+    ):
+        if positions is None:
+            from .layout import compute_layout
+            positions = compute_layout(edges)
+        self.positions = positions
+        self.node_ids = list(positions)
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        n = len(self.node_ids)
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.axes = self.figure.add_axes((0, 0.06, 1, 0.94))
+        self.axes.set_axis_off()
+
+        xy = self.xy = np.array([positions[node_id] for node_id in self.node_ids], dtype=float).reshape(-1, 2)
+        segments = np.array(
+            [(positions[u], positions[v]) for u, v, *_ in edges if u in self.index and v in self.index], dtype=float
+        ).reshape(-1, 2, 2)
+        self.axes.add_collection(LineCollection(segments, colors="gray", linewidths=0.5 if n > LABEL_LIMIT else 1.0, zorder=1))
+        if node_size is None:
+            node_size = max(2.0, min(500.0, 40000.0 / max(n, 1)))
+        linewidth = 0.3 if n > LABEL_LIMIT else 1.0
+        self.axes.scatter(xy[:, 0], xy[:, 1], s=node_size, c=[WHITE], edgecolors="black", linewidths=linewidth, zorder=2)
+        # Redraws changed nodes over the previous frame
+        self.nodes = self.axes.scatter([], [], s=node_size, edgecolors="black", linewidths=linewidth, zorder=2, animated=True)
+        self.axes.autoscale_view()
+        self.axes.margins(0.05)
+
+        if labels is None:
+            labels = n <= LABEL_LIMIT
+        self.labels = [
+            self.axes.text(x, y, node_id, ha="center", va="center", fontsize=8, zorder=3)
+            for node_id, (x, y) in zip(self.node_ids, xy)
+        ] if labels else []
+        self.caption = self.figure.text(0.5, 0.02, "", ha="center", va="bottom", fontsize=9, animated=True)
+
+        self.colors = np.empty((n, 4))
+        self.colors[:] = WHITE
+        # Colors as last drawn on the canvas
+        self.shown = self.colors.copy()
+        # Everything static is drawn exactly once
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.caption_background = self.canvas.copy_from_bbox(self.figure.bbox.frozen().shrunk(1, 0.06))
+
+    @property
+    def size(self) -> tuple[int, int]:
+        width, height = self.canvas.get_width_height()
+        return width, height
+
+    def _reset(self) -> None:
+        self.canvas.restore_region(self.background)
+        self.colors[:] = WHITE
+        self.shown[:] = WHITE
+
+    def _draw(self) -> np.ndarray:
+        changed = np.flatnonzero((self.colors != self.shown).any(axis=1))
+        if changed.size:
+            self.nodes.set_offsets(self.xy[changed])
+            self.nodes.set_facecolors(self.colors[changed])
+            self.axes.draw_artist(self.nodes)
+            for i in changed if self.labels else ():
+                self.axes.draw_artist(self.labels[i])
+            self.shown[changed] = self.colors[changed]
+        self.canvas.restore_region(self.caption_background)
+        self.figure.draw_artist(self.caption)
+        return np.asarray(self.canvas.buffer_rgba())
+
+    def frames(self, searches: dict[int, TracedSearch], events: list[TraceEvent], every: int = 1) -> Iterator[np.ndarray]:
+        """
+        RGBA frames (height x width x 4, reused between frames) for every
+        ``every``-th VISIT/FOUND event and always the last one. Colors are
+        updated for every event, so skipped steps still leave their marks.
+        """
+        if every < 1:
+            raise ValueError(f"every must be at least 1, got {every}")
+        steps = [event for event in events if event.type in (EventType.VISIT, EventType.FOUND)]
+        self._reset()
+        index, colors = self.index, self.colors
+        current_search = None
+        paths: dict[str, list[str]] = {}
+        path_nodes: list[int] = []
+        current = requester_index = None
+        requester = None
+        for k, event in enumerate(steps):
+            if event.search != current_search:
+                current_search = event.search
+                colors[:] = WHITE
+                paths = {}
+                path_nodes = []
+                current = None
+                traced = searches.get(event.search)
+                requester = traced.requester if traced is not None else None
+                requester_index = index.get(requester)
+
+            # Last step's current node and path fall back to "visited"
+            if current is not None:
+                colors[current] = LIGHTGREY
+            for i in path_nodes:
+                colors[i] = LIGHTGREY
+
+            if event.type == EventType.VISIT:
+                parent_path = paths.get(event.peer, [event.peer]) if event.peer is not None else []
+                path = paths[event.node] = parent_path + [event.node]
+            else:
+                path = paths.get(event.node, [event.node])
+            path_nodes = [index[node_id] for node_id in path[:-1] if node_id in index]
+            colors[path_nodes] = GREY
+            current = index.get(event.node)
+            if current is not None:
+                colors[current] = GREEN if event.type == EventType.FOUND else YELLOW
+            if requester_index is not None:
+                colors[requester_index] = LIGHTBLUE
+
+            if k % every == 0 or k == len(steps) - 1:
+                self.caption.set_text(
+                    f"Requester: {requester} | Current Node: {event.node} | TTL: {event.ttl} | "
+                    f"Found: {event.type == EventType.FOUND} | Hops: {len(path) - 1} | Thread ID: {event.thread if event.thread is not None else 'N/A'}"
+                )
+                yield self._draw()
+
+    def render(
+        self,
+        searches: dict[int, TracedSearch],
+        events: list[TraceEvent],
+        output: Path | str,
+        fps: int = 10,
+        every: int = 1,
+        max_frames: int | None = None,
+    ) -> int:
+        """
+        Write the replay and return the number of frames. The format follows
+        ``output``: ``.gif``, ``.mp4`` (needs ffmpeg on PATH) or, for any
+        other path, a directory of numbered PNG frames. ``max_frames`` raises
+        ``every`` as needed to stay under that many frames.
+        """
+        output = Path(output)
+        if max_frames is not None:
+            if max_frames < 2:
+                raise ValueError(f"max_frames must be at least 2 (first and last step), got {max_frames}")
+            steps = sum(1 for event in events if event.type in (EventType.VISIT, EventType.FOUND))
+            # Frames land on multiples of every plus the last step
+            every = max(every, -(-(steps - 1) // (max_frames - 1)))
+        frames = self.frames(searches, events, every)
+        suffix = output.suffix.lower()
+        if suffix == ".gif":
+            return self._write_gif(frames, output, fps)
+        if suffix == ".mp4":
+            return self._write_mp4(frames, output, fps)
+        return self._write_pngs(frames, output)
+
+    @staticmethod
+    def _write_pngs(frames: Iterator[np.ndarray], directory: Path) -> int:
+        from PIL import Image
+        directory.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for written, frame in enumerate(frames, start=1):
+            # Fast compression: frames are large and mostly flat colors
+            Image.fromarray(frame).save(directory / f"frame_{written - 1:05d}.png", compress_level=1)
+        return written
+
+    @staticmethod
+    def _write_gif(frames: Iterator[np.ndarray], path: Path, fps: int) -> int:
+        from PIL import Image
+        # Paletted frames are a quarter of the RGBA size; the GIF encoder keeps them all
+        images = [Image.fromarray(frame).convert("RGB").quantize(colors=64, method=Image.Quantize.FASTOCTREE) for frame in frames]
+        if images:
+            images[0].save(path, save_all=True, append_images=images[1:], duration=max(1, round(1000 / fps)), loop=0)
+        return len(images)
+
+    def _write_mp4(self, frames: Iterator[np.ndarray], path: Path, fps: int) -> int:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("Writing MP4 needs ffmpeg on PATH; write a .gif or PNG frames instead")
+        width, height = self.size
+        process = subprocess.Popen(
+            [
+                ffmpeg, "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                # H.264 in yuv420p needs even dimensions
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", "-vcodec", "libx264", str(path),
+            ],
+            stdin=subprocess.PIPE,
+        )
+        written = 0
+        try:
+            for frame in frames:
+                process.stdin.write(frame.tobytes())
+                written += 1
+        finally:
+            process.stdin.close()
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with status {process.returncode}")
+        return written
@@ -5,8 +5,9 @@ from dataclasses import dataclass
 class VisualizationStep:
     requester_id: str
     current_node_id: str | None
-    visited_nodes: set[str]
     path: list[str]
     found: bool
     ttl: int
     thread_id: int | None = None
+    # Traced search the step belongs to; its earlier steps' nodes are the visited set
+    search: int | None = None
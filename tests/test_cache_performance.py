@@ -173,7 +173,7 @@ class TestSearchWithCache:
         search = NetworkSearch(simple_network, ttl=10, cache=None)
         result = search.bfs("n1", "r1", use_cache=False)
 
-        assert result is not None
+        assert result
         assert result[0] == "n1"
         assert result[-1] == "n3"
 
@@ -0,0 +1,146 @@
+import pytest
+import random
+import statistics
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'validation'))
+
+from cache import Cache
+from churn import ChurnSimulator, SessionModel, summarize
+from loader import NetworkLoader
+from microbench import build_network
+
+
+@pytest.fixture
+def network():
+    # n1 - n2 (r1), n3 (r2); n2 - n3, n4 (r3); n3 - n5 (r4)
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+def rebuilt_index(network) -> dict[str, set[str]]:
+    network._resource_index = None
+    return network.resource_index
+
+
+class TestIncrementalUpdates:
+    def test_leave_drops_links_and_holdings(self, network):
+        network.resource_index
+        resources, former = network.leave("n4")
+        assert resources == {"r3"}
+        assert former == ["n2"]
+        assert network["n4"] is None
+        assert "n4" not in network.neighbors["n2"]
+        assert network.holders("r3") == set()
+        assert network.resource_index == rebuilt_index(network)
+
+    def test_join_links_and_indexes(self, network):
+        network.resource_index
+        network.join("n6", {"r1", "r9"}, ["n4", "n5"])
+        assert network.neighbors["n6"] == ["n4", "n5"]
+        assert "n6" in network.neighbors["n4"] and "n6" in network.neighbors["n5"]
+        assert network.holders("r1") == {"n2", "n6"}
+        assert network.resource_index == rebuilt_index(network)
+        assert network.fetch("n1", "r9", search_method="bfs", ttl=20).path[-1] == "n6"
+
+    def test_rejoin_after_leave(self, network):
+        resources, _ = network.leave("n1")
+        network.join("n1", resources, ["n5"])
+        assert network.fetch("n1", "r4", search_method="bfs", ttl=10).path == ["n1", "n5"]
+        assert {node.id for node in network.graph.nodes} == set(network.neighbors)
+
+    def test_set_resources(self, network):
+        network.resource_index
+        network.set_resources("n2", {"r4"})
+        assert network.holders("r1") == set()
+        assert network.holders("r4") == {"n2", "n5"}
+        assert network.resource_index == rebuilt_index(network)
+
+    def test_link_attributes_follow_the_links(self, network):
+        graph = network.graph
+        graph.add_link("n1", "n5", latency=4.0)
+        assert graph.link_latency("n5", "n1") == 4.0
+        graph.remove_link("n1", "n5")
+        assert graph.link_latency("n1", "n5") == graph.DEFAULT_LATENCY
+        assert "n5" not in graph.neighbors["n1"]
+
+    def test_edge_list_follows_updates(self, network):
+        network.leave("n5")
+        assert sorted(map(sorted, network.edge_list)) == [["n1", "n2"], ["n1", "n3"], ["n2", "n3"], ["n2", "n4"]]
+
+    def test_invalid_updates(self, network):
+        with pytest.raises(ValueError):
+            network.leave("n99")
+        with pytest.raises(ValueError):
+            network.join("n1")
+        with pytest.raises(ValueError):
+            network.set_resources("n99", {"r1"})
+
+    def test_cached_route_over_a_removed_link_is_stale(self, network, tmp_path):
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, deferred_write=True)
+        cache.update("r3", ["n1", "n2", "n4"])
+        assert cache.follow(["n2", "n4"], ["n1"], "r3") == ["n1", "n2", "n4"]
+        network.graph.remove_link("n2", "n4")
+        network.graph.add_link("n3", "n4")
+        assert cache.follow(["n2", "n4"], ["n1"], "r3") is None
+
+
+class TestSessionModel:
+    @pytest.mark.parametrize("distribution, shape", [("exponential", 1.0), ("pareto", 3.0), ("weibull", 0.6)])
+    def test_mean(self, distribution, shape):
+        rng = random.Random(0)
+        model = SessionModel(distribution, mean=50.0, shape=shape)
+        assert statistics.fmean(model.sample(rng) for _ in range(50_000)) == pytest.approx(50.0, rel=0.1)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            SessionModel("lognormal")
+        with pytest.raises(ValueError):
+            SessionModel("pareto", shape=1.0)
+        with pytest.raises(ValueError):
+            SessionModel(mean=0)
+
+
+class TestChurnSimulator:
+    def test_rows_per_interval(self):
+        simulator = ChurnSimulator(build_network(100), ttl=600, query_rate=20, seed=1)
+        rows = simulator.run(60, interval=10)
+        assert [row["time"] for row in rows] == [10, 20, 30, 40, 50, 60]
+        assert sum(row["queries"] for row in rows) > 0
+        assert all(row["joins"] + row["leaves"] for row in rows)
+        summary = summarize(rows)
+        assert 0 < summary["success_rate"] <= 1
+        assert summary["avg_update_us"] > 0
+
+    def test_network_stays_consistent(self):
+        network = build_network(100)
+        simulator = ChurnSimulator(network, ttl=600, query_rate=5, resource_change_rate=5, session=SessionModel(mean=5), downtime=SessionModel(mean=5), seed=2)
+        simulator.run(100, interval=50)
+        online = set(simulator._online)
+        assert set(network.neighbors) == online
+        assert {node.id for node in network.graph.nodes} == online
+        assert all(neighbor in online and node_id in network.neighbors[neighbor] for node_id, linked in network.neighbors.items() for neighbor in linked)
+        assert network.resource_index == rebuilt_index(network)
+
+    def test_without_churn_nothing_goes_stale(self):
+        session = SessionModel(mean=1e9)
+        simulator = ChurnSimulator(build_network(100), ttl=600, query_rate=20, resource_change_rate=0, session=session, seed=3)
+        summary = summarize(simulator.run(50, interval=50))
+        assert summary["success_rate"] == 1.0
+        assert summary["stale_rate"] == 0.0
+        assert summary["updates"] == 0
+
+    def test_churn_makes_cache_entries_stale(self):
+        simulator = ChurnSimulator(build_network(100), ttl=600, query_rate=50, session=SessionModel(mean=10), downtime=SessionModel(mean=10), seed=4)
+        assert summarize(simulator.run(100, interval=100))["stale_rate"] > 0
+
+    def test_reproducible(self):
+        runs = [ChurnSimulator(build_network(100), ttl=600, seed=5).run(30, interval=10) for _ in range(2)]
+        strip = lambda rows: [{k: v for k, v in row.items() if not k.startswith("update_us")} for row in rows]
+        assert strip(runs[0]) == strip(runs[1])
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            ChurnSimulator(build_network(10), search_method="teleport")
+        with pytest.raises(ValueError):
+            ChurnSimulator(build_network(10), query_rate=0)
@@ -0,0 +1,144 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache import Cache
+from coalesce import CoalescingFetcher, merge_paths
+from engine import QueryEngine
+from loader import NetworkLoader
+from metrics import MetricsRegistry
+
+
+@pytest.fixture
+def network():
+    # n1 - n2 (r1), n3 (r2); n2 - n3, n4 (r3); n3 - n5 (r4)
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+class GatedFetcher(CoalescingFetcher):
+    """Leaders block until released, so followers are sure to find them in flight."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.searches = []
+
+    def _search(self, requester_id, resource, search_method):
+        self.searches.append(requester_id)
+        self.started.set()
+        self.release.wait()
+        return super()._search(requester_id, resource, search_method)
+
+
+def run_concurrently(fetcher, leader, followers):
+    """Start the leader's fetch, then the followers' once the leader is searching."""
+    results = {}
+
+    def fetch(query):
+        results[query] = fetcher.fetch(*query)
+
+    threads = [threading.Thread(target=fetch, args=(leader,))]
+    threads[0].start()
+    fetcher.started.wait()
+    for query in followers:
+        threads.append(threading.Thread(target=fetch, args=(query,)))
+        threads[-1].start()
+    # Followers are attached, or leading, once all of them are counted
+    while fetcher.hits + fetcher.merges + fetcher.leaders - 1 < len(followers):
+        threading.Event().wait(0.001)
+    fetcher.release.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestMergePaths:
+    def test_appends_leader_route(self):
+        assert merge_paths(["n5", "n3"], ["n3", "n2", "n4"]) == ["n5", "n3", "n2", "n4"]
+
+    def test_cuts_where_routes_cross(self):
+        assert merge_paths(["n2", "n1"], ["n1", "n2", "n4"]) == ["n2", "n4"]
+
+    def test_prefix_must_reach_path(self):
+        with pytest.raises(ValueError):
+            merge_paths(["n5"], ["n1", "n2"])
+
+
+class TestCoalescingFetcher:
+    def test_same_origin_is_a_hit(self, network):
+        fetcher = GatedFetcher(network, 10, radius=0)
+        results = run_concurrently(fetcher, ("n1", "r3"), [("n1", "r3"), ("n1", "r3")])
+        assert fetcher.searches == ["n1"]
+        assert all(result.path == ["n1", "n2", "n4"] for result in results.values())
+        assert (fetcher.leaders, fetcher.hits, fetcher.merges) == (1, 2, 0)
+
+    def test_neighbor_merges_with_its_own_prefix(self, network):
+        fetcher = GatedFetcher(network, 10, radius=1)
+        results = run_concurrently(fetcher, ("n3", "r3"), [("n5", "r3"), ("n1", "r3")])
+        assert fetcher.searches == ["n3"]
+        assert results[("n5", "r3")].path == ["n5", "n3", "n2", "n4"]
+        assert results[("n1", "r3")].path == ["n1", "n3", "n2", "n4"]
+        assert results[("n5", "r3")].messages == 1
+        assert fetcher.merges == 2
+
+    def test_out_of_radius_leads_its_own_search(self, network):
+        fetcher = GatedFetcher(network, 10, radius=1)
+        results = run_concurrently(fetcher, ("n4", "r4"), [("n1", "r4")])
+        assert sorted(fetcher.searches) == ["n1", "n4"]
+        assert results[("n1", "r4")].path == ["n1", "n3", "n5"]
+        assert fetcher.leaders == 2
+
+    def test_other_resources_do_not_coalesce(self, network):
+        fetcher = GatedFetcher(network, 10)
+        run_concurrently(fetcher, ("n1", "r3"), [("n1", "r4"), ("n1", "r3", "flood")])
+        assert fetcher.leaders == 3
+
+    def test_merge_falls_back_when_leader_finds_nothing(self, network):
+        fetcher = GatedFetcher(network, 2, radius=1)
+        # A flood from n1 with TTL 2 stops one hop short of r4 (at n5); from n3 it does not
+        results = run_concurrently(fetcher, ("n1", "r4", "flood"), [("n3", "r4", "flood"), ("n1", "r4", "flood")])
+        assert results[("n1", "r4", "flood")].path is None
+        assert results[("n3", "r4", "flood")].path == ["n3", "n5"]
+        assert (fetcher.hits, fetcher.merges, fetcher.fallbacks) == (1, 1, 1)
+
+    def test_merged_route_is_cached(self, network, tmp_path):
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, deferred_write=True)
+        fetcher = GatedFetcher(network, 10, cache=cache, radius=1)
+        run_concurrently(fetcher, ("n3", "r3"), [("n5", "r3")])
+        assert cache["n5"]["r3"] == ["n3", "n2", "n4"]
+
+    def test_counters(self, network):
+        metrics = MetricsRegistry()
+        fetcher = GatedFetcher(network, 10, radius=1, metrics=metrics)
+        run_concurrently(fetcher, ("n3", "r3"), [("n3", "r3"), ("n5", "r3")])
+        stats = fetcher.stats()
+        assert (stats["leaders"], stats["hits"], stats["merges"]) == (1, 1, 1)
+        assert stats["coalesced_ratio"] == pytest.approx(2 / 3)
+        assert stats["wait_ms"]["p50"] > 0
+        text = metrics.to_openmetrics()
+        assert 'coalesce_fetches_total{outcome="merge"} 1' in text
+        assert "coalesce_wait_seconds_count 2" in text
+
+    def test_leader_error_reaches_only_the_leader(self, network):
+        fetcher = GatedFetcher(network, 10)
+        fetcher.release.set()
+        with pytest.raises(ValueError):
+            fetcher.fetch("n1", "r3", "teleport")
+        assert fetcher._inflight == {}
+        assert fetcher.fetch("n1", "r3") == ["n1", "n2", "n4"]
+
+    def test_invalid_radius(self, network):
+        with pytest.raises(ValueError):
+            CoalescingFetcher(network, 10, radius=-1)
+
+
+def test_engine_coalesces_when_asked(network):
+    queries = [("n1", "r3"), ("n5", "r4")] * 20
+    with QueryEngine(network, 10, "bfs", workers=4, coalesce_radius=1) as engine:
+        run = engine.run(queries)
+    assert [result.path for result in run.results] == [["n1", "n2", "n4"], ["n5"]] * 20
+    stats = engine.coalescer.stats()
+    assert stats["leaders"] + stats["hits"] + stats["merges"] == len(queries)
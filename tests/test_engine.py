@@ -0,0 +1,98 @@
+import pytest
+import json
+import sys
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'validation'))
+
+from cache import Cache
+from engine import QueryEngine
+from microbench import build_network, sample_queries
+from search import NetworkSearch
+
+
+@pytest.fixture(scope="module")
+def network():
+    return build_network(300)
+
+
+def whole_graph_ttl(network) -> int:
+    # BFS counts every dequeue against the TTL, duplicates included
+    return 6 * len(network.neighbors)
+
+
+@pytest.fixture
+def fast_switching():
+    # Switch threads far more often than the default 5 ms to shake out races
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+class TestQueryEngine:
+    @pytest.mark.parametrize("method", ["bfs", "flood", "dijkstra"])
+    def test_matches_sequential_searches(self, network, method, fast_switching):
+        queries = sample_queries(network, count=60)
+        search = NetworkSearch(network, 50)
+        expected = [getattr(search, method)(node_id, resource).path for node_id, resource in queries]
+        with QueryEngine(network, 50, method, workers=8) as engine:
+            run = engine.run(queries)
+        assert [result.path for result in run.results] == expected
+        assert run.workers == 8
+        assert run.queries_per_second > 0
+
+    def test_per_query_method(self, network):
+        node_id, resource = sample_queries(network, count=1)[0]
+        with QueryEngine(network, 50, "bfs", workers=2) as engine:
+            bfs, flood = engine.run([(node_id, resource), (node_id, resource, "flood")]).results
+            submitted = engine.submit(node_id, resource, "flood").result()
+        assert flood.path == submitted.path == NetworkSearch(network, 50).flood(node_id, resource).path
+        assert bfs.path == NetworkSearch(network, 50).bfs(node_id, resource).path
+
+    def test_shared_cache_fills_up(self, network, tmp_path, fast_switching):
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, deferred_write=True)
+        # A requester holding the resource caches an empty route, which is never a hit
+        queries = [(node_id, resource) for node_id, resource in sample_queries(network, count=40) if not network[node_id].has_resource(resource)]
+        with QueryEngine(network, whole_graph_ttl(network), "bfs", cache=cache, workers=8) as engine:
+            first = engine.run(queries)
+            second = engine.run(queries)
+        assert all(result.found for result in first.results)
+        # Every route found the first time is cached at the requester
+        assert all(result.cache_hits == 1 for result in second.results)
+        assert not (tmp_path / "cache.json").exists()
+
+    def test_invalid_workers(self, network):
+        with pytest.raises(ValueError):
+            QueryEngine(network, 50, workers=0)
+
+
+class TestConcurrentCache:
+    def test_updates_and_flushes_from_many_threads(self, network, tmp_path, fast_switching):
+        # Not deferred: every update rewrites the file while others keep writing
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, stripes=4)
+        search = NetworkSearch(network, whole_graph_ttl(network))
+        paths = [(resource, search.bfs(node_id, resource).path) for node_id, resource in sample_queries(network, count=64)]
+        barrier = threading.Barrier(8)
+
+        def worker(chunk):
+            barrier.wait()
+            for resource, path in chunk:
+                cache.update(resource, path, keep_cheapest=True)
+
+        threads = [threading.Thread(target=worker, args=(paths[i::8],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for resource, path in paths:
+            assert cache[path[0]][resource] is not None
+        cache.flush()
+        with (tmp_path / "cache.json").open() as f:
+            assert json.load(f) == cache.snapshot()
+
+    def test_invalid_stripes(self, network, tmp_path):
+        with pytest.raises(ValueError):
+            Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, stripes=0)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'validation'))
+
+from graph.generators import MODELS, degrees, enforce_degree_bounds, generate, round_robin_resources, write_binary, write_json
+from loader import NetworkLoader
+
+
+def assert_simple(edges):
+    assert (edges[:, 0] != edges[:, 1]).all()
+    pairs = {tuple(sorted(edge)) for edge in edges.tolist()}
+    assert len(pairs) == len(edges)
+
+
+class TestGenerators:
+    @pytest.mark.parametrize("model", MODELS)
+    def test_models_are_simple_graphs(self, model):
+        n, edges = generate(model, 400, degree=4, seed=1)
+        assert_simple(edges)
+        assert edges.max() < n
+
+    @pytest.mark.parametrize("model", ["erdos_renyi", "barabasi_albert", "watts_strogatz"])
+    def test_enforce_degree_bounds(self, model):
+        n, edges = generate(model, 2000, degree=6, seed=2)
+        edges = enforce_degree_bounds(n, edges, 2, 8, seed=2)
+        assert_simple(edges)
+        degree = degrees(n, edges)
+        assert degree.min() >= 2
+        assert degree.max() <= 8
+
+    @pytest.mark.parametrize("n, edges, min_degree, max_degree", [
+        (3, [], 1, 0),
+        (2, [[0, 1]], 2, None),
+    ])
+    def test_infeasible_degree_bounds(self, n, edges, min_degree, max_degree):
+        edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        with pytest.raises(ValueError, match=f"min_neighbors={min_degree} with max_neighbors={max_degree}"):
+            enforce_degree_bounds(n, edges, min_degree, max_degree, seed=1)
+
+    def test_same_seed_same_graph(self):
+        _, first = generate("barabasi_albert", 500, degree=4, seed=7)
+        _, second = generate("barabasi_albert", 500, degree=4, seed=7)
+        assert (first == second).all()
+
+    def test_hexagonal_matches_validation_generator(self):
+        from generate_hexagonal_network import generate_hexagonal_network
+
+        legacy = generate_hexagonal_network(num_nodes=100, num_resources=0)
+        n, edges = generate("hexagonal", 100)
+        expected = {frozenset(edge) for edge in legacy["edges"]}
+        assert {frozenset((f"n{u + 1}", f"n{v + 1}")) for u, v in edges.tolist()} == expected
+
+
+class TestWriters:
+    @pytest.mark.parametrize("suffix", [".json", ".snapshot"])
+    def test_written_network_loads(self, tmp_path, suffix):
+        n, edges = generate("random_regular", 300, degree=4, seed=3)
+        path = tmp_path / f"network{suffix}"
+        write = write_binary if suffix == ".snapshot" else write_json
+        write(path, n, edges, round_robin_resources(n, 50), min_neighbors=1, max_neighbors=4)
+
+        network = NetworkLoader().load(str(path))
+        assert len(network.neighbors) == n
+        assert sum(len(neighbors) for neighbors in network.neighbors.values()) == 2 * len(edges)
+        assert set(network["n1"].resources) == {"r1"}
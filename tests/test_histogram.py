@@ -0,0 +1,80 @@
+import pytest
+import random
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from histogram import Histogram, HistogramRecorder
+
+
+@pytest.fixture
+def samples():
+    rng = random.Random(1)
+    return [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+
+
+class TestHistogram:
+    @pytest.mark.parametrize("q", [0.5, 0.9, 0.99, 0.999])
+    def test_quantiles_within_relative_error(self, samples, q):
+        histogram = Histogram(relative_error=0.01)
+        for value in samples:
+            histogram.record(value)
+        exact = sorted(samples)[int(q * (len(samples) - 1))]
+        assert histogram.quantile(q) == pytest.approx(exact, rel=0.02)
+
+    def test_integers_are_exact(self):
+        histogram = Histogram()
+        for steps in [0, 1, 1, 2, 3, 3, 3, 10]:
+            histogram.record(steps)
+        assert histogram.quantile(0.0) == 0
+        assert histogram.quantile(0.5) == 2
+        assert histogram.quantile(0.75) == 3
+        assert histogram.quantile(1.0) == 10
+        assert histogram.mean == pytest.approx(23 / 8)
+
+    def test_merge_equals_single_recording(self, samples):
+        whole = Histogram()
+        left, right = Histogram(), Histogram()
+        for i, value in enumerate(samples):
+            whole.record(value)
+            (left if i % 2 else right).record(value)
+        left.merge(right)
+        assert left.buckets == whole.buckets
+        assert left.count == whole.count
+        assert left.quantile(0.99) == whole.quantile(0.99)
+
+    def test_merge_rejects_different_error(self):
+        with pytest.raises(ValueError):
+            Histogram(0.01).merge(Histogram(0.05))
+
+    def test_empty_and_negative(self):
+        histogram = Histogram()
+        assert histogram.quantile(0.5) is None
+        with pytest.raises(ValueError):
+            histogram.record(-1)
+
+
+class TestRecorder:
+    def test_groups_by_method_and_cache_mode(self):
+        recorder = HistogramRecorder()
+        recorder.record("bfs", False, time_ms=1.0, steps=3)
+        recorder.record("bfs", True, time_ms=0.1, steps=1, messages=None)
+        rows = recorder.percentile_table()
+
+        assert {(row["metric"], row["search_method"], row["use_cache"]) for row in rows} == {
+            ("steps", "bfs", False), ("steps", "bfs", True), ("time_ms", "bfs", False), ("time_ms", "bfs", True),
+        }
+        assert all("p99.9" in row for row in rows)
+
+    def test_round_trip_and_merge(self):
+        first, second = HistogramRecorder(), HistogramRecorder()
+        for i in range(100):
+            first.record("dfs", False, steps=i)
+            second.record("dfs", False, steps=i + 100)
+
+        restored = HistogramRecorder.from_dict(first.to_dict())
+        restored.merge(second)
+        histogram = restored.histogram("steps", "dfs", False)
+        assert histogram.count == 200
+        assert histogram.max == 199
+        assert histogram.quantile(0.5) == pytest.approx(100, abs=2)
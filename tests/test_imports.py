@@ -0,0 +1,44 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).parent.parent / 'src'
+
+# Only loaded on demand: visualization, the parallel search, the metrics server
+HEAVY = ("matplotlib", "networkx", "numpy", "concurrent.futures", "http.server")
+# Cumulative import time of the CLI entry points; they took ~800 ms with the
+# visualizer imported eagerly, ~100 ms without
+BUDGET_US = 400_000
+
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=SRC, capture_output=True, text=True, check=True,
+    )
+
+
+@pytest.mark.parametrize("module", ["main", "scripts.run", "loader"])
+def test_no_heavy_imports(module):
+    loaded = run_python(f"import sys, {module}; print(' '.join(sys.modules))").stdout.split()
+    assert [name for name in HEAVY if name in loaded] == []
+
+
+def test_visualizer_still_loads_on_demand():
+    code = (
+        "import sys; from loader import NetworkLoader; "
+        "network = NetworkLoader().load('graph/examples/ex1.json'); "
+        "print(type(network.create_visualizer()).__name__)"
+    )
+    assert run_python(code).stdout.strip() == "NetworkVisualizer"
+
+
+def test_import_time_budget():
+    stderr = run_python("import scripts.run", "-X", "importtime").stderr
+    # Lines read "import time: self | cumulative | name"; the top-level module is last
+    cumulative = {
+        line.split("|")[2].strip(): int(line.split("|")[1])
+        for line in stderr.splitlines() if line.startswith("import time:") and line.split("|")[1].strip().isdigit()
+    }
+    assert cumulative["scripts.run"] < BUDGET_US
@@ -0,0 +1,89 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import numpy as np
+
+from graph import GraphSchema
+from graph.generators import hex_positions, hexagonal, to_schema
+from loader import NetworkLoader
+from network import Network
+from visualization.layout import LayoutCache, compute_layout, edge_hash
+from visualization.network import NetworkVisualizer
+
+
+@pytest.fixture
+def network():
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+class TestEdgeHash:
+    def test_ignores_order_and_attributes(self):
+        edges = [["n1", "n2"], ["n2", "n3"]]
+        assert edge_hash(edges) == edge_hash([["n3", "n2"], ["n2", "n1", {"latency": 5.0}]])
+
+    def test_differs_by_topology(self):
+        assert edge_hash([["n1", "n2"], ["n2", "n3"]]) != edge_hash([["n1", "n2"], ["n1", "n3"]])
+
+
+class TestComputeLayout:
+    @pytest.mark.parametrize("algorithm", ["auto", "spring", "pivot_mds"])
+    def test_every_node_placed(self, network, algorithm):
+        positions = compute_layout(network.edge_list, algorithm)
+        assert set(positions) == set(network.neighbors)
+        assert np.abs(np.array(list(positions.values()))).max() <= 1.0 + 1e-9
+
+    def test_pivot_mds_keeps_neighbors_close(self):
+        n = 400
+        edges = to_schema(n, hexagonal(n)).edges
+        positions = compute_layout(edges, "pivot_mds")
+        xy = {node_id: np.array(p) for node_id, p in positions.items()}
+        linked = np.mean([np.linalg.norm(xy[u] - xy[v]) for u, v in edges])
+        spread = np.mean([np.linalg.norm(p) for p in xy.values()])
+        assert linked < spread / 5
+
+    def test_unknown_algorithm(self, network):
+        with pytest.raises(ValueError):
+            compute_layout(network.edge_list, "circular")
+
+
+class TestLayoutCache:
+    def test_second_call_loads_from_disk(self, network, tmp_path, monkeypatch):
+        cache = LayoutCache(tmp_path)
+        first = cache.layout(network.edge_list)
+        assert len(list(tmp_path.glob("*.npz"))) == 1
+
+        import visualization.layout as layout
+        monkeypatch.setattr(layout, "compute_layout", lambda *args: pytest.fail("layout recomputed"))
+        assert cache.layout(list(reversed(network.edge_list))) == pytest.approx(first)
+
+    def test_algorithms_cached_apart(self, network, tmp_path):
+        cache = LayoutCache(tmp_path)
+        cache.layout(network.edge_list, "spring")
+        cache.layout(network.edge_list, "pivot_mds")
+        assert len(list(tmp_path.glob("*.npz"))) == 2
+
+
+class TestNativePositions:
+    def test_schema_round_trip(self):
+        schema = to_schema(7, hexagonal(7), positions=hex_positions(7))
+        assert GraphSchema.from_dict(schema.to_dict()).positions == schema.positions
+        assert "positions" not in to_schema(7, hexagonal(7)).to_dict()
+
+    def test_hex_neighbors_are_unit_apart(self):
+        n = 19
+        positions = hex_positions(n)
+        for u, v in to_schema(n, hexagonal(n)).edges:
+            assert np.linalg.norm(np.subtract(positions[u], positions[v])) == pytest.approx(np.sqrt(3))
+
+    def test_visualizer_uses_native_positions(self, tmp_path):
+        network = Network.from_schema(to_schema(7, hexagonal(7), positions=hex_positions(7)))
+        visualizer = network.create_visualizer()
+        visualizer.layout_cache = LayoutCache(tmp_path)
+        assert visualizer.layout() == {node_id: tuple(xy) for node_id, xy in hex_positions(7).items()}
+        assert not list(tmp_path.iterdir())
+
+    def test_visualizer_computes_once(self, network, tmp_path):
+        visualizer = NetworkVisualizer(network.edge_list, layout_cache=LayoutCache(tmp_path))
+        assert visualizer.layout() is visualizer.layout()
@@ -0,0 +1,78 @@
+import pytest
+import json
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from loader import NetworkLoader, StreamingNetworkLoader
+
+
+NETWORK_JSON = Path(__file__).parent / "test_network.json"
+
+
+def write_network(path, data, raw=None):
+    with open(path, "w") as f:
+        f.write(raw if raw is not None else json.dumps(data))
+    return str(path)
+
+
+class TestStreamingNetworkLoader:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+    def test_matches_network_loader(self, chunk_size):
+        expected = NetworkLoader().load(str(NETWORK_JSON))
+        network = StreamingNetworkLoader(chunk_size=chunk_size).load(str(NETWORK_JSON))
+
+        assert dict(network.neighbors) == dict(expected.neighbors)
+        for node_id in expected.neighbors:
+            assert set(network[node_id].resources) == set(expected[node_id].resources)
+        assert network.graph.edge_list is None
+        assert sorted(map(sorted, network.edge_list)) == sorted(map(sorted, expected.edge_list))
+
+    def test_link_attributes(self, tmp_path):
+        path = write_network(tmp_path / "net.json", {
+            "num_nodes": 2,
+            "min_neighbors": 0,
+            "max_neighbors": 1,
+            "resources": {"n1": [], "n2": ["r1"]},
+            "edges": [["n1", "n2", {"latency": 2.5}]],
+        })
+        network = StreamingNetworkLoader(chunk_size=3).load(path)
+        assert network.graph.link_latency("n2", "n1") == 2.5
+
+    @pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+    def test_positions_kept_and_unknown_keys_skipped(self, tmp_path, chunk_size):
+        data = {
+            "num_nodes": 2,
+            "min_neighbors": 0,
+            "max_neighbors": 1,
+            "notes": {"tags": ["a]", {"b": "\\\"}"}]},
+            "resources": {"n1": [], "n2": ["r1"]},
+            "positions": {"n1": [0.0, 1.0], "n2": [2.5, 1.0]},
+            "edges": [["n1", "n2"]],
+        }
+        path = write_network(tmp_path / "net.json", data)
+        network = StreamingNetworkLoader(chunk_size=chunk_size).load(path)
+        assert network.graph.positions == NetworkLoader().load(path).graph.positions == data["positions"]
+        assert network.neighbors["n1"] == ["n2"]
+
+    def test_max_neighbors_checked_while_streaming(self, tmp_path):
+        path = write_network(tmp_path / "net.json", {
+            "num_nodes": 3,
+            "min_neighbors": 0,
+            "max_neighbors": 1,
+            "resources": {},
+            "edges": [["n1", "n2"], ["n1", "n3"]],
+        })
+        with pytest.raises(ValueError, match="more than max_neighbors"):
+            StreamingNetworkLoader().load(path)
+
+    def test_bounds_after_edges(self, tmp_path):
+        raw = '{"edges": [["n1", "n2"], ["n2", "n3"]], "resources": {}, "num_nodes": 3, "min_neighbors": 2, "max_neighbors": 2}'
+        path = write_network(tmp_path / "net.json", None, raw=raw)
+        with pytest.raises(ValueError, match="less than min_neighbors"):
+            StreamingNetworkLoader(chunk_size=4).load(path)
+
+    def test_malformed(self, tmp_path):
+        path = write_network(tmp_path / "net.json", None, raw='{"edges": [["n1", "n2"] ["n2", "n3"]]}')
+        with pytest.raises(ValueError):
+            StreamingNetworkLoader().load(path)
@@ -0,0 +1,119 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'validation'))
+
+from cache import Cache
+from loader import NetworkLoader
+from memory import cache_footprint, deep_sizeof, network_footprint, node_layout_savings, peak_memory
+from microbench import compare
+from network.network_node import BITSET_LIMIT, NetworkNode, resource_id
+from search import NetworkSearch
+
+
+@pytest.fixture
+def network():
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+class TestDeepSizeof:
+    def test_counts_nested_containers(self):
+        inner = [1, 2, 3]
+        assert deep_sizeof({"a": inner}) > sys.getsizeof({"a": inner}) + sys.getsizeof(inner)
+
+    def test_shared_objects_counted_once(self):
+        shared = list(range(1000))
+        seen = set()
+        first = deep_sizeof([shared], seen)
+        second = deep_sizeof([shared], seen)
+        assert second == sys.getsizeof([shared])
+        assert deep_sizeof([shared, shared]) < 2 * first
+
+    def test_follows_slots_and_attributes(self):
+        class Slotted:
+            __slots__ = ("payload",)
+
+            def __init__(self):
+                self.payload = "x" * 10000
+
+        assert deep_sizeof(Slotted()) > 10000
+
+
+class TestPeakMemory:
+    def test_peak_includes_freed_temporaries(self):
+        def run():
+            data = bytearray(1 << 20)
+            return len(data)
+
+        result, peak = peak_memory(run)
+        assert result == 1 << 20
+        assert peak >= 1 << 20
+
+
+class TestFootprints:
+    def test_network_parts_add_up(self, network):
+        footprint = network_footprint(network)
+        assert footprint["nodes"] == 5
+        assert footprint["bytes"] == sum(footprint["parts"].values())
+        assert footprint["per_node_bytes"] == pytest.approx(footprint["bytes"] / 5)
+
+    def test_floods_leave_no_state_on_nodes(self, network):
+        # Duplicate suppression is per search, so repeated floods do not grow the nodes
+        search = NetworkSearch(network, ttl=10)
+        before = network_footprint(network)["parts"]["nodes"]
+        search.flood("n1", "r3")
+        search.flood("n1", "r3")
+        assert network_footprint(network)["parts"]["nodes"] == before
+        assert not any(hasattr(node, "seen_messages") for node in network.graph.nodes)
+
+    def test_cache_per_entry(self, network, tmp_path):
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, deferred_write=True)
+        cache.update("r3", ["n1", "n2", "n4"])
+        footprint = cache_footprint(cache)
+        assert footprint["entries"] == 3
+        assert footprint["per_entry_bytes"] == pytest.approx(footprint["bytes"] / 3)
+
+
+class TestMemoryRegression:
+    def test_compare_flags_memory_growth(self):
+        baseline = {"results": {"a[n=1]": {"median": 1.0, "peak_bytes": 100}, "b[n=1]": {"median": 1.0}}}
+        current = {"results": {"a[n=1]": {"median": 1.0, "peak_bytes": 150}, "b[n=1]": {"median": 1.0, "peak_bytes": 150}}}
+        rows = {row["benchmark"]: row for row in compare(baseline, current, threshold=0.1)}
+        assert not rows["a[n=1]"]["regression"]
+        assert rows["a[n=1]"]["memory_regression"]
+        assert rows["a[n=1]"]["memory_ratio"] == pytest.approx(1.5)
+        assert "memory_ratio" not in rows["b[n=1]"]
+
+
+class TestCompactNodes:
+    def test_no_instance_dict(self, network):
+        node = network["n1"]
+        assert not hasattr(node, "__dict__")
+        assert not hasattr(node, "seen_packets")
+
+    def test_has_resource_bitset(self):
+        node = NetworkNode("x", ["r1", "r3"])
+        assert isinstance(node._resources, int)
+        assert node.has_resource("r1") and node.has_resource("r3")
+        assert not node.has_resource("r2") and not node.has_resource("never-seen")
+        assert node.resources == {"r1", "r3"}
+        assert not NetworkNode("y", []).has_resource("r1")
+
+    def test_far_apart_ids_fall_back_to_names(self):
+        names = [f"spread{i}" for i in range(BITSET_LIMIT + 1)]
+        for name in names:
+            resource_id(name)
+        node = NetworkNode("x", [names[0], names[-1]])
+        assert isinstance(node._resources, frozenset)
+        assert node.has_resource(names[-1]) and not node.has_resource(names[1])
+
+    def test_adjacency_shares_interned_ids(self, network):
+        node_ids = {id(node.id) for node in network.graph.nodes}
+        assert all(id(neighbor) in node_ids for neighbors in network.neighbors.values() for neighbor in neighbors)
+
+    def test_layout_savings(self, network):
+        savings = node_layout_savings(network)
+        assert savings["sampled_nodes"] == 5
+        assert savings["saved_per_node_bytes"] > 0
+        assert savings["legacy_per_node_bytes"] == pytest.approx(savings["per_node_bytes"] + savings["saved_per_node_bytes"])
@@ -0,0 +1,137 @@
+import pytest
+import json
+import urllib.request
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache import Cache
+from loader import NetworkLoader
+from metrics import CONTENT_TYPE, MetricsRegistry
+from search import NetworkSearch
+
+
+@pytest.fixture
+def network():
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+def samples(text: str) -> dict[str, float]:
+    """Sample lines of an OpenMetrics exposition as {"name{labels}": value}."""
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            values[name] = float(value)
+    return values
+
+
+class TestRegistry:
+    def test_counter_and_gauge_exposition(self):
+        registry = MetricsRegistry()
+        registry.counter("requests", "Requests served.", ("method",)).labels("bfs").inc(3)
+        registry.gauge("entries", "Entries.").labels().set(7)
+        text = registry.to_openmetrics()
+        assert "# TYPE requests counter" in text
+        assert text.endswith("# EOF\n")
+        assert samples(text) == {'requests_total{method="bfs"}': 3, "entries": 7}
+
+    def test_histogram_exported_as_summary(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", unit="seconds").labels()
+        for value in [0.001, 0.002, 0.003, 0.004]:
+            histogram.record(value)
+        text = registry.to_openmetrics()
+        assert "# TYPE latency_seconds summary" in text
+        assert "# UNIT latency_seconds seconds" in text
+        values = samples(text)
+        assert values["latency_seconds_count"] == 4
+        assert values["latency_seconds_sum"] == pytest.approx(0.01)
+        assert values['latency_seconds{quantile="0.5"}'] == pytest.approx(0.002, rel=0.02)
+
+    def test_same_name_returns_same_family(self):
+        registry = MetricsRegistry()
+        assert registry.counter("hits", "Hits.") is registry.counter("hits", "Hits.")
+        with pytest.raises(ValueError):
+            registry.gauge("hits", "Hits.")
+
+    def test_label_count_checked(self):
+        family = MetricsRegistry().counter("hits", "Hits.", ("method",))
+        with pytest.raises(ValueError):
+            family.labels("bfs", "extra")
+
+    def test_non_str_label_values_share_a_child(self):
+        family = MetricsRegistry().counter("hits", "Hits.", ("found",))
+        assert family.labels(True) is family.labels(True) is family.labels("True")
+        assert len(family.children) == 1
+
+    def test_counter_rejects_decrease(self):
+        with pytest.raises(ValueError):
+            MetricsRegistry().counter("hits", "Hits.").labels().inc(-1)
+
+    def test_serve_on_localhost(self):
+        registry = MetricsRegistry()
+        registry.counter("hits", "Hits.").labels().inc()
+        server = registry.serve(port=0)
+        try:
+            host, port = server.server_address[:2]
+            assert host == "127.0.0.1"
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+                assert response.headers["Content-Type"] == CONTENT_TYPE
+                assert samples(response.read().decode()) == {"hits_total": 1}
+        finally:
+            server.shutdown()
+
+
+class TestInstrumentation:
+    def test_search_metrics(self, network):
+        registry = MetricsRegistry()
+        search = NetworkSearch(network, ttl=10, metrics=registry)
+        found = search.bfs("n1", "r3")
+        missing = search.bfs("n1", "missing")
+        values = samples(registry.to_openmetrics())
+        assert values['search_queries_total{method="bfs",found="true"}'] == 1
+        assert values['search_queries_total{method="bfs",found="false"}'] == 1
+        assert values['search_messages_sum{method="bfs"}'] == found.messages + missing.messages
+        assert values['search_hops_count{method="bfs"}'] == 1
+        assert values['search_hops{method="bfs",quantile="0.5"}'] == found.hops
+
+    def test_flood_many_is_one_search(self, network):
+        registry = MetricsRegistry()
+        search = NetworkSearch(network, ttl=10, metrics=registry)
+        search.flood_many("n1", {"r1", "r4"})
+        search.flood_many("n1", {"r1", "missing"})
+        values = samples(registry.to_openmetrics())
+        assert values['search_queries_total{method="flood_many",found="true"}'] == 1
+        assert values['search_queries_total{method="flood_many",found="false"}'] == 1
+        assert values['search_hops_sum{method="flood_many"}'] == 2
+        assert values['search_messages_count{method="flood_many"}'] == 2
+
+    def test_search_without_registry_records_nothing(self, network):
+        search = NetworkSearch(network, ttl=10)
+        assert search.metrics is None
+        assert search.bfs("n1", "r3")
+
+    def test_cache_metrics(self, network, tmp_path):
+        registry = MetricsRegistry()
+        cache_path = tmp_path / "cache.json"
+        cache = Cache(nodes={}, file_path=cache_path, network=network, deferred_write=True, metrics=registry)
+        search = NetworkSearch(network, ttl=10, cache=cache, metrics=registry)
+        path = search.bfs("n1", "r3", use_cache=True)
+        assert search.bfs("n1", "r3", use_cache=True).path == path.path
+        cache.flush()
+
+        values = samples(registry.to_openmetrics())
+        assert values['search_cache_hits_total{method="bfs"}'] == 1
+        assert values['cache_follows_total{valid="true"}'] == 1
+        assert values['cache_operation_seconds_count{operation="update"}'] == 1
+        assert values['cache_operation_seconds_count{operation="flush"}'] == 1
+        assert values["cache_written_bytes_total"] == cache_path.stat().st_size
+        assert values["cache_entries"] == sum(len(routes) for routes in json.loads(cache_path.read_text()).values())
+
+    def test_fetch_duration(self, network):
+        registry = MetricsRegistry()
+        network.fetch("n1", "r3", search_method="flood", ttl=10, metrics=registry)
+        values = samples(registry.to_openmetrics())
+        assert values['fetch_duration_seconds_count{method="flood"}'] == 1
+        assert values['search_queries_total{method="flood",found="true"}'] == 1
@@ -0,0 +1,32 @@
+import pytest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'validation'))
+
+from microbench import BENCHMARKS, compare, measure, run_suite
+
+
+class TestMicrobench:
+    def test_every_benchmark_runs(self):
+        report = run_suite([50], warmup=0, repeat=2, verbose=False)
+        assert set(report["results"]) == {f"{name}[n=50]" for name in BENCHMARKS}
+        for result in report["results"].values():
+            assert result["min"] <= result["median"]
+            assert result["operations"] > 0
+
+    def test_measure_is_per_operation(self):
+        calls = []
+        result = measure(lambda: calls.append(1), operations=10, warmup=3, repeat=5)
+        assert len(calls) == 8
+        assert result["repeat"] == 5
+
+    def test_compare_flags_slowdowns(self):
+        baseline = {"results": {"a[n=1]": {"median": 1.0}, "b[n=1]": {"median": 1.0}, "old[n=1]": {"median": 1.0}}}
+        current = {"results": {"a[n=1]": {"median": 1.05}, "b[n=1]": {"median": 1.5}, "new[n=1]": {"median": 1.0}}}
+        rows = {row["benchmark"]: row for row in compare(baseline, current, threshold=0.1)}
+
+        assert set(rows) == {"a[n=1]", "b[n=1]"}
+        assert not rows["a[n=1]"]["regression"]
+        assert rows["b[n=1]"]["regression"]
+        assert rows["b[n=1]"]["ratio"] == pytest.approx(1.5)
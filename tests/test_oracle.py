@@ -0,0 +1,57 @@
+import pytest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import numpy as np
+
+from loader import NetworkLoader
+from search import NetworkSearch
+from oracle import HopOracle
+
+
+@pytest.fixture
+def network():
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+@pytest.fixture
+def hex_network():
+    return NetworkLoader().load(str(Path(__file__).parent.parent / "validation" / "hexagonal_network.json"))
+
+
+class TestHopOracle:
+    def test_distances(self, network):
+        oracle = HopOracle.build(network)
+        assert oracle.distance("n1", "r1") == 1
+        assert oracle.distance("n1", "r3") == 2
+        assert oracle.distance("n4", "r3") == 0
+        assert oracle.distance("n1", "r999") is None
+
+    def test_path_follows_next_hops(self, network):
+        oracle = HopOracle.build(network)
+        assert oracle.next_hop("n1", "r4") == "n3"
+        assert oracle.path("n1", "r4") == ["n1", "n3", "n5"]
+        assert oracle.path("n5", "r4") == ["n5"]
+
+    def test_compact_tables(self, network):
+        oracle = HopOracle.build(network)
+        assert oracle.distance_table.dtype == np.uint8
+        assert oracle.next_hop_table.dtype == np.uint16
+
+    def test_matches_bfs(self, hex_network):
+        oracle = HopOracle.build(hex_network)
+        search = NetworkSearch(hex_network, ttl=10_000)
+        for node_id in ["n1", "n37", "n100"]:
+            for resource in ["r1", "r77", "r200"]:
+                path = search.iter_bfs(node_id, resource, limit=1)
+                _, bfs_path = next(path)
+                assert oracle.distance(node_id, resource) == len(bfs_path) - 1
+                assert len(oracle.path(node_id, resource)) == len(bfs_path)
+
+    def test_save_and_load(self, network, tmp_path):
+        oracle = HopOracle.build(network)
+        oracle.save(tmp_path / "oracle.npz")
+        loaded = HopOracle.load(tmp_path / "oracle.npz")
+        assert loaded.distance("n1", "r3") == 2
+        assert loaded.path("n1", "r4") == ["n1", "n3", "n5"]
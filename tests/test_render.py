@@ -0,0 +1,74 @@
+import pytest
+import shutil
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import numpy as np
+from PIL import Image
+
+from loader import NetworkLoader
+from search import NetworkSearch
+from tracing import Tracer
+from visualization.render import GREEN, LIGHTBLUE, ReplayRenderer
+
+
+@pytest.fixture
+def network():
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+@pytest.fixture
+def traced(network):
+    tracer = Tracer()
+    NetworkSearch(network, ttl=10, tracer=tracer).bfs("n1", "r3")
+    return tracer.searches, tracer.events()
+
+
+def pixel(renderer: ReplayRenderer, frame: np.ndarray, node_id: str) -> tuple[float, ...]:
+    x, y = renderer.axes.transData.transform(renderer.positions[node_id])
+    # A little below the center, clear of the label
+    return tuple(frame[frame.shape[0] - int(round(y)) + 9, int(round(x))] / 255)
+
+
+class TestReplayRenderer:
+    def test_final_frame_colors(self, network, traced):
+        renderer = ReplayRenderer(network.edge_list)
+        frames = [frame.copy() for frame in renderer.frames(*traced)]
+        assert len(frames) == 6
+        assert pixel(renderer, frames[-1], "n4") == pytest.approx(GREEN, abs=0.02)
+        assert pixel(renderer, frames[-1], "n1") == pytest.approx(LIGHTBLUE, abs=0.02)
+
+    def test_decimation_keeps_last_step(self, network, traced):
+        renderer = ReplayRenderer(network.edge_list)
+        frames = [frame.copy() for frame in renderer.frames(*traced, every=4)]
+        assert len(frames) == 3
+        assert pixel(renderer, frames[-1], "n4") == pytest.approx(GREEN, abs=0.02)
+
+    @pytest.mark.parametrize("max_frames", [2, 3, 5])
+    def test_max_frames(self, network, traced, tmp_path, max_frames):
+        written = ReplayRenderer(network.edge_list).render(*traced, tmp_path / "frames", max_frames=max_frames)
+        assert written <= max_frames
+        assert len(list((tmp_path / "frames").glob("*.png"))) == written
+
+    def test_gif(self, network, traced, tmp_path):
+        output = tmp_path / "replay.gif"
+        assert ReplayRenderer(network.edge_list).render(*traced, output) == 6
+        with Image.open(output) as gif:
+            assert gif.n_frames == 6
+
+    def test_rendering_twice_starts_clean(self, network, traced):
+        renderer = ReplayRenderer(network.edge_list)
+        first = [frame.copy() for frame in renderer.frames(*traced)]
+        second = [frame.copy() for frame in renderer.frames(*traced)]
+        assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+    @pytest.mark.skipif(shutil.which("ffmpeg") is not None, reason="ffmpeg is installed")
+    def test_mp4_without_ffmpeg(self, network, traced, tmp_path):
+        with pytest.raises(RuntimeError):
+            ReplayRenderer(network.edge_list).render(*traced, tmp_path / "replay.mp4")
+
+    def test_visualizer_render(self, network, tmp_path):
+        visualizer = network.create_visualizer()
+        network.fetch("n1", "r3", search_method="bfs", ttl=10)
+        assert visualizer.render(tmp_path / "replay.gif") == 6
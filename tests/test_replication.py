@@ -0,0 +1,72 @@
+import pytest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from loader import NetworkLoader
+from network.replication import (
+    zipf_popularity,
+    allocate_replicas,
+    place_replicas,
+    replicate,
+    expected_search_size,
+    count_replicas,
+)
+
+
+@pytest.fixture
+def popularity():
+    return zipf_popularity([f"r{i}" for i in range(1, 11)], alpha=1.0)
+
+
+class TestAllocation:
+    @pytest.mark.parametrize("strategy", ["uniform", "proportional", "square_root"])
+    def test_uses_whole_budget_within_bounds(self, popularity, strategy):
+        replicas = allocate_replicas(popularity, 40, strategy=strategy, max_replicas=8)
+        assert sum(replicas.values()) == 40
+        assert all(1 <= r <= 8 for r in replicas.values())
+
+    def test_uniform_is_flat(self, popularity):
+        replicas = allocate_replicas(popularity, 40, strategy="uniform")
+        assert set(replicas.values()) == {4}
+
+    def test_popular_resources_get_more_replicas(self, popularity):
+        replicas = allocate_replicas(popularity, 40, strategy="proportional")
+        assert replicas["r1"] > replicas["r10"]
+
+    def test_square_root_minimizes_search_size(self, popularity):
+        sizes = {
+            strategy: expected_search_size(popularity, allocate_replicas(popularity, 40, strategy=strategy), 20)
+            for strategy in ["uniform", "proportional", "square_root"]
+        }
+        assert sizes["square_root"] <= sizes["uniform"]
+        assert sizes["square_root"] <= sizes["proportional"]
+
+    def test_unknown_strategy(self, popularity):
+        with pytest.raises(ValueError):
+            allocate_replicas(popularity, 40, strategy="bogus")
+
+
+class TestPlacement:
+    def test_respects_capacity_and_distinct_holders(self, popularity):
+        node_ids = [f"n{i}" for i in range(1, 11)]
+        replicas = allocate_replicas(popularity, 30, strategy="square_root", max_replicas=10)
+        placement = place_replicas(node_ids, replicas, capacity=3, seed=1)
+
+        assert all(len(resources) <= 3 for resources in placement.values())
+        assert all(len(set(resources)) == len(resources) for resources in placement.values())
+        assert count_replicas(placement) == replicas
+
+    def test_over_budget_raises(self):
+        with pytest.raises(ValueError):
+            place_replicas(["n1", "n2"], {"r1": 2, "r2": 2}, capacity=1)
+
+    def test_feeds_network(self):
+        network = NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+        popularity = zipf_popularity(["r1", "r2", "r3", "r4"])
+        placement = replicate(list(network.neighbors), popularity, capacity=2, seed=7)
+        network.place_resources(placement)
+
+        for resource, count in count_replicas(placement).items():
+            assert len(network.holders(resource)) == count
+        assert all(network[h].has_resource("r1") for h in network.holders("r1"))
@@ -74,7 +74,7 @@ class TestBFSWithoutCache:
 
     def test_resource_not_found(self, search_without_cache):
         result = search_without_cache.bfs("n1", "r999", use_cache=False)
-        assert result is None
+        assert not result
 
 
 class TestBFSWithCache:
@@ -119,7 +119,7 @@ class TestDFSWithoutCache:
 
     def test_resource_not_found(self, search_without_cache):
         result = search_without_cache.dfs("n1", "r999", use_cache=False)
-        assert result is None
+        assert not result
 
 
 class TestDFSWithCache:
@@ -140,7 +140,7 @@ class TestRandomWalkWithoutCache:
         found = False
         for _ in range(10):
             result = search_without_cache.random_walk("n1", "r1", use_cache=False)
-            if result is not None and result[0] == "n1" and result[-1] == "n2":
+            if result and result[0] == "n1" and result[-1] == "n2":
                 found = True
                 break
         assert found, "Random walk should eventually find r1"
@@ -150,7 +150,7 @@ class TestRandomWalkWithoutCache:
         found = False
         for _ in range(10):
             result = search_without_cache.random_walk("n1", "r2", use_cache=False)
-            if result is not None and result[0] == "n1" and result[-1] == "n3":
+            if result and result[0] == "n1" and result[-1] == "n3":
                 found = True
                 break
         assert found, "Random walk should eventually find r2"
@@ -160,7 +160,7 @@ class TestRandomWalkWithoutCache:
         search_without_cache.ttl = 1
         result = search_without_cache.random_walk("n1", "r4", use_cache=False)
         # Result can be None or a valid path depending on random choices
-        assert result is None or (result[0] == "n1" and result[-1] == "n5")
+        assert not result or (result[0] == "n1" and result[-1] == "n5")
 
 
 class TestRandomWalkWithCache:
@@ -169,7 +169,7 @@ class TestRandomWalkWithCache:
         found = False
         for _ in range(10):
             result = search_with_cache.random_walk("n1", "r1", use_cache=True)
-            if result is not None and result[0] == "n1" and result[-1] == "n2":
+            if result and result[0] == "n1" and result[-1] == "n2":
                 found = True
                 assert search_with_cache.cache["n1"]["r1"] is not None
                 break
@@ -198,3 +198,259 @@ class TestCachePersistence:
         assert "n1" in cache_data
         assert "r1" in cache_data["n1"]
         assert cache_data["n1"]["r1"] == ["n2"]
+
+
+@pytest.fixture
+def replicated_search(test_network):
+    """r1 held by n2 (1 hop from n1) and n5 (2 hops from n1)"""
+    from network import NetworkNode
+    test_network["n5"] = NetworkNode("n5", {"r1", "r4"})
+    return NetworkSearch(network=test_network, ttl=10, cache=None)
+
+
+class TestStreamingSearch:
+    def test_iter_bfs_yields_all_holders_nearest_first(self, replicated_search):
+        results = list(replicated_search.iter_bfs("n1", "r1"))
+        assert results == [("n2", ["n1", "n2"]), ("n5", ["n1", "n3", "n5"])]
+
+    def test_iter_bfs_limit(self, replicated_search):
+        results = list(replicated_search.iter_bfs("n1", "r1", limit=1))
+        assert results == [("n2", ["n1", "n2"])]
+
+    def test_iter_bfs_respects_ttl(self, replicated_search):
+        replicated_search.ttl = 1
+        assert [holder for holder, _ in replicated_search.iter_bfs("n1", "r1")] == ["n2"]
+
+    def test_iter_bfs_not_found(self, search_without_cache):
+        assert list(search_without_cache.iter_bfs("n1", "r999")) == []
+
+    def test_iter_flood_yields_all_holders(self, replicated_search):
+        results = dict(replicated_search.iter_flood("n1", "r1"))
+        assert results["n2"] == ["n1", "n2"]
+        assert results["n5"][-1] == "n5" and results["n5"][0] == "n1"
+
+    def test_iter_flood_stops_early(self, replicated_search):
+        stream = replicated_search.iter_flood("n1", "r1")
+        holder, path = next(stream)
+        stream.close()
+        assert holder == "n2" and path == ["n1", "n2"]
+
+    @pytest.mark.parametrize("ttl", [0, 1, 2, 3, 10])
+    @pytest.mark.parametrize("resource", ["r1", "r3", "r4", "r999"])
+    def test_first_result_matches_single_search(self, test_network, ttl, resource):
+        search = NetworkSearch(network=test_network, ttl=ttl, cache=None)
+        for requester in ("n1", "n4", "n5"):
+            for method, iterate in (("bfs", search.iter_bfs), ("flood", search.iter_flood)):
+                first = next(iterate(requester, resource), (None, None))[1]
+                assert first == getattr(search, method)(requester, resource).path
+
+    def test_flood_many_counts_like_flood(self, search_without_cache):
+        for resource in ("r3", "r999"):
+            _, messages = search_without_cache.flood_many("n4", {resource})
+            assert messages == search_without_cache.flood("n4", resource).messages
+
+    def test_iter_bfs_caches_nearest_holder(self, test_network, search_with_cache):
+        from network import NetworkNode
+        test_network["n5"] = NetworkNode("n5", {"r1", "r4"})
+        list(search_with_cache.iter_bfs("n1", "r1"))
+        assert search_with_cache.cache["n1"]["r1"] == ["n2"]
+
+
+class TestMultiResourceSearch:
+    def test_finds_all_targets_in_one_flood(self, search_without_cache):
+        paths, messages = search_without_cache.flood_many("n1", {"r1", "r2", "r3", "r4"})
+        assert paths == {
+            "r1": ["n1", "n2"],
+            "r2": ["n1", "n3"],
+            "r3": ["n1", "n2", "n4"],
+            "r4": ["n1", "n3", "n5"],
+        }
+        # Each of the other four nodes receives the query exactly once
+        assert messages == 4
+
+    def test_missing_target_is_none(self, search_without_cache):
+        paths, _ = search_without_cache.flood_many("n1", {"r1", "r999"})
+        assert paths["r1"] == ["n1", "n2"]
+        assert paths["r999"] is None
+
+    def test_uses_and_updates_cache(self, search_with_cache):
+        search_with_cache.flood_many("n1", {"r3"}, use_cache=True)
+        assert search_with_cache.cache["n1"]["r3"] == ["n2", "n4"]
+
+        paths, messages = search_with_cache.flood_many("n1", {"r3"}, use_cache=True)
+        assert paths["r3"] == ["n1", "n2", "n4"]
+        # The query still travels the two hops of the cached route
+        assert messages == 2
+
+
+class TestBatchSearch:
+    def test_one_traversal_answers_every_requester(self, search_without_cache):
+        paths, cost = search_without_cache.bfs_batch(["n1", "n3", "n5", "n3"], "r3")
+        assert paths == {"n1": ["n1", "n2", "n4"], "n3": ["n3", "n2", "n4"], "n5": ["n5", "n3", "n2", "n4"]}
+        for node_id, path in paths.items():
+            assert len(path) == len(search_without_cache.bfs(node_id, "r3"))
+        # One message per node reached, however many requesters
+        assert cost.messages == 4
+        assert cost.path is None
+
+    def test_ttl_bounds_the_hops(self, test_network):
+        paths, _ = NetworkSearch(network=test_network, ttl=2).bfs_batch(["n1", "n5"], "r3")
+        assert paths == {"n1": ["n1", "n2", "n4"], "n5": None}
+
+    def test_missing_resource(self, search_without_cache):
+        paths, cost = search_without_cache.bfs_batch(["n1", "n2"], "r999")
+        assert paths == {"n1": None, "n2": None}
+        assert cost.messages == 0
+
+    def test_uses_and_updates_cache(self, search_with_cache):
+        search_with_cache.bfs_batch(["n1", "n5"], "r3", use_cache=True)
+        assert search_with_cache.cache["n5"]["r3"] == ["n3", "n2", "n4"]
+
+        paths, cost = search_with_cache.bfs_batch(["n1", "n5"], "r3", use_cache=True)
+        assert paths["n5"] == ["n5", "n3", "n2", "n4"]
+        assert cost.cache_hits == 2
+        assert cost.nodes_visited == 0
+
+
+class TestSearchResult:
+    def test_behaves_like_the_path(self, search_without_cache):
+        result = search_without_cache.bfs("n1", "r3")
+        assert result == ["n1", "n2", "n4"]
+        assert list(result) == ["n1", "n2", "n4"]
+        assert len(result) == 3 and result[-1] == "n4"
+        assert result.hops == 2
+
+    def test_not_found_is_falsy(self, search_without_cache):
+        result = search_without_cache.flood("n1", "r999")
+        assert not result
+        assert result.path is None and result.hops is None
+        assert len(result) == 0
+
+    def test_bfs_counts(self, search_without_cache):
+        result = search_without_cache.bfs("n1", "r1")
+        # n1 sends the query to n2 and n3; n2 holds r1
+        assert result.messages == 2
+        assert result.nodes_visited == 2
+        assert result.cache_probes == 0
+        assert result.elapsed > 0
+
+    def test_flood_counts_duplicates(self, search_without_cache):
+        result = search_without_cache.flood("n1", "r999")
+        assert result.messages > 0
+        assert result.duplicates_suppressed > 0
+        assert result.nodes_visited == result.messages + 1
+
+    @pytest.mark.parametrize("method", ["bfs", "dfs", "flood", "random_walk", "dijkstra"])
+    def test_cache_hit_counted(self, search_with_cache, method):
+        search_with_cache.bfs("n1", "r3", use_cache=True)
+        result = getattr(search_with_cache, method)("n1", "r3", use_cache=True)
+        assert result == ["n1", "n2", "n4"]
+        assert result.cache_probes == 1
+        assert result.cache_hits == 1
+        # Following the cached route still costs one message per hop
+        assert result.messages == 2
+        assert result.nodes_visited == 0
+
+    def test_fetch_returns_result(self, test_network):
+        result = test_network.fetch("n1", "r2", search_method="bfs", ttl=10)
+        assert result == ["n1", "n3"]
+        assert result.messages > 0
+
+
+@pytest.fixture
+def weighted_network():
+    """
+    n5 (has r1) --20-- n1 --1-- n2 --1-- n4 (has r1)
+                        |                 |
+                        1 ---- n3 --10----+
+
+    Fewest hops n1->r1: [n1, n5] (latency 20)
+    Lowest latency n1->r1: [n1, n2, n4] (latency 2)
+    """
+    from graph import GraphSchema
+    from network import Network
+    schema = GraphSchema.from_dict({
+        "num_nodes": 5,
+        "min_neighbors": 0,
+        "max_neighbors": 3,
+        "resources": {"n1": [], "n2": [], "n3": [], "n4": ["r1"], "n5": ["r1"]},
+        "edges": [
+            ["n1", "n5", {"latency": 20.0, "bandwidth": 1.0}],
+            ["n1", "n2", {"latency": 1.0}],
+            ["n2", "n4", 1.0],
+            ["n1", "n3"],
+            ["n3", "n4", {"latency": 10.0}],
+        ],
+    })
+    return Network.from_schema(schema)
+
+
+class TestDijkstra:
+    def test_bfs_prefers_fewest_hops(self, weighted_network):
+        search = NetworkSearch(network=weighted_network, ttl=10)
+        assert search.bfs("n1", "r1") == ["n1", "n5"]
+
+    def test_prefers_lowest_latency(self, weighted_network):
+        search = NetworkSearch(network=weighted_network, ttl=10)
+        path = search.dijkstra("n1", "r1")
+        assert path == ["n1", "n2", "n4"]
+        assert weighted_network.path_latency(path) == 2.0
+
+    def test_ttl_limits_hops(self, weighted_network):
+        search = NetworkSearch(network=weighted_network, ttl=1)
+        assert search.dijkstra("n1", "r1") == ["n1", "n5"]
+
+    def test_not_found(self, weighted_network):
+        search = NetworkSearch(network=weighted_network, ttl=10)
+        assert not search.dijkstra("n1", "r999")
+
+    def test_link_attributes_loaded(self, weighted_network):
+        assert weighted_network.graph.link_latency("n5", "n1") == 20.0
+        assert weighted_network.graph.bandwidth["n1"]["n5"] == 1.0
+        assert weighted_network.graph.link_latency("n1", "n3") == 1.0
+
+    def test_cheaper_route_replaces_cached_one(self, weighted_network, cache_file):
+        cache = Cache(nodes={}, file_path=cache_file, network=weighted_network)
+        cache.update("r1", ["n1", "n5"])
+        assert cache.cost("n1", "r1") == 20.0
+
+        search = NetworkSearch(network=weighted_network, ttl=10, cache=cache)
+        search.dijkstra("n1", "r1")
+        assert cache["n1"]["r1"] == ["n2", "n4"]
+        assert cache.cost("n1", "r1") == 2.0
+
+    def test_costs_follow_topology_changes(self, weighted_network, cache_file):
+        cache = Cache(nodes={}, file_path=cache_file, network=weighted_network)
+        cache.update("r1", ["n1", "n5"])
+        assert cache.cost("n1", "r1") == 20.0
+        weighted_network.graph.remove_link("n1", "n5")
+        weighted_network.graph.add_link("n1", "n5", latency=0.5)
+        assert cache.cost("n1", "r1") == 0.5
+        cache.update("r1", ["n1", "n2", "n4"], keep_cheapest=True)
+        assert cache["n1"]["r1"] == ["n5"]
+
+    def test_cost_computed_before_a_topology_change_is_dropped(self, weighted_network, cache_file):
+        cache = Cache(nodes={}, file_path=cache_file, network=weighted_network)
+        cache.update("r1", ["n1", "n5"])
+        assert cache.cost("n1", "r1") == 20.0
+        graph = weighted_network.graph
+        link_latency = graph.link_latency
+
+        def relink_while_reading(source, target):
+            latency = link_latency(source, target)
+            if source == "n1":
+                # n1 - n2 becomes slower right after its old latency was read
+                graph.link_latency = link_latency
+                graph.remove_link("n1", "n2")
+                graph.add_link("n1", "n2", latency=10.0)
+            return latency
+
+        graph.link_latency = relink_while_reading
+        cache.update("r1", ["n1", "n2", "n4"], keep_cheapest=True)
+        assert cache["n1"]["r1"] == ["n2", "n4"]
+        assert cache.cost("n1", "r1") == 11.0
+
+    def test_expensive_route_does_not_replace_cheaper(self, weighted_network, cache_file):
+        cache = Cache(nodes={"n1": {"r1": ["n2", "n4"]}}, file_path=cache_file, network=weighted_network)
+        cache.update("r1", ["n1", "n5"], keep_cheapest=True)
+        assert cache["n1"]["r1"] == ["n2", "n4"]
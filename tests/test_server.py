@@ -0,0 +1,115 @@
+import pytest
+import asyncio
+import sys
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from loader import NetworkLoader
+from server import QueryClient, QueryServer
+from session import FetchSession
+
+
+@pytest.fixture
+def network():
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+@pytest.fixture
+def running(network, tmp_path):
+    """A QueryServer on a free localhost port, its event loop in a background thread."""
+    session = FetchSession(network, 10, cache_file=tmp_path / "cache.json", flush_interval=None)
+    # Wide enough that a pipelined burst always lands in one batch
+    server = QueryServer(session, batch_window=0.05)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(port=0), loop).result()
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    session.close()
+
+
+@pytest.fixture
+def client(running):
+    with QueryClient(port=running.address[1], timeout=10) as client:
+        yield client
+
+
+class TestQueryServer:
+    def test_fetch(self, client, network):
+        response = client.fetch("n1", "r3")
+        assert response["path"] == network.fetch("n1", "r3", search_method="bfs", ttl=10).path
+        assert response["found"] and response["hops"] == 2
+        assert response["batch_size"] == 1
+        assert response["latency_ms"] > 0
+
+    def test_pipelined_requests_batch_together(self, client, running, network, tmp_path):
+        queries = [("n1", "r3"), ("n3", "r3"), ("n5", "r3"), ("n1", "r3")]
+        responses = client.fetch_many(queries)
+        # The same answers as one fetch after another, later ones using routes cached by earlier ones
+        with FetchSession(network, 10, cache_file=tmp_path / "sequential.json", flush_interval=None) as session:
+            assert [response["path"] for response in responses] == [session.fetch(*query).path for query in queries]
+        assert {response["batch_size"] for response in responses} == {4}
+        stats = client.stats()
+        assert stats["batches"] == 1
+        # Only the repeated request from n1 shares a search
+        assert stats["searches_saved"] == 1
+        assert stats["latency_percentiles_ms"]["p50"] > 0
+
+    def test_shared_traversal_answers_a_bfs_batch_at_once(self, client, running):
+        running.session.shared_traversal = True
+        responses = client.fetch_many([("n1", "r3"), ("n3", "r3"), ("n5", "r3"), ("n1", "r3")])
+        assert [response["path"] for response in responses] == [
+            ["n1", "n2", "n4"], ["n3", "n2", "n4"], ["n5", "n3", "n2", "n4"], ["n1", "n2", "n4"],
+        ]
+        # One traversal for four requests; every response carries its whole cost
+        assert client.stats()["searches_saved"] == 3
+        assert {response["messages"] for response in responses} == {4}
+
+    def test_methods_batch_apart(self, client):
+        responses = client.fetch_many([("n1", "r4", "bfs"), ("n1", "r4", "flood"), ("n1", "r4", "dfs")])
+        assert [response["batch_size"] for response in responses] == [1, 1, 1]
+        assert all(response["path"] == ["n1", "n3", "n5"] for response in responses)
+
+    def test_bad_requests_keep_the_connection(self, client):
+        assert client.request(requester_id="n1")["error"] == "ValueError: missing field 'resource'"
+        assert "unknown node" in client.request(requester_id="n99", resource="r1")["error"]
+        assert "Unknown search method" in client.request(requester_id="n1", resource="r1", search_method="teleport")["error"]
+        assert "unknown op" in client.request(op="shutdown")["error"]
+        assert client.request(op="ping")["ok"]
+        assert client.stats()["errors"] == 4
+
+    def test_connections_are_independent(self, running, client):
+        with QueryClient(port=running.address[1], timeout=10) as other:
+            assert other.fetch("n2", "r4")["path"] == ["n2", "n3", "n5"]
+        assert client.fetch("n2", "r4")["path"] == ["n2", "n3", "n5"]
+
+    def test_cache_is_shared_across_requests(self, client):
+        assert client.fetch("n1", "r4")["cache_hits"] == 0
+        assert client.fetch("n1", "r4")["cache_hits"] == 1
+
+
+def test_unix_socket(network, tmp_path):
+    path = str(tmp_path / "query.sock")
+
+    def fetch():
+        with QueryClient(path=path, timeout=10) as client:
+            return client.fetch("n1", "r2")
+
+    async def main():
+        with FetchSession(network, 10, use_cache=False) as session:
+            server = QueryServer(session)
+            await server.start(path=path)
+            response = await asyncio.to_thread(fetch)
+            await server.close()
+        return response
+
+    assert asyncio.run(main())["path"] == ["n1", "n3"]
+
+
+def test_client_needs_an_address():
+    with pytest.raises(ValueError):
+        QueryClient()
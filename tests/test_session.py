@@ -0,0 +1,180 @@
+import pytest
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache import Cache
+from loader import NetworkLoader
+from session import FetchSession, load_queries
+
+NETWORK_FILE = Path(__file__).parent / "test_network.json"
+
+
+@pytest.fixture
+def network():
+    return NetworkLoader().load(str(NETWORK_FILE))
+
+
+@pytest.fixture
+def queries(network):
+    # Every node asks for every resource it does not hold
+    return [
+        (node_id, resource)
+        for node_id in network.neighbors
+        for resource in sorted(network.resource_index)
+        if node_id not in network.holders(resource)
+    ]
+
+
+class TestCacheDirty:
+    def test_counts_updates_until_flush(self, network, tmp_path):
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, deferred_write=True)
+        assert cache.dirty == 0
+        assert not cache.flush_if_dirty()
+        cache.update("r1", ["n3", "n2", "n1"])
+        assert cache.dirty == 3
+        assert cache.flush_if_dirty()
+        assert cache.dirty == 0
+        assert not cache.flush_if_dirty()
+
+    def test_failed_write_stays_dirty(self, network, tmp_path):
+        cache = Cache(nodes={}, file_path=tmp_path / "missing" / "cache.json", network=network, deferred_write=True)
+        cache.update("r1", ["n3", "n2", "n1"])
+        with pytest.raises(OSError):
+            cache.flush_if_dirty()
+        assert cache.dirty == 3
+        cache.path = tmp_path / "cache.json"
+        assert cache.flush_if_dirty()
+        assert cache.dirty == 0
+
+    def test_concurrent_flushes(self, network, tmp_path):
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, deferred_write=True)
+        cache.update("r3", ["n1", "n2", "n4"])
+        taken, second_done = threading.Event(), threading.Event()
+        snapshot = cache._snapshot
+
+        def slow_snapshot():
+            copy = snapshot()
+            if threading.current_thread() is first:
+                # Let the second writer try to get ahead of this one
+                taken.set()
+                second_done.wait(0.5)
+            return copy
+
+        def second():
+            cache.update("r2", ["n1", "n3"])
+            cache.flush()
+            second_done.set()
+
+        cache._snapshot = slow_snapshot
+        first = threading.Thread(target=cache.flush)
+        first.start()
+        taken.wait()
+        other = threading.Thread(target=second)
+        other.start()
+        first.join()
+        other.join()
+
+        assert json.loads(cache.path.read_text()) == cache.snapshot()
+        assert cache.dirty == 0
+
+    def test_unchanged_entry_is_clean(self, network, tmp_path):
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, deferred_write=True)
+        cache.update("r1", ["n3", "n2", "n1"])
+        cache.flush()
+        # Neither the same route again nor a costlier one changes anything
+        cache.update("r1", ["n3", "n2", "n1"])
+        cache.update("r1", ["n3", "n1", "n2", "n1"], keep_cheapest=True)
+        assert cache.dirty == 0
+
+
+class TestFetchSession:
+    def test_matches_single_fetches(self, network, queries, tmp_path):
+        expected = [
+            network.fetch(node_id, resource, search_method="bfs", ttl=50, use_cache=True, cache_file=str(tmp_path / "single.json")).path
+            for node_id, resource in queries
+        ]
+        with FetchSession(network, 50, "bfs", cache_file=tmp_path / "session.json") as session:
+            assert [result.path for result in session.run(queries)] == expected
+        with (tmp_path / "single.json").open() as single, (tmp_path / "session.json").open() as batched:
+            assert json.load(single) == json.load(batched)
+
+    @pytest.mark.parametrize("ttl", [1, 2, 3, 4])
+    def test_batch_matches_single_fetches(self, network, ttl):
+        requesters = ["n1", "n2", "n3", "n4", "n5", "n1"]
+        with FetchSession(network, ttl, "bfs", use_cache=False, flush_interval=None) as session:
+            for resource in ("r1", "r2", "r3", "r4"):
+                batched = session.fetch_batch(requesters, resource)
+                assert {node_id: result.path for node_id, result in batched.items()} == {
+                    node_id: network.fetch(node_id, resource, search_method="bfs", ttl=ttl).path for node_id in requesters
+                }
+
+    def test_shared_traversal_bounds_hops(self, network):
+        # n5 is three hops from the holder n4, more than TTL 2
+        with FetchSession(network, 2, "bfs", use_cache=False, flush_interval=None, shared_traversal=True) as session:
+            batched = session.fetch_batch(["n1", "n5"], "r3")
+            assert {node_id: result.path for node_id, result in batched.items()} == {"n1": ["n1", "n2", "n4"], "n5": None}
+            assert session.queries == 2
+            # Other methods and single requesters still run one search each
+            assert session.fetch_batch(["n1", "n5"], "r3", "flood")["n1"].path == network.fetch("n1", "r3", search_method="flood", ttl=2).path
+            assert not session.shares_traversal("bfs", 1)
+
+    def test_flushes_on_threshold_not_per_query(self, network, queries, tmp_path):
+        with FetchSession(network, 50, cache_file=tmp_path / "cache.json", flush_every=10, flush_interval=None) as session:
+            list(session.run(queries))
+            assert 0 < session.flushes < len(queries)
+            assert session.cache.dirty < 10
+        assert session.cache.dirty == 0
+
+    def test_cache_hits_do_not_write(self, network, tmp_path):
+        path = tmp_path / "cache.json"
+        with FetchSession(network, 50, cache_file=path, flush_interval=None) as session:
+            session.fetch("n1", "r3")
+        written = path.stat().st_mtime_ns
+        with FetchSession(network, 50, cache_file=path, flush_interval=None) as session:
+            assert session.fetch("n1", "r3").cache_hits == 1
+        assert session.flushes == 0
+        assert path.stat().st_mtime_ns == written
+
+    def test_timer_flushes_dirty_cache(self, network, tmp_path):
+        path = tmp_path / "cache.json"
+        with FetchSession(network, 50, cache_file=path, flush_interval=0.01) as session:
+            session.fetch("n1", "r3")
+            deadline = time.monotonic() + 5
+            while not path.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert path.exists()
+
+    def test_loads_network_from_path(self, tmp_path):
+        with FetchSession(NETWORK_FILE, 50, use_cache=False) as session:
+            assert session.cache is None
+            assert session.fetch("n1", "r3").found
+        assert not session.flush()
+
+    def test_closed_session_rejects_fetch(self, network):
+        session = FetchSession(network, 50, use_cache=False)
+        session.close()
+        with pytest.raises(ValueError):
+            session.fetch("n1", "r3")
+
+    def test_invalid_flush_settings(self, network):
+        with pytest.raises(ValueError):
+            FetchSession(network, 50, flush_every=0)
+        with pytest.raises(ValueError):
+            FetchSession(network, 50, flush_interval=0)
+
+
+class TestLoadQueries:
+    def test_parses_lines(self, tmp_path):
+        path = tmp_path / "queries.txt"
+        path.write_text("# requester resource [method]\nn1 r3\n\nn2 r4 flood\n")
+        assert list(load_queries(path)) == [("n1", "r3"), ("n2", "r4", "flood")]
+
+    def test_malformed_line(self, tmp_path):
+        path = tmp_path / "queries.txt"
+        path.write_text("n1\n")
+        with pytest.raises(ValueError):
+            list(load_queries(path))
@@ -0,0 +1,205 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache import Cache
+from graph import GraphSchema
+from loader import NetworkLoader
+from network import Network
+from simulator import NetworkSimulator
+
+
+@pytest.fixture
+def network():
+    # n1 - n2 (r1), n3 (r2); n2 - n3, n4 (r3); n3 - n5 (r4)
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+@pytest.fixture
+def weighted_network():
+    # n1 -20- n5 (r1); n1 -1- n2 -1- n4 (r1); n1 -1- n3 -10- n4
+    schema = GraphSchema.from_dict({
+        "num_nodes": 5,
+        "min_neighbors": 0,
+        "max_neighbors": 3,
+        "resources": {"n1": [], "n2": [], "n3": [], "n4": ["r1"], "n5": ["r1"]},
+        "edges": [
+            ["n1", "n5", {"latency": 20.0}],
+            ["n1", "n2", {"latency": 1.0}],
+            ["n2", "n4"],
+            ["n1", "n3"],
+            ["n3", "n4", {"latency": 10.0}],
+        ],
+    })
+    return Network.from_schema(schema)
+
+
+@pytest.fixture
+def pair():
+    # n1 - n2 (r1), one link of latency 1 and bandwidth 1
+    schema = GraphSchema.from_dict({
+        "num_nodes": 2,
+        "min_neighbors": 0,
+        "max_neighbors": 1,
+        "resources": {"n1": [], "n2": ["r1"]},
+        "edges": [["n1", "n2", {"latency": 1.0, "bandwidth": 1.0}]],
+    })
+    return Network.from_schema(schema)
+
+
+class TestFlood:
+    def test_response_time_counts_both_ways(self, network):
+        sim = NetworkSimulator(network, ttl=10)
+        query = sim.submit("n1", "r4")
+        sim.run()
+        assert query.path == ["n1", "n3", "n5"]
+        assert query.response_time == 4.0
+        assert query.responses == 2
+
+    def test_first_response_follows_lowest_latency(self, weighted_network):
+        sim = NetworkSimulator(weighted_network, ttl=10)
+        query = sim.submit("n1", "r1")
+        sim.run()
+        assert query.path == ["n1", "n2", "n4"]
+        assert query.response_time == 4.0
+        # n5 answers too, later
+        assert query.responses == 3
+
+    def test_duplicates_reach_the_nodes(self, network):
+        sim = NetworkSimulator(network, ttl=10)
+        query = sim.submit("n4", "r9")
+        sim.run()
+        assert not query.found
+        assert query.messages == 6
+        assert query.duplicates == 2
+        assert query.finished_at == 3.0
+
+    def test_ttl_limits_depth(self, network):
+        sim = NetworkSimulator(network, ttl=2)
+        query = sim.submit("n1", "r4")
+        sim.run()
+        assert not query.found
+        assert query.messages == 2
+
+    def test_requester_holding_the_resource(self, network):
+        sim = NetworkSimulator(network, ttl=10)
+        query = sim.submit("n5", "r4")
+        sim.run()
+        assert query.path == ["n5"]
+        assert query.response_time == 0.0
+        assert query.messages == 0
+
+
+class TestExpandingRing:
+    def test_rings_grow_until_found(self, network):
+        sim = NetworkSimulator(network, ttl=10)
+        query = sim.submit("n1", "r4", "bfs")
+        sim.run()
+        # Ring TTL 2 reaches n2 and n3 and dies out at 1; ring TTL 4 answers at 1 + 4
+        assert query.path == ["n1", "n3", "n5"]
+        assert query.response_time == 5.0
+
+    def test_gives_up_at_ttl(self, network):
+        sim = NetworkSimulator(network, ttl=5)
+        query = sim.submit("n1", "r9", "bfs")
+        sim.run()
+        assert not query.found
+        assert query.finished_at is not None
+
+
+class TestRandomWalk:
+    def test_walk_follows_links(self, network):
+        sim = NetworkSimulator(network, ttl=10, seed=1)
+        queries = [sim.submit("n1", "r4", "random") for _ in range(20)]
+        sim.run()
+        for query in queries:
+            if query.found:
+                assert query.path[-1] == "n5"
+                assert all(b in network.neighbors[a] for a, b in zip(query.path, query.path[1:]))
+                assert query.responses == query.messages == query.hops
+
+    def test_reproducible(self, network):
+        runs = []
+        for _ in range(2):
+            sim = NetworkSimulator(network, ttl=10, seed=7)
+            for _ in range(10):
+                sim.submit("n4", "r4", "random")
+            runs.append([(query.path, query.response_time) for query in sim.run()])
+        assert runs[0] == runs[1]
+
+
+class TestCache:
+    def test_cached_route_answers_later_queries(self, network, tmp_path):
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network, deferred_write=True)
+        sim = NetworkSimulator(network, ttl=10, cache=cache)
+        first = sim.submit("n1", "r4")
+        sim.run()
+        second = sim.submit("n1", "r4", at=10.0)
+        sim.run()
+        assert second.method == "cache"
+        assert second.path == first.path
+        assert second.response_time == 4.0
+        assert second.messages == 2 < first.messages
+        assert sim.stats()["cache_answers"] == 1
+
+
+class TestLinks:
+    def test_bandwidth_queues_messages(self, pair):
+        sim = NetworkSimulator(pair, ttl=10, message_size=2.0)
+        queries = [sim.submit("n1", "r1") for _ in range(3)]
+        sim.run()
+        # Each message holds the link for 2: queries and responses queue behind each other
+        assert [query.response_time for query in queries] == [6.0, 8.0, 10.0]
+        assert sim.link_utilization() == {("n1", "n2"): 0.6, ("n2", "n1"): 0.6}
+
+    def test_unlimited_bandwidth(self, pair):
+        pair.graph.bandwidth.clear()
+        sim = NetworkSimulator(pair, ttl=10)
+        queries = [sim.submit("n1", "r1") for _ in range(3)]
+        sim.run()
+        assert [query.response_time for query in queries] == [2.0] * 3
+        assert sim.stats()["busiest_link"] is None
+
+    def test_default_bandwidth(self, network):
+        sim = NetworkSimulator(network, ttl=10, message_size=1.0, default_bandwidth=0.5)
+        query = sim.submit("n1", "r3")
+        sim.run()
+        assert query.response_time == 4 * (1.0 + 2.0)
+
+
+def test_run_until_stops_the_clock(network):
+    sim = NetworkSimulator(network, ttl=10)
+    query = sim.submit("n1", "r4")
+    sim.run(until=2.0)
+    assert sim.now == 2.0
+    assert not query.found
+    sim.run()
+    assert query.found
+
+
+def test_stats(network):
+    sim = NetworkSimulator(network, ttl=10)
+    for requester in ("n1", "n2", "n4"):
+        sim.submit(requester, "r4", at=1.0)
+    sim.run()
+    stats = sim.stats()
+    assert stats["queries"] == stats["finished"] == 3
+    assert stats["success_rate"] == 1.0
+    assert stats["events"] == 3 + stats["messages"] + stats["responses"]
+    assert stats["response_time_ms"]["mean"] > 0
+
+
+def test_invalid(network):
+    with pytest.raises(ValueError):
+        NetworkSimulator(network, ttl=0)
+    with pytest.raises(ValueError):
+        NetworkSimulator(network, ttl=10, default_bandwidth=0)
+    sim = NetworkSimulator(network, ttl=10)
+    with pytest.raises(ValueError):
+        sim.submit("n1", "r1", "dijkstra")
+    with pytest.raises(ValueError):
+        sim.submit("n99", "r1")
+    sim.run(until=5.0)
+    with pytest.raises(ValueError):
+        sim.submit("n1", "r1", at=1.0)
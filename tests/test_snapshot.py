@@ -0,0 +1,71 @@
+import pytest
+import json
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph import GraphSchema
+from loader import NetworkLoader, GraphLoader
+from search import NetworkSearch
+from snapshot import Snapshot, SnapshotGraph, write_schema_snapshot
+
+
+NETWORK_JSON = Path(__file__).parent / "test_network.json"
+
+
+@pytest.fixture
+def schema():
+    with open(NETWORK_JSON, "r") as f:
+        return GraphSchema.from_dict(json.load(f))
+
+
+@pytest.fixture
+def snapshot_path(schema, tmp_path):
+    path = tmp_path / "network.snapshot"
+    write_schema_snapshot(path, schema)
+    return path
+
+
+class TestSnapshot:
+    def test_loader_detects_snapshot(self, snapshot_path):
+        network = NetworkLoader().load(str(snapshot_path))
+        assert isinstance(network.graph, SnapshotGraph)
+        assert isinstance(GraphLoader().load(str(snapshot_path)), SnapshotGraph)
+
+    def test_same_adjacency_and_resources(self, snapshot_path):
+        from_json = NetworkLoader().load(str(NETWORK_JSON))
+        from_snapshot = NetworkLoader().load(str(snapshot_path))
+
+        assert set(from_snapshot.neighbors) == set(from_json.neighbors)
+        for node_id, neighbors in from_json.neighbors.items():
+            assert from_snapshot.neighbors[node_id] == neighbors
+            assert set(from_snapshot[node_id].resources) == set(from_json[node_id].resources)
+        assert from_snapshot["n999"] is None
+        assert "n999" not in from_snapshot.neighbors
+
+    def test_searches_match_json(self, snapshot_path):
+        from_json = NetworkSearch(NetworkLoader().load(str(NETWORK_JSON)), ttl=10)
+        from_snapshot = NetworkSearch(NetworkLoader().load(str(snapshot_path)), ttl=10)
+        for resource in ["r1", "r2", "r3", "r4", "r999"]:
+            assert from_snapshot.bfs("n1", resource) == from_json.bfs("n1", resource)
+            assert from_snapshot.flood("n1", resource) == from_json.flood("n1", resource)
+
+    def test_link_attributes_round_trip(self, tmp_path):
+        schema = GraphSchema(
+            num_nodes=3,
+            min_neighbors=1,
+            max_neighbors=2,
+            resources={"n1": [], "n2": ["r1"], "n3": []},
+            edges=[["n1", "n2", {"latency": 4.0, "bandwidth": 10.0}], ["n2", "n3"]],
+        )
+        path = tmp_path / "weighted.snapshot"
+        write_schema_snapshot(path, schema)
+
+        network = NetworkLoader().load(str(path))
+        assert network.graph.link_latency("n2", "n1") == 4.0
+        assert network.graph.link_latency("n2", "n3") == 1.0
+
+        restored = Snapshot(path).to_schema()
+        assert restored.edges == [["n1", "n2", {"latency": 4.0, "bandwidth": 10.0}], ["n2", "n3"]]
+        assert restored.resources == {"n1": [], "n2": ["r1"], "n3": []}
+        assert (restored.min_neighbors, restored.max_neighbors) == (1, 2)
@@ -0,0 +1,120 @@
+import pytest
+from pathlib import Path
+import sys
+import threading
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from loader import NetworkLoader
+from search import NetworkSearch
+from tracing import NULL_TRACER, EventType, Tracer, load_trace
+
+
+@pytest.fixture
+def network():
+    return NetworkLoader().load(str(Path(__file__).parent / "test_network.json"))
+
+
+class TestTracer:
+    def test_ring_buffer_keeps_latest_events(self):
+        tracer = Tracer(capacity=4)
+        emit = tracer.begin("n1", "r1")
+        for i in range(10):
+            emit(EventType.VISIT, f"n{i}")
+        events = tracer.events()
+        assert [event.node for event in events] == ["n6", "n7", "n8", "n9"]
+        assert tracer.overwritten == 6
+
+    def test_sampling(self):
+        tracer = Tracer(sample_rate=0.25, seed=1)
+        sampled = sum(tracer.begin("n1", "r1") is not None for _ in range(2000))
+        assert 400 < sampled < 600
+        assert len(tracer.searches) == sampled
+
+    def test_overwritten_searches_are_forgotten(self):
+        tracer = Tracer(capacity=4)
+        for i in range(100):
+            tracer.begin(f"n{i}", "r1")(EventType.VISIT, f"n{i}")
+        assert len(tracer.searches) <= 2 * tracer.capacity
+        assert {event.search for event in tracer.events()} <= set(tracer.searches)
+
+    def test_clear_resets_live_emitters(self):
+        tracer = Tracer(capacity=4)
+        emit = tracer.begin("n1", "r1")
+        for i in range(6):
+            emit(EventType.VISIT, f"n{i}")
+        tracer.clear()
+        assert tracer.recorded == 0 and tracer.events() == []
+        emit(EventType.FOUND, "n9")
+        assert tracer.recorded == 1
+        assert [event.node for event in tracer.events()] == ["n9"]
+
+    @pytest.mark.parametrize("gil", [True, False])
+    def test_concurrent_emitters_lose_no_events(self, monkeypatch, gil):
+        # Without the GIL, emitters draw their slot under the tracer's lock
+        monkeypatch.setattr(sys, "_is_gil_enabled", lambda: gil, raising=False)
+        tracer = Tracer()
+        emitters = [tracer.begin(f"n{i}", "r1") for i in range(8)]
+
+        def record(emit):
+            for i in range(2000):
+                emit(EventType.VISIT, f"n{i}")
+        threads = [threading.Thread(target=record, args=(emit,)) for emit in emitters]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert tracer.recorded == len(tracer.events()) == 8 * 2000
+
+    def test_null_tracer_gives_no_emitter(self):
+        assert NULL_TRACER.begin("n1", "r1") is None
+
+    def test_export_and_load(self, tmp_path):
+        tracer = Tracer()
+        emit = tracer.begin("n1", "r1")
+        emit(EventType.VISIT, "n1", None, 5)
+        emit(EventType.FORWARD, "n1", "n2", 4)
+        tracer.export(tmp_path / "trace.jsonl")
+
+        searches, events = load_trace(tmp_path / "trace.jsonl")
+        assert searches[0].requester == "n1" and searches[0].resource == "r1"
+        assert events == tracer.events()
+
+
+class TestSearchTracing:
+    def test_bfs_events(self, network):
+        tracer = Tracer()
+        result = NetworkSearch(network, ttl=10, tracer=tracer).bfs("n1", "r3")
+        types = [event.type for event in tracer.events()]
+
+        assert types[0] == EventType.VISIT
+        assert types[-1] == EventType.FOUND
+        assert types.count(EventType.FORWARD) == result.messages
+        assert types.count(EventType.DROP) == result.duplicates_suppressed
+
+    def test_flood_drops_duplicates(self, network):
+        tracer = Tracer()
+        result = NetworkSearch(network, ttl=10, tracer=tracer).flood("n1", "r999")
+        drops = [event for event in tracer.events() if event.type == EventType.DROP]
+        assert len(drops) >= result.duplicates_suppressed > 0
+
+    def test_cache_hit_event(self, network, tmp_path):
+        from cache import Cache
+        cache = Cache(nodes={}, file_path=tmp_path / "cache.json", network=network)
+        tracer = Tracer()
+        search = NetworkSearch(network, ttl=10, cache=cache, tracer=tracer)
+        search.bfs("n1", "r3", use_cache=True)
+        tracer.clear()
+        search.bfs("n1", "r3", use_cache=True)
+        events = tracer.events()
+        assert [(event.type, event.node, event.peer) for event in events] == [(EventType.CACHE_HIT, "n1", "n4")]
+
+    def test_visualizer_rebuilds_steps(self, network):
+        visualizer = network.create_visualizer()
+        result = network.fetch("n1", "r4", search_method="flood", ttl=10)
+        steps = visualizer.steps
+
+        assert steps[0].current_node_id == "n1" and steps[0].path == ["n1"]
+        assert len({step.search for step in steps}) == 1
+        assert steps[-1].found
+        assert steps[-1].path == result.path
+        assert all(step.requester_id == "n1" for step in steps)
@@ -0,0 +1,116 @@
+import pytest
+from collections import Counter
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'validation'))
+
+from loader import NetworkLoader
+from workload import Query, TraceReplayer, generate_trace, load_trace, save_trace, simulate_trace, simulated_rows, summarize
+
+
+NETWORK_JSON = Path(__file__).parent / "test_network.json"
+
+
+@pytest.fixture
+def network():
+    return NetworkLoader().load(str(NETWORK_JSON))
+
+
+@pytest.fixture
+def nodes(network):
+    return list(network.neighbors.keys())
+
+
+@pytest.fixture
+def resources():
+    return [f"r{i}" for i in range(1, 51)]
+
+
+class TestTrace:
+    def test_same_seed_same_trace(self, nodes, resources):
+        assert generate_trace(nodes, resources, 200, seed=3) == generate_trace(nodes, resources, 200, seed=3)
+
+    def test_arrivals_are_increasing(self, nodes, resources):
+        trace = generate_trace(nodes, resources, 500, rate=50.0, seed=1)
+        times = [query.time for query in trace]
+        assert times == sorted(times)
+        # Poisson arrivals at 50/s: 500 queries take about 10s
+        assert 5.0 < times[-1] < 20.0
+
+    def test_skew_concentrates_queries(self, nodes, resources):
+        uniform = Counter(q.resource for q in generate_trace(nodes, resources, 5000, alpha=0.0, seed=1))
+        skewed = Counter(q.resource for q in generate_trace(nodes, resources, 5000, alpha=1.2, seed=1))
+        assert skewed.most_common(1)[0][1] > 3 * uniform.most_common(1)[0][1]
+
+    def test_locality_repeats_recent_resources(self, nodes, resources):
+        def repeats(trace):
+            return sum(trace[i].resource in {q.resource for q in trace[max(0, i - 10):i]} for i in range(len(trace)))
+
+        without = generate_trace(nodes, resources, 2000, alpha=0.0, seed=1)
+        with_locality = generate_trace(nodes, resources, 2000, alpha=0.0, locality=0.8, window=10, seed=1)
+        assert repeats(with_locality) > 2 * repeats(without)
+
+    def test_invalid_locality(self, nodes, resources):
+        with pytest.raises(ValueError):
+            generate_trace(nodes, resources, 10, locality=1.5)
+
+    def test_save_and_load(self, nodes, resources, tmp_path):
+        trace = generate_trace(nodes, resources, 100, seed=2)
+        save_trace(trace, tmp_path / "trace.csv")
+        loaded = load_trace(tmp_path / "trace.csv")
+        assert [(q.node_id, q.resource) for q in loaded] == [(q.node_id, q.resource) for q in trace]
+        assert all(abs(a.time - b.time) < 1e-6 for a, b in zip(loaded, trace))
+
+
+class TestReplay:
+    def test_repeated_queries_hit_the_cache(self, network, nodes):
+        resources = sorted(network.resource_index)
+        trace = generate_trace(nodes, resources, 300, alpha=1.5, seed=4)
+        rows = TraceReplayer(network, ttl=10, search_method="bfs").replay(trace)
+
+        assert len(rows) == 300
+        assert summarize(rows)['cache_hit_rate'] > 0
+        assert not rows[0]['cache_hit']
+
+    def test_cache_hit_means_the_search_used_the_cache(self, network):
+        # n2 holds r1 itself: its cache gets an entry that is never followed
+        trace = [Query(0.0, "n2", "r1"), Query(1.0, "n2", "r1"), Query(2.0, "n1", "r3"), Query(3.0, "n1", "r3")]
+        rows = TraceReplayer(network, ttl=10, search_method="bfs").replay(trace)
+        assert [row['cache_hit'] for row in rows] == [False, False, False, True]
+
+    def test_cache_persists_between_runs(self, network, nodes, tmp_path):
+        resources = sorted(network.resource_index)
+        trace = generate_trace(nodes, resources, 100, seed=5)
+        cache_path = tmp_path / "cache.json"
+
+        cold = summarize(TraceReplayer(network, search_method="bfs", cache_path=cache_path).replay(trace))
+        warm = summarize(TraceReplayer(network, search_method="bfs", cache_path=cache_path).replay(trace))
+        assert warm['cache_hit_rate'] > cold['cache_hit_rate']
+
+    def test_warmup_rows_are_dropped(self, network, nodes):
+        resources = sorted(network.resource_index)
+        trace = generate_trace(nodes, resources, 50, seed=6)
+        rows = TraceReplayer(network, search_method="bfs", use_cache=False).replay(trace, warmup=20)
+        assert len(rows) == 30
+        assert not any(row['cache_hit'] for row in rows)
+
+
+class TestSimulate:
+    def test_trace_runs_in_simulated_time(self, network, nodes):
+        resources = sorted(network.resource_index)
+        trace = generate_trace(nodes, resources, 200, alpha=1.5, rate=50.0, seed=7)
+        sim = simulate_trace(network, trace, ttl=10, search_method="flood")
+        rows = simulated_rows(sim.queries)
+
+        assert len(rows) == 200
+        assert [row['time'] for row in rows] == pytest.approx([query.time for query in trace])
+        assert sim.now >= trace[-1].time * 1000
+        stats = sim.stats()
+        assert stats['success_rate'] == 1.0
+        assert stats['cache_answers'] > 0
+
+    def test_without_cache(self, network, nodes):
+        trace = generate_trace(nodes, sorted(network.resource_index), 50, seed=8)
+        sim = simulate_trace(network, trace, ttl=10, search_method="bfs", use_cache=False)
+        assert sim.stats()['cache_answers'] == 0
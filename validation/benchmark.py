@@ -2,11 +2,14 @@
 Benchmark module to compare search methods with and without cache.
 Generates CSV results for analysis.
 """
+import argparse
 import sys
 from pathlib import Path
 import time
 import csv
+import platform
 import tempfile
+import tracemalloc
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
@@ -14,15 +17,36 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 from loader import NetworkLoader
 from search import NetworkSearch
 from cache import Cache
+from oracle import HopOracle
+from histogram import HistogramRecorder
+from memory import cache_footprint, network_footprint, node_layout_savings, peak_memory
 import json
 
 
+METHODS = ['bfs', 'dfs', 'random', 'flood', 'dijkstra']
+
+
 class BenchmarkRunner:
-    def __init__(self, network_path: Path, ttl: int = 50):
-        """Initialize benchmark runner with network file."""
+    def __init__(self, network_path: Path, ttl: int = 50, keep_rows: bool = True, methods: list[str] | None = None, profile_memory: bool = False):
+        """
+        Initialize benchmark runner with network file.
+
+        Every successful query is recorded in per-method histograms; raw rows
+        are only kept when keep_rows is set, since they grow with the run.
+
+        With profile_memory, every query also records its tracemalloc peak
+        (``peak_bytes``), and the resident sizes of the network and of the
+        caches are reported. Timings are inflated by tracemalloc in this mode.
+        """
         self.network_path = network_path
         self.ttl = ttl
+        self.keep_rows = keep_rows
+        self.methods = methods if methods is not None else ['bfs', 'dfs', 'random']
+        self.profile_memory = profile_memory
+        self.cache_footprints: dict[str, dict] = {}
         self.results = []
+        self.recorder = HistogramRecorder()
+        self.successful_queries = 0
 
         # Load network
         loader = NetworkLoader()
@@ -34,6 +58,9 @@ class BenchmarkRunner:
 
         print(f"Loaded network with {len(self.nodes)} nodes and {len(self.resources)} resources")
 
+        # Ground truth for path quality: optimal hops to the nearest holder
+        self.oracle = HopOracle.build(self.network)
+
     def _get_all_resources(self) -> set[str]:
         """Extract all unique resources from the network."""
         resources = set()
@@ -54,37 +81,55 @@ class BenchmarkRunner:
         """
         Run a single search query and measure performance.
 
-        Returns dict with: node_id, resource, search_method, use_cache, steps, time_ms
+        Returns dict with: node_id, resource, search_method, use_cache, steps, optimal_steps,
+        messages, nodes_visited, time_ms
         Returns None if resource not found.
         """
         network_search = NetworkSearch(self.network, self.ttl, cache=cache)
 
+        def search():
+            if search_method == "bfs":
+                return network_search.bfs(node_id, resource, use_cache=use_cache)
+            if search_method == "dfs":
+                return network_search.dfs(node_id, resource, use_cache=use_cache)
+            if search_method == "flood":
+                return network_search.flood(node_id, resource, use_cache=use_cache)
+            if search_method == "dijkstra":
+                return network_search.dijkstra(node_id, resource, use_cache=use_cache)
+            if search_method == "random":
+                # Random walk is non-deterministic, try multiple times; every
+                # attempt's messages count towards the query
+                messages = nodes_visited = 0
+                for attempt in range(5):
+                    path = network_search.random_walk(node_id, resource, use_cache=use_cache)
+                    messages += path.messages
+                    nodes_visited += path.nodes_visited
+                    if path:
+                        break
+                path.messages = messages
+                path.nodes_visited = nodes_visited
+                return path
+            raise ValueError(f"Unknown search method: {search_method}")
+
         # Measure time
         start_time = time.perf_counter()
 
         # Execute search
-        if search_method == "bfs":
-            path = network_search.bfs(node_id, resource, use_cache=use_cache)
-        elif search_method == "dfs":
-            path = network_search.dfs(node_id, resource, use_cache=use_cache)
-        elif search_method == "random":
-            # Random walk is non-deterministic, try multiple times
-            path = None
-            for attempt in range(5):
-                path = network_search.random_walk(node_id, resource, use_cache=use_cache)
-                if path is not None:
-                    break
+        if self.profile_memory:
+            path, peak_bytes = peak_memory(search)
+            # Failed searches cost memory too, so every query is recorded
+            self.recorder.record(search_method, use_cache, peak_bytes=peak_bytes)
         else:
-            raise ValueError(f"Unknown search method: {search_method}")
+            path = search()
 
         end_time = time.perf_counter()
         time_ms = (end_time - start_time) * 1000
 
         # Check if resource was found
-        if path is None:
+        if not path:
             return None
 
-        steps = len(path) - 1  # Number of hops (edges traversed)
+        steps = path.hops  # Number of hops (edges traversed)
 
         return {
             'node_id': node_id,
@@ -92,17 +137,23 @@ class BenchmarkRunner:
             'search_method': search_method,
             'use_cache': use_cache,
             'steps': steps,
+            'optimal_steps': self.oracle.distance(node_id, resource),
+            'messages': path.messages,
+            'nodes_visited': path.nodes_visited,
             'time_ms': round(time_ms, 4)
         }
 
     def run_all_queries(self):
         """Run all combinations of nodes, resources, and search methods."""
-        methods = ['bfs', 'dfs', 'random']
+        methods = self.methods
         total_queries = len(self.nodes) * len(self.resources) * len(methods) * 2  # ×2 for cache on/off
         query_count = 0
 
         print(f"Starting benchmark: {total_queries} total queries")
         print("=" * 60)
+        if self.profile_memory:
+            # Started once here so each query only resets the peak
+            tracemalloc.start()
 
         for search_method in methods:
             print(f"\n>>> Processing {search_method.upper()}...")
@@ -130,7 +181,7 @@ class BenchmarkRunner:
                         use_cache=False
                     )
                     if result:
-                        self.results.append(result)
+                        self._collect(result)
 
             print(f"  Phase 2: Running WITH cache (will build cache as it runs)...")
             # Second pass: Run with cache - early queries populate cache, later queries benefit
@@ -148,21 +199,84 @@ class BenchmarkRunner:
                         use_cache=True
                     )
                     if result:
-                        self.results.append(result)
+                        self._collect(result)
+            if self.profile_memory:
+                self.cache_footprints[search_method] = cache_footprint(cache)
 
             # Flush cache to file at the end
             print(f"  Writing cache to file...")
             cache.flush()
             print(f"  Cache file saved to: {cache_path}")
 
+        if self.profile_memory:
+            tracemalloc.stop()
+
         print(f"\n{'=' * 60}")
-        print(f"Benchmark complete: {len(self.results)} successful queries")
+        print(f"Benchmark complete: {self.successful_queries} successful queries")
         print(f"\nCache files created:")
         for method in methods:
             cache_file = Path(__file__).parent / f"cache_{method}.json"
             if cache_file.exists():
                 print(f"  - {cache_file}")
 
+    def memory_report(self) -> dict:
+        """Peak bytes per search method and resident sizes, as a JSON-ready dict."""
+        return {
+            'meta': {
+                'network': str(self.network_path),
+                'nodes': len(self.nodes),
+                'resources': len(self.resources),
+                'ttl': self.ttl,
+                'python': platform.python_version(),
+                'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            'searches': [row for row in self.recorder.percentile_table() if row['metric'] == 'peak_bytes'],
+            'network': network_footprint(self.network),
+            'node_layout': node_layout_savings(self.network),
+            'caches': self.cache_footprints,
+        }
+
+    def save_memory_report(self, output_path: Path):
+        report = self.memory_report()
+        with open(output_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        layout = report['node_layout']
+        print(
+            f"Node objects: {layout['per_node_bytes']:.0f} bytes/node "
+            f"(saved {layout['saved_per_node_bytes']:.0f} of {layout['legacy_per_node_bytes']:.0f} with slots and resource bitsets)"
+        )
+        print(f"Memory report saved to: {output_path}")
+
+    def _collect(self, result: dict):
+        self.successful_queries += 1
+        self.recorder.record(result['search_method'], result['use_cache'], time_ms=result['time_ms'], steps=result['steps'], messages=result['messages'])
+        if self.keep_rows:
+            self.results.append(result)
+
+    def print_percentiles(self):
+        """Print p50/p99/p999 per metric, search method and cache mode."""
+        print(f"\n{'metric':<10} {'method':<8} {'cache':<6} {'count':>8} {'p50':>10} {'p99':>10} {'p99.9':>10} {'max':>10}")
+        for row in self.recorder.percentile_table():
+            print(
+                f"{row['metric']:<10} {row['search_method']:<8} {str(row['use_cache']):<6} {row['count']:>8} "
+                f"{row['p50']:>10.4g} {row['p99']:>10.4g} {row['p99.9']:>10.4g} {row['max']:>10.4g}"
+            )
+
+    def save_percentiles(self, output_path: Path):
+        """Save the percentile table to CSV."""
+        rows = self.recorder.percentile_table()
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['metric'])
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Percentiles saved to: {output_path}")
+
+    def save_histograms(self, output_path: Path):
+        """Save the raw histograms as JSON; files from several runs can be merged."""
+        with open(output_path, 'w') as f:
+            json.dump(self.recorder.to_dict(), f)
+        print(f"Histograms saved to: {output_path}")
+
     def save_results(self, output_path: Path):
         """Save results to CSV file."""
         if not self.results:
@@ -172,7 +286,7 @@ class BenchmarkRunner:
         with open(output_path, 'w', newline='') as f:
             writer = csv.DictWriter(
                 f,
-                fieldnames=['node_id', 'resource', 'search_method', 'use_cache', 'steps', 'time_ms']
+                fieldnames=['node_id', 'resource', 'search_method', 'use_cache', 'steps', 'optimal_steps', 'messages', 'nodes_visited', 'time_ms']
             )
             writer.writeheader()
             writer.writerows(self.results)
@@ -183,15 +297,30 @@ class BenchmarkRunner:
 
 def main():
     """Main entry point for benchmark."""
-    # Paths
-    project_root = Path(__file__).parent.parent
-    network_path = Path(__file__).parent / "hexagonal_network.json"
-    output_path = Path(__file__).parent / "results.csv"
+    parser = argparse.ArgumentParser(description="Benchmark search methods with and without cache.")
+    parser.add_argument("--network", type=Path, default=Path(__file__).parent / "hexagonal_network.json", help="Network JSON file (e.g. a replicated placement).")
+    parser.add_argument("--output", type=Path, default=Path(__file__).parent / "results.csv", help="CSV output file.")
+    parser.add_argument("--ttl", type=int, default=50, help="TTL for every search.")
+    parser.add_argument("--percentiles", type=Path, default=Path(__file__).parent / "percentiles.csv", help="CSV output with p50/p90/p99/p99.9 per method and cache mode.")
+    parser.add_argument("--histograms", type=Path, default=Path(__file__).parent / "histograms.json", help="JSON output with the mergeable histograms.")
+    parser.add_argument("--no-rows", action="store_true", help="Skip the per-query CSV (only percentiles and histograms).")
+    parser.add_argument("--methods", nargs="+", default=['bfs', 'dfs', 'random'], choices=METHODS, help="Search methods to benchmark.")
+    parser.add_argument("--memory", type=Path, default=None, help="Profile memory (tracemalloc peak per query, resident sizes) and save the JSON report here. Slows every query.")
+    args = parser.parse_args()
+
+    network_path = args.network
+    output_path = args.output
 
     # Run benchmark
-    runner = BenchmarkRunner(network_path, ttl=50)
+    runner = BenchmarkRunner(network_path, ttl=args.ttl, keep_rows=not args.no_rows, methods=args.methods, profile_memory=args.memory is not None)
     runner.run_all_queries()
-    runner.save_results(output_path)
+    runner.print_percentiles()
+    runner.save_percentiles(args.percentiles)
+    runner.save_histograms(args.histograms)
+    if args.memory is not None:
+        runner.save_memory_report(args.memory)
+    if not args.no_rows:
+        runner.save_results(output_path)
 
     print("\n✅ Benchmark complete! Run the Jupyter notebook to analyze results.")
 
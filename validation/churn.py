@@ -0,0 +1,340 @@
+"""
+Churn simulation: peers join and leave, and change what they hold, while a
+query workload runs against one long-lived cache.
+
+Everything happens on a heap of events ordered by simulated time:
+
+- each peer alternates on-line sessions and off-line periods whose lengths
+  come from a SessionModel (exponential, Pareto or Weibull);
+- a peer that leaves takes its resources and links with it; peers left with
+  fewer than ``min_degree`` links reconnect to a random on-line peer;
+- a peer that comes back links to ``degree`` random on-line peers and holds
+  what it held before;
+- resource changes (a Poisson process) make a random peer drop one of its
+  resources and pick up another;
+- queries (a Poisson process, Zipf-skewed resources) run from random on-line
+  peers.
+
+The network is updated in place with Network.join/leave/set_resources, never
+rebuilt. Per interval of simulated time the simulator reports the success
+rate, the share of requester cache entries that had gone stale, and the wall
+time of the updates. The network passed in is modified; load a fresh one for
+every run.
+"""
+import argparse
+import contextlib
+import csv
+import heapq
+import math
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache import Cache
+from histogram import Histogram
+from loader import NetworkLoader
+from network import Network
+from network.replication import zipf_popularity
+from search import NetworkSearch
+from workload import METHODS
+
+DISTRIBUTIONS = ("exponential", "pareto", "weibull")
+
+
+@dataclass
+class SessionModel:
+    """
+    Length of on-line (or off-line) periods in simulated seconds, with the
+    given mean. ``shape`` is the Pareto alpha (> 1; heavier tail when
+    smaller) or the Weibull k (< 1 for the long sessions measured in
+    deployed P2P systems).
+    """
+    distribution: str = "exponential"
+    mean: float = 60.0
+    shape: float = 2.0
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown session distribution {self.distribution!r}, choose from {', '.join(DISTRIBUTIONS)}")
+        if self.mean <= 0:
+            raise ValueError(f"mean must be positive, got {self.mean}")
+        if self.distribution == "pareto" and self.shape <= 1:
+            raise ValueError(f"Pareto shape must be above 1 for a finite mean, got {self.shape}")
+        if self.shape <= 0:
+            raise ValueError(f"shape must be positive, got {self.shape}")
+
+    def sample(self, rng: random.Random) -> float:
+        match self.distribution:
+            case "exponential":
+                return rng.expovariate(1 / self.mean)
+            case "pareto":
+                return self.mean * (self.shape - 1) / self.shape * rng.paretovariate(self.shape)
+            case "weibull":
+                return rng.weibullvariate(self.mean / math.gamma(1 + 1 / self.shape), self.shape)
+
+
+class ChurnSimulator:
+    def __init__(
+        self,
+        network: Network,
+        ttl: int = 50,
+        search_method: str = "bfs",
+        use_cache: bool = True,
+        session: SessionModel | None = None,
+        downtime: SessionModel | None = None,
+        query_rate: float = 50.0,
+        resource_change_rate: float = 1.0,
+        alpha: float = 1.0,
+        degree: int = 3,
+        min_degree: int = 1,
+        seed: int | None = None,
+    ):
+        if search_method not in METHODS:
+            raise ValueError(f"Unknown search method: {search_method}")
+        if query_rate <= 0:
+            raise ValueError(f"query_rate must be positive, got {query_rate}")
+        if resource_change_rate < 0:
+            raise ValueError(f"resource_change_rate must be non-negative, got {resource_change_rate}")
+        self.network = network
+        self.session = session if session is not None else SessionModel()
+        self.downtime = downtime if downtime is not None else SessionModel(mean=30.0)
+        self.query_rate = query_rate
+        self.resource_change_rate = resource_change_rate
+        self.degree = degree
+        self.min_degree = min_degree
+        self.use_cache = use_cache
+        self.rng = random.Random(seed)
+
+        self.cache = Cache(nodes={}, file_path=Path(os.devnull), network=network, deferred_write=True) if use_cache else None
+        self.search = NetworkSearch(network, ttl, cache=self.cache)
+        self._run = getattr(self.search, METHODS[search_method])
+
+        # On-line peers in a list with positions, for O(1) random picks and removals
+        self._online = list(network.neighbors)
+        self._position = {node_id: i for i, node_id in enumerate(self._online)}
+        self._offline: dict[str, frozenset[str]] = {}
+        self.catalog = sorted(network.resource_index)
+        if not self.catalog:
+            raise ValueError("The network holds no resources to query")
+        ranked = list(self.catalog)
+        self.rng.shuffle(ranked)
+        self._ranked = ranked
+        self._weights = list(accumulate(zipf_popularity(ranked, alpha).values()))
+
+        self._events: list[tuple[float, int, str, str | None]] = []
+        self._sequence = 0
+        for node_id in self._online:
+            self._schedule(self.session.sample(self.rng), "leave", node_id)
+        self._schedule(self.rng.expovariate(query_rate), "query")
+        if resource_change_rate > 0:
+            self._schedule(self.rng.expovariate(resource_change_rate), "resource")
+        self.now = 0.0
+        self._reset_window()
+
+    def _schedule(self, at: float, kind: str, node_id: str | None = None) -> None:
+        self._sequence += 1
+        heapq.heappush(self._events, (at, self._sequence, kind, node_id))
+
+    def _reset_window(self) -> None:
+        self._window = {"queries": 0, "found": 0, "cache_lookups": 0, "stale": 0, "joins": 0, "leaves": 0, "resource_changes": 0}
+        self._update_us = Histogram()
+
+    def _set_online(self, node_id: str, online: bool) -> None:
+        if online:
+            self._position[node_id] = len(self._online)
+            self._online.append(node_id)
+            return
+        i = self._position.pop(node_id)
+        last = self._online.pop()
+        if last != node_id:
+            self._online[i] = last
+            self._position[last] = i
+
+    def _random_peer(self, exclude: str | None = None) -> str | None:
+        for _ in range(8):
+            node_id = self._online[self.rng.randrange(len(self._online))]
+            if node_id != exclude:
+                return node_id
+        return None
+
+    # Event handlers
+
+    def _leave(self, node_id: str) -> None:
+        if len(self._online) <= 1:
+            # Keep one peer up so the network never empties
+            self._schedule(self.now + self.session.sample(self.rng), "leave", node_id)
+            return
+        self._set_online(node_id, False)
+        start = time.perf_counter_ns()
+        resources, former = self.network.leave(node_id)
+        for neighbor in former:
+            # Peers left short of links reconnect, as a bootstrap would
+            while len(self.network.neighbors[neighbor]) < self.min_degree:
+                peer = self._random_peer(exclude=neighbor)
+                if peer is None or peer in self.network.neighbors[neighbor]:
+                    break
+                self.network.graph.add_link(neighbor, peer)
+        self._update_us.record((time.perf_counter_ns() - start) / 1000)
+        self._offline[node_id] = resources
+        self._window["leaves"] += 1
+        self._schedule(self.now + self.downtime.sample(self.rng), "join", node_id)
+
+    def _join(self, node_id: str) -> None:
+        links = set()
+        for _ in range(min(self.degree, len(self._online))):
+            peer = self._random_peer()
+            if peer is not None:
+                links.add(peer)
+        start = time.perf_counter_ns()
+        self.network.join(node_id, self._offline.pop(node_id), list(links))
+        self._update_us.record((time.perf_counter_ns() - start) / 1000)
+        self._set_online(node_id, True)
+        self._window["joins"] += 1
+        self._schedule(self.now + self.session.sample(self.rng), "leave", node_id)
+
+    def _change_resources(self) -> None:
+        node_id = self._random_peer()
+        held = set(self.network[node_id].resources)
+        if held:
+            held.discard(self.rng.choice(sorted(held)))
+        held.add(self.rng.choice(self.catalog))
+        start = time.perf_counter_ns()
+        self.network.set_resources(node_id, held)
+        self._update_us.record((time.perf_counter_ns() - start) / 1000)
+        self._window["resource_changes"] += 1
+        self._schedule(self.now + self.rng.expovariate(self.resource_change_rate), "resource")
+
+    def _query(self) -> None:
+        node_id = self._random_peer()
+        i = bisect_left(self._weights, self.rng.random() * self._weights[-1])
+        resource = self._ranked[min(i, len(self._ranked) - 1)]
+        if self.cache is not None:
+            node_cache = self.cache[node_id]
+            route = node_cache.get(resource) if node_cache is not None else None
+            if route is not None:
+                self._window["cache_lookups"] += 1
+                # An empty route means the peer itself held the resource
+                valid = self.network[node_id].has_resource(resource) if not route else self.cache.follow(route, [node_id], resource) is not None
+                if not valid:
+                    self._window["stale"] += 1
+        result = self._run(node_id, resource, use_cache=self.use_cache)
+        self._window["queries"] += 1
+        self._window["found"] += result.found
+        self._schedule(self.now + self.rng.expovariate(self.query_rate), "query")
+
+    def _row(self, until: float) -> dict:
+        window = self._window
+        return {
+            "time": round(until, 6),
+            "online": len(self._online),
+            "queries": window["queries"],
+            "success_rate": window["found"] / window["queries"] if window["queries"] else None,
+            "cache_lookups": window["cache_lookups"],
+            "stale_rate": window["stale"] / window["cache_lookups"] if window["cache_lookups"] else None,
+            "joins": window["joins"],
+            "leaves": window["leaves"],
+            "resource_changes": window["resource_changes"],
+            "update_us_mean": self._update_us.mean if self._update_us.count else None,
+            "update_us_p99": self._update_us.quantile(0.99),
+        }
+
+    def run(self, duration: float, interval: float = 10.0, quiet: bool = True) -> list[dict]:
+        """Simulate ``duration`` more seconds; one row per ``interval`` of simulated time."""
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        end = self.now + duration
+        window_end = self.now + interval
+        rows = []
+        # Some searches print on every cache hit or miss
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+            while self._events and self._events[0][0] <= end:
+                at, _, kind, node_id = heapq.heappop(self._events)
+                while at >= window_end:
+                    rows.append(self._row(window_end))
+                    self._reset_window()
+                    window_end += interval
+                self.now = at
+                match kind:
+                    case "leave":
+                        self._leave(node_id)
+                    case "join":
+                        self._join(node_id)
+                    case "resource":
+                        self._change_resources()
+                    case "query":
+                        self._query()
+        while window_end <= end + 1e-9:
+            rows.append(self._row(window_end))
+            self._reset_window()
+            window_end += interval
+        self.now = end
+        return rows
+
+
+def summarize(rows: list[dict]) -> dict:
+    queries = sum(row["queries"] for row in rows)
+    lookups = sum(row["cache_lookups"] for row in rows)
+    updates = sum(row["joins"] + row["leaves"] + row["resource_changes"] for row in rows)
+    return {
+        "queries": queries,
+        "success_rate": sum((row["success_rate"] or 0) * row["queries"] for row in rows) / queries if queries else 0.0,
+        "stale_rate": sum((row["stale_rate"] or 0) * row["cache_lookups"] for row in rows) / lookups if lookups else 0.0,
+        "updates": updates,
+        "avg_update_us": sum((row["update_us_mean"] or 0) * (row["joins"] + row["leaves"] + row["resource_changes"]) for row in rows) / updates if updates else 0.0,
+        "min_online": min((row["online"] for row in rows), default=0),
+    }
+
+
+def save_rows(rows: list[dict], output_path: Path) -> None:
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["time"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula entrada e saída de pares (churn) enquanto uma carga de consultas roda.")
+    parser.add_argument("--network", type=Path, default=Path(__file__).parent / "hexagonal_network.json", help="Arquivo da rede.")
+    parser.add_argument("--duration", type=float, default=600.0, help="Tempo simulado (s).")
+    parser.add_argument("--interval", type=float, default=30.0, help="Intervalo (s simulados) de cada linha do relatório.")
+    parser.add_argument("--method", default="bfs", choices=sorted(METHODS), help="Método de busca.")
+    parser.add_argument("--ttl", type=int, default=50, help="TTL de cada busca.")
+    parser.add_argument("--no-cache", action="store_true", help="Simula sem cache.")
+    parser.add_argument("--session", default="exponential", choices=DISTRIBUTIONS, help="Distribuição da duração das sessões.")
+    parser.add_argument("--session-mean", type=float, default=60.0, help="Duração média de uma sessão (s).")
+    parser.add_argument("--session-shape", type=float, default=2.0, help="Forma da distribuição (alfa de Pareto ou k de Weibull).")
+    parser.add_argument("--downtime-mean", type=float, default=30.0, help="Tempo médio fora da rede (s), exponencial.")
+    parser.add_argument("--query-rate", type=float, default=50.0, help="Consultas por segundo simulado.")
+    parser.add_argument("--resource-rate", type=float, default=1.0, help="Trocas de recurso por segundo simulado.")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Expoente Zipf da popularidade dos recursos.")
+    parser.add_argument("--degree", type=int, default=3, help="Ligações de um par ao entrar.")
+    parser.add_argument("--min-degree", type=int, default=1, help="Abaixo disso, um par que perde vizinhos se religa.")
+    parser.add_argument("--seed", type=int, default=None, help="Semente aleatória.")
+    parser.add_argument("--output", type=Path, default=Path(__file__).parent / "churn.csv", help="CSV com as métricas por intervalo.")
+    args = parser.parse_args()
+
+    network = NetworkLoader().load(str(args.network))
+    simulator = ChurnSimulator(
+        network, ttl=args.ttl, search_method=args.method, use_cache=not args.no_cache,
+        session=SessionModel(args.session, args.session_mean, args.session_shape),
+        downtime=SessionModel("exponential", args.downtime_mean),
+        query_rate=args.query_rate, resource_change_rate=args.resource_rate, alpha=args.alpha,
+        degree=args.degree, min_degree=args.min_degree, seed=args.seed,
+    )
+    rows = simulator.run(args.duration, args.interval)
+    save_rows(rows, args.output)
+    for key, value in summarize(rows).items():
+        print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
+    print(f"Per-interval metrics saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,30 @@
 """
 Generate a large hexagonal network with 100 nodes and 200 resources.
 """
+import argparse
 import json
+import sys
 from pathlib import Path
 import math
 
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-def generate_hexagonal_network(num_nodes: int = 100, num_resources: int = 200):
+from network.replication import STRATEGIES, zipf_popularity, allocate_replicas, replicate, expected_search_size
+
+
+def generate_hexagonal_network(num_nodes: int = 100, num_resources: int = 200, strategy: str | None = None, capacity: int = 4, alpha: float = 1.0, seed: int | None = None):
     """
     Generate a hexagonal grid network.
 
     Args:
         num_nodes: Number of nodes in the network
         num_resources: Number of resources to distribute
+        strategy: Replication strategy (uniform, proportional, square_root).
+            None keeps one holder per resource, assigned round-robin.
+        capacity: Storage budget (resources per node) when replicating
+        alpha: Zipf exponent of the resource popularity when replicating
+        seed: Random seed for replica placement
     """
     # Calculate grid dimensions for hexagonal layout
     # For a hexagonal grid, we use axial coordinates
@@ -49,6 +61,21 @@ def generate_hexagonal_network(num_nodes: int = 100, num_resources: int = 200):
                 edges_set.add(edge)
 
     edges = [list(edge) for edge in edges_set]
+    # Cell centers, so the visualizer can draw the grid as it is
+    positions = {node_id: [math.sqrt(3) * (q + r / 2), 1.5 * r] for node_id, q, r in nodes}
+
+    if strategy is not None:
+        node_ids = [node_id for node_id, _, _ in nodes]
+        popularity = zipf_popularity([f"r{i}" for i in range(1, num_resources + 1)], alpha=alpha)
+        resources_dict = replicate(node_ids, popularity, capacity, strategy=strategy, seed=seed)
+        return {
+            "num_nodes": num_nodes,
+            "min_neighbors": 0,
+            "max_neighbors": 6,
+            "resources": resources_dict,
+            "edges": edges,
+            "positions": positions,
+        }
 
     # Distribute resources across nodes
     resources_per_node = num_resources // num_nodes
@@ -74,19 +101,49 @@ def generate_hexagonal_network(num_nodes: int = 100, num_resources: int = 200):
         "min_neighbors": 0,  # Edge nodes have fewer neighbors
         "max_neighbors": 6,  # Hexagonal grid max
         "resources": resources_dict,
-        "edges": edges
+        "edges": edges,
+        "positions": positions,
     }
 
     return network
 
 
-def main():
-    """Generate and save the network."""
-    print("Generating hexagonal network with 100 nodes and 200 resources...")
+def print_replication_report(num_nodes: int, num_resources: int, capacity: int, alpha: float):
+    """Print the expected search size of each replication strategy."""
+    popularity = zipf_popularity([f"r{i}" for i in range(1, num_resources + 1)], alpha=alpha)
+    total = min(capacity * num_nodes, num_resources * num_nodes)
+    single = {resource: 1 for resource in popularity}
+    print(f"Expected search size (nodes probed, Zipf alpha={alpha}, capacity={capacity}):")
+    print(f"   single holder: {expected_search_size(popularity, single, num_nodes):.2f}")
+    for strategy in STRATEGIES:
+        replicas = allocate_replicas(popularity, total, strategy=strategy, max_replicas=num_nodes)
+        print(f"   {strategy}: {expected_search_size(popularity, replicas, num_nodes):.2f}")
 
-    network = generate_hexagonal_network(num_nodes=100, num_resources=200)
 
-    output_path = Path(__file__).parent / "hexagonal_network.json"
+def main():
+    """Generate and save the network."""
+    parser = argparse.ArgumentParser(description="Generate a hexagonal network.")
+    parser.add_argument("--nodes", type=int, default=100, help="Number of nodes.")
+    parser.add_argument("--resources", type=int, default=200, help="Number of resources.")
+    parser.add_argument("--strategy", choices=STRATEGIES, default=None, help="Replication strategy (default: one holder per resource).")
+    parser.add_argument("--capacity", type=int, default=4, help="Resources stored per node when replicating.")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Zipf exponent of resource popularity.")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for replica placement.")
+    parser.add_argument("--output", type=Path, default=Path(__file__).parent / "hexagonal_network.json", help="Output file.")
+    args = parser.parse_args()
+
+    print(f"Generating hexagonal network with {args.nodes} nodes and {args.resources} resources...")
+
+    network = generate_hexagonal_network(
+        num_nodes=args.nodes,
+        num_resources=args.resources,
+        strategy=args.strategy,
+        capacity=args.capacity,
+        alpha=args.alpha,
+        seed=args.seed,
+    )
+
+    output_path = args.output
 
     with open(output_path, 'w') as f:
         json.dump(network, f, indent=2)
@@ -106,6 +163,9 @@ def main():
     avg_degree = sum(node_degrees.values()) / len(node_degrees)
     print(f"   Average degree: {avg_degree:.2f}")
 
+    if args.strategy is not None:
+        print_replication_report(args.nodes, args.resources, args.capacity, args.alpha)
+
 
 if __name__ == "__main__":
     main()
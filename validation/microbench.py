@@ -0,0 +1,321 @@
+"""
+Micro-benchmarks for the hot paths, with baseline regression detection.
+
+Each benchmark times one operation (Graph.__getitem__, a NetworkSearch
+method, Cache.update/follow/flush or NetworkLoader.load) on generated
+hexagonal networks of several sizes. Every measurement runs a few untimed
+warmup rounds and then ``repeat`` timed rounds with the garbage collector
+off, like timeit. With ``memory``, one more round runs under tracemalloc and
+its peak allocation is stored as ``peak_bytes``. Results are written as JSON;
+``compare`` flags benchmarks whose median got slower, or whose peak grew, by
+more than a threshold against a baseline.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.generators import hexagonal, round_robin_resources, to_schema, write_json
+from loader import NetworkLoader
+from network import Network
+from search import NetworkSearch
+from cache import Cache
+from engine import QueryEngine
+from memory import peak_memory
+
+
+SEARCH_METHODS = {
+    "bfs": "bfs",
+    "dfs": "dfs",
+    "random": "random_walk",
+    "flood": "flood",
+    "flood_parallel": "flood_parallel",
+    "dijkstra": "dijkstra",
+}
+QUERIES = 20
+TTL = 50
+
+# A benchmark builder gets the network size and a scratch directory and
+# returns the operation to time plus how many basic operations one call does.
+Builder = Callable[[int, Path], tuple[Callable[[], None], int]]
+
+
+def build_network(n: int) -> Network:
+    edges = hexagonal(n)
+    return Network.from_schema(to_schema(n, edges, round_robin_resources(n, 2 * n)))
+
+
+def sample_queries(network: Network, count: int = QUERIES, seed: int = 0) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    nodes = list(network.neighbors.keys())
+    resources = sorted(network.resource_index)
+    return [(rng.choice(nodes), rng.choice(resources)) for _ in range(count)]
+
+
+def bench_getitem(n: int, scratch: Path) -> tuple[Callable[[], None], int]:
+    graph = build_network(n).graph
+    ids = [node.id for node in graph.nodes]
+    rng = random.Random(0)
+    lookups = [rng.choice(ids) for _ in range(1000)]
+
+    def run():
+        for node_id in lookups:
+            graph[node_id]
+    return run, len(lookups)
+
+
+def search_builder(method: str) -> Builder:
+    def build(n: int, scratch: Path) -> tuple[Callable[[], None], int]:
+        network = build_network(n)
+        search = getattr(NetworkSearch(network, TTL), SEARCH_METHODS[method])
+        queries = sample_queries(network)
+
+        def run():
+            # Fixed seed so random walks take the same route every round
+            random.seed(0)
+            for node_id, resource in queries:
+                search(node_id, resource)
+        return run, len(queries)
+    return build
+
+
+def engine_builder(workers: int) -> Builder:
+    def build(n: int, scratch: Path) -> tuple[Callable[[], None], int]:
+        network = build_network(n)
+        queries = sample_queries(network, count=QUERIES * 10)
+        engine = QueryEngine(network, TTL, "bfs", workers=workers)
+
+        def run():
+            engine.run(queries)
+        return run, len(queries)
+    return build
+
+
+def cached_paths(network: Network) -> list[tuple[str, list[str]]]:
+    # BFS's TTL bounds visited nodes, so allow the whole graph to always find a route
+    search = NetworkSearch(network, len(network.neighbors))
+    paths = []
+    for node_id, resource in sample_queries(network, count=100):
+        result = search.bfs(node_id, resource)
+        if result:
+            paths.append((resource, result.path))
+    return paths
+
+
+def bench_cache_update(n: int, scratch: Path) -> tuple[Callable[[], None], int]:
+    network = build_network(n)
+    paths = cached_paths(network)
+
+    def run():
+        cache = Cache(nodes={}, file_path=scratch / "cache.json", network=network, deferred_write=True)
+        for resource, path in paths:
+            cache.update(resource, path)
+    return run, len(paths)
+
+
+def bench_cache_follow(n: int, scratch: Path) -> tuple[Callable[[], None], int]:
+    network = build_network(n)
+    paths = cached_paths(network)
+    cache = Cache(nodes={}, file_path=scratch / "cache.json", network=network, deferred_write=True)
+    for resource, path in paths:
+        cache.update(resource, path)
+    entries = [(path[0], cache[path[0]][resource], resource) for resource, path in paths]
+
+    def run():
+        for node_id, cache_path, resource in entries:
+            cache.follow(cache_path, [node_id], resource)
+    return run, len(entries)
+
+
+def bench_cache_flush(n: int, scratch: Path) -> tuple[Callable[[], None], int]:
+    network = build_network(n)
+    cache = Cache(nodes={}, file_path=scratch / "cache.json", network=network, deferred_write=True)
+    for resource, path in cached_paths(network):
+        cache.update(resource, path)
+
+    def run():
+        cache.flush()
+    return run, 1
+
+
+def bench_loader(n: int, scratch: Path) -> tuple[Callable[[], None], int]:
+    path = scratch / f"network_{n}.json"
+    write_json(path, n, hexagonal(n), round_robin_resources(n, 2 * n))
+    loader = NetworkLoader()
+
+    def run():
+        loader.load(str(path))
+    return run, 1
+
+
+BENCHMARKS: dict[str, Builder] = {
+    "graph.getitem": bench_getitem,
+    **{f"search.{method}": search_builder(method) for method in SEARCH_METHODS},
+    # Aggregate throughput of concurrent BFS queries; compare w1 with w4
+    **{f"engine.w{workers}": engine_builder(workers) for workers in (1, 4)},
+    "cache.update": bench_cache_update,
+    "cache.follow": bench_cache_follow,
+    "cache.flush": bench_cache_flush,
+    "loader.load": bench_loader,
+}
+
+
+def measure(run: Callable[[], None], operations: int, warmup: int = 2, repeat: int = 7) -> dict:
+    """Time ``repeat`` rounds of ``run`` after ``warmup`` untimed ones; stats are per operation, in seconds."""
+    for _ in range(warmup):
+        run()
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) / operations)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "repeat": repeat,
+        "operations": operations,
+    }
+
+
+def run_suite(sizes: list[int], names: list[str] | None = None, warmup: int = 2, repeat: int = 7, verbose: bool = True, memory: bool = False) -> dict:
+    names = names if names is not None else list(BENCHMARKS)
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch, open(os.devnull, "w") as devnull:
+        for name in names:
+            for n in sizes:
+                key = f"{name}[n={n}]"
+                # Some searches print on every cache hit or miss
+                with contextlib.redirect_stdout(devnull):
+                    run, operations = BENCHMARKS[name](n, Path(scratch))
+                    results[key] = measure(run, operations, warmup=warmup, repeat=repeat)
+                    if memory:
+                        # Separate round: tracemalloc would distort the timings
+                        _, peak = peak_memory(run)
+                        results[key]["peak_bytes"] = peak / operations
+                if verbose:
+                    peak = f" {format_bytes(results[key]['peak_bytes']):>12}" if memory else ""
+                    print(f"  {key:<28} {format_time(results[key]['median']):>12}{peak}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "warmup": warmup,
+            "repeat": repeat,
+            "memory": memory,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list[dict]:
+    """
+    Median ratio current/baseline for every benchmark present in both runs.
+    A benchmark regresses when it got more than ``threshold`` slower. When
+    both runs measured memory, the peak ratio is compared the same way and
+    reported as memory_regression.
+    """
+    rows = []
+    for key, result in current["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            continue
+        ratio = result["median"] / reference["median"] if reference["median"] > 0 else float("inf")
+        rows.append({
+            "benchmark": key,
+            "baseline": reference["median"],
+            "current": result["median"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+        if "peak_bytes" in result and "peak_bytes" in reference:
+            memory_ratio = result["peak_bytes"] / reference["peak_bytes"] if reference["peak_bytes"] > 0 else (1.0 if result["peak_bytes"] == 0 else float("inf"))
+            rows[-1].update({
+                "baseline_bytes": reference["peak_bytes"],
+                "current_bytes": result["peak_bytes"],
+                "memory_ratio": memory_ratio,
+                "memory_regression": memory_ratio > 1 + threshold,
+            })
+    return rows
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def format_bytes(size: float) -> str:
+    for unit, scale in (("MiB", 1 << 20), ("KiB", 1 << 10)):
+        if size >= scale:
+            return f"{size / scale:.2f} {unit}"
+    return f"{size:.0f} B"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks com detecção de regressões.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Executa os micro-benchmarks.")
+    run.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Tamanhos de rede.")
+    run.add_argument("--only", nargs="+", default=None, choices=sorted(BENCHMARKS), metavar="NAME", help=f"Benchmarks a executar ({', '.join(BENCHMARKS)}).")
+    run.add_argument("--warmup", type=int, default=2, help="Rodadas de aquecimento (não medidas).")
+    run.add_argument("--repeat", type=int, default=7, help="Rodadas medidas.")
+    run.add_argument("--output", type=Path, default=Path(__file__).parent / "microbench.json", help="Arquivo JSON de saída.")
+    run.add_argument("--memory", action="store_true", help="Mede também o pico de memória (tracemalloc) por operação.")
+
+    comparison = subparsers.add_parser("compare", help="Compara um resultado com uma baseline.")
+    comparison.add_argument("baseline", type=Path, help="JSON da baseline.")
+    comparison.add_argument("current", type=Path, help="JSON da execução atual.")
+    comparison.add_argument("--threshold", type=float, default=0.1, help="Piora relativa tolerada na mediana (0.1 = 10%%).")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        print(f"Running micro-benchmarks for sizes {args.sizes}")
+        report = run_suite(args.sizes, args.only, warmup=args.warmup, repeat=args.repeat, memory=args.memory)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        memory = ""
+        if "memory_ratio" in row:
+            memory = f" {format_bytes(row['baseline_bytes']):>12} {format_bytes(row['current_bytes']):>12} {row['memory_ratio']:>7.2f}x"
+            flag += " MEMORY" if row["memory_regression"] else ""
+        print(f"{row['benchmark']:<28} {format_time(row['baseline']):>12} {format_time(row['current']):>12} {row['ratio']:>7.2f}x{memory} {flag}")
+    regressions = [row for row in rows if row["regression"] or row.get("memory_regression")]
+    print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%} out of {len(rows)} benchmarks")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Skewed query workloads and trace replay.
+
+BenchmarkRunner asks every node for every resource exactly once, which hides
+what the cache does under real traffic. This module generates query traces
+with Zipf-skewed popularity, temporal locality and Poisson arrivals, saves them
+as CSV, and replays them against one long-lived Cache so the hit rate builds
+up the way it would in production.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from loader import NetworkLoader
+from network import Network
+from network.replication import zipf_popularity
+from search import NetworkSearch
+from cache import Cache
+from metrics import MetricsRegistry
+import simulator
+
+
+METHODS = {
+    "bfs": "bfs",
+    "dfs": "dfs",
+    "random": "random_walk",
+    "flood": "flood",
+    "dijkstra": "dijkstra",
+}
+
+
+@dataclass
+class Query:
+    time: float
+    node_id: str
+    resource: str
+
+
+def generate_trace(
+    nodes: list[str],
+    resources: list[str],
+    num_queries: int,
+    alpha: float = 1.0,
+    node_alpha: float = 0.0,
+    locality: float = 0.0,
+    window: int = 100,
+    rate: float = 100.0,
+    seed: int | None = None,
+) -> list[Query]:
+    """
+    Build a query trace.
+
+    - alpha: Zipf skew of resource popularity (0 is uniform). Which resource
+      gets which rank is shuffled, so popularity does not follow naming.
+    - node_alpha: Zipf skew of which nodes issue queries (0 is uniform).
+    - locality: probability that a query repeats the resource of one of the
+      last ``window`` queries instead of drawing a fresh one.
+    - rate: mean arrivals per second of a Poisson process.
+    """
+    if not nodes or not resources:
+        raise ValueError("A trace needs at least one node and one resource")
+    if not 0.0 <= locality <= 1.0:
+        raise ValueError(f"locality must be in [0, 1], got {locality}")
+    if rate <= 0:
+        raise ValueError(f"rate must be positive, got {rate}")
+
+    rng = random.Random(seed)
+    ranked_resources = list(resources)
+    rng.shuffle(ranked_resources)
+    ranked_nodes = list(nodes)
+    rng.shuffle(ranked_nodes)
+
+    resource_weights = list(accumulate(zipf_popularity(ranked_resources, alpha).values()))
+    node_weights = list(accumulate(zipf_popularity(ranked_nodes, node_alpha).values()))
+
+    def draw(population: list[str], cumulative: list[float]) -> str:
+        i = bisect_left(cumulative, rng.random() * cumulative[-1])
+        return population[min(i, len(population) - 1)]
+
+    trace: list[Query] = []
+    now = 0.0
+    for _ in range(num_queries):
+        now += rng.expovariate(rate)
+        if trace and rng.random() < locality:
+            resource = trace[-rng.randint(1, min(window, len(trace)))].resource
+        else:
+            resource = draw(ranked_resources, resource_weights)
+        trace.append(Query(now, draw(ranked_nodes, node_weights), resource))
+    return trace
+
+
+def save_trace(trace: list[Query], path: Path | str) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["time", "node_id", "resource"])
+        for query in trace:
+            writer.writerow([f"{query.time:.6f}", query.node_id, query.resource])
+
+
+def load_trace(path: Path | str) -> list[Query]:
+    with open(path, "r", newline="") as f:
+        return [Query(float(row["time"]), row["node_id"], row["resource"]) for row in csv.DictReader(f)]
+
+
+class TraceReplayer:
+    """
+    Feed a trace through NetworkSearch with a single persistent Cache.
+
+    The cache is loaded from ``cache_path`` if it exists, so consecutive runs
+    start warm, and written back once at the end of the replay. With a
+    ``metrics`` registry, the searches and the cache record into it.
+    """
+
+    def __init__(self, network: Network, ttl: int = 50, search_method: str = "bfs", cache_path: Path | None = None, use_cache: bool = True, metrics: MetricsRegistry | None = None):
+        if search_method not in METHODS:
+            raise ValueError(f"Unknown search method: {search_method}")
+        self.network = network
+        self.ttl = ttl
+        self.search_method = search_method
+        self.use_cache = use_cache
+        self.cache = None
+        self.metrics = metrics
+        if use_cache:
+            nodes = {}
+            if cache_path is not None and cache_path.exists():
+                with cache_path.open("r") as f:
+                    nodes = json.load(f)
+            file_path = cache_path if cache_path is not None else Path(os.devnull)
+            self.cache = Cache(nodes=nodes, file_path=file_path, network=network, deferred_write=True, metrics=metrics)
+        self.search = NetworkSearch(network, ttl, cache=self.cache, metrics=metrics)
+        self._run = getattr(self.search, METHODS[search_method])
+
+    def run_query(self, query: Query) -> dict:
+        start_time = time.perf_counter()
+        result = self._run(query.node_id, query.resource, use_cache=self.use_cache)
+        time_ms = (time.perf_counter() - start_time) * 1000
+        return {
+            'time': query.time,
+            'node_id': query.node_id,
+            'resource': query.resource,
+            'search_method': self.search_method,
+            'use_cache': self.use_cache,
+            # An entry that follow() rejects (stale, or the requester's own) is no hit
+            'cache_hit': result.cache_hits > 0,
+            'found': result.found,
+            'steps': result.hops,
+            'messages': result.messages,
+            'time_ms': round(time_ms, 4),
+        }
+
+    def replay(self, trace: list[Query], warmup: int = 0, quiet: bool = True) -> list[dict]:
+        """
+        Run every query in order and return one row per query after the
+        first ``warmup`` ones, which only serve to fill the cache.
+        """
+        rows = []
+        # Some searches print on every cache hit or miss
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+            for i, query in enumerate(trace):
+                row = self.run_query(query)
+                if i >= warmup:
+                    rows.append(row)
+        if self.cache is not None:
+            self.cache.flush()
+        return rows
+
+
+def simulate_trace(network: Network, trace: list[Query], ttl: int = 50, search_method: str = "flood", use_cache: bool = True, message_size: float = 64.0, bandwidth: float | None = None, seed: int | None = None) -> simulator.NetworkSimulator:
+    """
+    Replay a trace in simulated time: each query is issued at its trace time
+    (seconds, converted to the simulator's milliseconds) and all of them
+    share the links while in flight.
+    """
+    cache = Cache(nodes={}, file_path=Path(os.devnull), network=network, deferred_write=True) if use_cache else None
+    sim = simulator.NetworkSimulator(network, ttl, cache=cache, message_size=message_size, default_bandwidth=bandwidth, seed=seed)
+    for query in trace:
+        sim.submit(query.node_id, query.resource, search_method, at=query.time * 1000)
+    sim.run()
+    return sim
+
+
+def simulated_rows(queries: list[simulator.SimulatedQuery]) -> list[dict]:
+    return [
+        {
+            'time': query.issued_at / 1000,
+            'node_id': query.requester,
+            'resource': query.resource,
+            'search_method': query.method,
+            'found': query.found,
+            'steps': query.hops,
+            'messages': query.messages,
+            'responses': query.responses,
+            'duplicates': query.duplicates,
+            'response_ms': round(query.response_time, 4) if query.response_time is not None else None,
+        }
+        for query in queries
+    ]
+
+
+def summarize(rows: list[dict]) -> dict:
+    found = [row for row in rows if row['found']]
+    return {
+        'queries': len(rows),
+        'success_rate': len(found) / len(rows) if rows else 0.0,
+        'cache_hit_rate': sum(row['cache_hit'] for row in rows) / len(rows) if rows else 0.0,
+        'avg_steps': sum(row['steps'] for row in found) / len(found) if found else 0.0,
+        'avg_messages': sum(row['messages'] for row in rows) / len(rows) if rows else 0.0,
+        'avg_time_ms': sum(row['time_ms'] for row in rows) / len(rows) if rows else 0.0,
+    }
+
+
+def save_rows(rows: list[dict], output_path: Path, fieldnames: list[str] | None = None) -> None:
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.DictWriter(
+            f,
+            fieldnames=fieldnames or ['time', 'node_id', 'resource', 'search_method', 'use_cache', 'cache_hit', 'found', 'steps', 'messages', 'time_ms']
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera e reproduz traces de consultas com popularidade Zipf.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="Gera um trace de consultas.")
+    generate.add_argument("--network", type=Path, default=Path(__file__).parent / "hexagonal_network.json", help="Rede usada para obter nós e recursos.")
+    generate.add_argument("--queries", type=int, default=10000, help="Número de consultas.")
+    generate.add_argument("--alpha", type=float, default=1.0, help="Expoente Zipf da popularidade dos recursos.")
+    generate.add_argument("--node-alpha", type=float, default=0.0, help="Expoente Zipf dos nós que consultam.")
+    generate.add_argument("--locality", type=float, default=0.0, help="Probabilidade de repetir um recurso recente.")
+    generate.add_argument("--window", type=int, default=100, help="Janela de consultas recentes para a localidade.")
+    generate.add_argument("--rate", type=float, default=100.0, help="Taxa média de chegada (consultas/s).")
+    generate.add_argument("--seed", type=int, default=None, help="Semente aleatória.")
+    generate.add_argument("--output", type=Path, default=Path(__file__).parent / "trace.csv", help="Arquivo CSV do trace.")
+
+    replay = subparsers.add_parser("replay", help="Reproduz um trace com cache persistente.")
+    replay.add_argument("trace", type=Path, help="Arquivo CSV do trace.")
+    replay.add_argument("--network", type=Path, default=Path(__file__).parent / "hexagonal_network.json", help="Arquivo da rede.")
+    replay.add_argument("--method", default="bfs", choices=sorted(METHODS), help="Método de busca.")
+    replay.add_argument("--ttl", type=int, default=50, help="TTL de cada busca.")
+    replay.add_argument("--cache", type=Path, default=None, help="Arquivo de cache persistente (reutilizado entre execuções).")
+    replay.add_argument("--no-cache", action="store_true", help="Reproduz sem cache.")
+    replay.add_argument("--warmup", type=int, default=0, help="Consultas iniciais usadas só para aquecer o cache.")
+    replay.add_argument("--output", type=Path, default=Path(__file__).parent / "replay.csv", help="CSV com as métricas por consulta.")
+    replay.add_argument("--metrics", type=Path, default=None, help="Salva as métricas agregadas (OpenMetrics) neste arquivo.")
+    replay.add_argument("--metrics-port", type=int, default=None, help="Expõe as métricas em http://127.0.0.1:PORTA/metrics durante a reprodução.")
+
+    simulate = subparsers.add_parser("simulate", help="Reproduz um trace em tempo simulado, com latência e banda por enlace.")
+    simulate.add_argument("trace", type=Path, help="Arquivo CSV do trace.")
+    simulate.add_argument("--network", type=Path, default=Path(__file__).parent / "hexagonal_network.json", help="Arquivo da rede.")
+    simulate.add_argument("--method", default="flood", choices=simulator.METHODS, help="Método de busca (bfs é a busca em anéis crescentes).")
+    simulate.add_argument("--ttl", type=int, default=50, help="TTL de cada busca.")
+    simulate.add_argument("--no-cache", action="store_true", help="Simula sem cache.")
+    simulate.add_argument("--bandwidth", type=float, default=None, help="Banda (bytes/ms) dos enlaces sem banda definida; ilimitada por padrão.")
+    simulate.add_argument("--message-size", type=float, default=64.0, help="Tamanho de cada mensagem (bytes).")
+    simulate.add_argument("--seed", type=int, default=None, help="Semente do passeio aleatório.")
+    simulate.add_argument("--output", type=Path, default=Path(__file__).parent / "simulated.csv", help="CSV com as métricas por consulta.")
+
+    args = parser.parse_args()
+    network = NetworkLoader().load(str(args.network))
+
+    if args.command == "simulate":
+        trace = load_trace(args.trace)
+        start_time = time.perf_counter()
+        sim = simulate_trace(network, trace, ttl=args.ttl, search_method=args.method, use_cache=not args.no_cache, message_size=args.message_size, bandwidth=args.bandwidth, seed=args.seed)
+        wall = time.perf_counter() - start_time
+        rows = simulated_rows(sim.queries)
+        save_rows(rows, args.output, fieldnames=list(rows[0]) if rows else ['time'])
+        for key, value in sim.stats().items():
+            print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
+        print(f"wall_s: {wall:.2f} ({sim.events / wall:,.0f} events/s)")
+        print(f"Per-query metrics saved to: {args.output}")
+        return
+
+    if args.command == "generate":
+        nodes = list(network.neighbors.keys())
+        resources = sorted(network.resource_index)
+        trace = generate_trace(
+            nodes, resources, args.queries,
+            alpha=args.alpha, node_alpha=args.node_alpha, locality=args.locality,
+            window=args.window, rate=args.rate, seed=args.seed,
+        )
+        save_trace(trace, args.output)
+        span = f" over {trace[-1].time:.1f}s" if trace else ""
+        print(f"Trace with {len(trace)} queries{span} saved to: {args.output}")
+        return
+
+    trace = load_trace(args.trace)
+    metrics = MetricsRegistry() if args.metrics or args.metrics_port is not None else None
+    server = metrics.serve(args.metrics_port) if args.metrics_port is not None else None
+    replayer = TraceReplayer(network, ttl=args.ttl, search_method=args.method, cache_path=args.cache, use_cache=not args.no_cache, metrics=metrics)
+    rows = replayer.replay(trace, warmup=args.warmup)
+    save_rows(rows, args.output)
+    if server is not None:
+        server.shutdown()
+    if args.metrics:
+        metrics.write(args.metrics)
+        print(f"Metrics saved to: {args.metrics}")
+    for key, value in summarize(rows).items():
+        print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
+    print(f"Per-query metrics saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()